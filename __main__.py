@@ -1,48 +1,170 @@
+import asyncio
 import logging
 import multiprocessing
-from reactivex.scheduler import ThreadPoolScheduler
+import signal
+from reactivex.scheduler import ThreadPoolScheduler, CurrentThreadScheduler
 
 from src.config import *
 from src.postgres_service import PostgresService
 from src.mongo_service import MongoService
 from src.feature_extractor import FeatureExtractor
+from src.article_claimer import ArticleClaimer
+from src.extraction_daemon import ExtractionDaemon
+from src.async_postgres_service import AsyncPostgresService
+from src.async_mongo_service import AsyncMongoService
+from src.async_feature_extractor import AsyncFeatureExtractor
 from src.process_pool_task_scheduler import ProcessPoolTaskScheduler
 
 
 def main():
     # Setup logger
     logging.basicConfig(level=logging.INFO, format=LOGGER_FORMAT)
-    logging.info('Starting feature extractor')
+    logging.info('Starting feature extractor with %s engine', EXTRACTION_ENGINE)
+
+    # Load known IOCs before starting processes, they share the index
+    knownIocIndex = loadKnownIocIndex() if KNOWN_IOC_INDEX_ENABLED else None
 
     # Create schedulers
     processesToMake = multiprocessing.cpu_count()
+    logging.info('Starting Processpool with %s processes each with %s threads', str(processesToMake), str(THREADS_PER_CORE))
+    taskScheduler = ProcessPoolTaskScheduler(processesToMake, knownIocIndex)
+
+    if DAEMON_MODE_ENABLED:
+        if EXTRACTION_ENGINE == 'asyncio':
+            logging.info('Daemon mode runs with the reactivex engine')
+        runReactiveEngine(taskScheduler)
+    elif EXTRACTION_ENGINE == 'asyncio':
+        asyncio.run(runAsyncEngine(taskScheduler))
+    else:
+        runReactiveEngine(taskScheduler)
+
+    # Cleanup
+    taskScheduler.dispose()
+    if knownIocIndex is not None:
+        knownIocIndex.unlink()
+
+    logging.info('Done')
+
+
+def loadKnownIocIndex():
+    try:
+        postgresService = PostgresService(logging.getLogger('PostgresService'), CurrentThreadScheduler(),
+                                          parentWrites=False)
+    except Exception as e:
+        logging.error('Failed to Initialize Databases. Known IOC index disabled', exc_info=e)
+        return None
+
+    try:
+        return postgresService.loadKnownIocIndex()
+    except Exception as e:
+        logging.error('Failed to load known IOCs. Known IOC index disabled', exc_info=e)
+        return None
+    finally:
+        postgresService.close()
+
+
+def runReactiveEngine(taskScheduler):
     threadsToMake = THREADS_PER_CORE * multiprocessing.cpu_count()
     logging.info('Starting Main Threadpool with %s threads', str(threadsToMake))
-    logging.info('Starting Processpool with %s processes each with %s threads', str(processesToMake), str(THREADS_PER_CORE))
     scheduler = ThreadPoolScheduler(threadsToMake)
-    taskScheduler = ProcessPoolTaskScheduler(processesToMake)
 
     # Instantiate Database services for feature extractor
     try:
-        postgresService = PostgresService(logging.getLogger('PostgresService'), scheduler)
+        # With parent writes IOCs are resolved by this process
+        postgresService = PostgresService(logging.getLogger('PostgresService'), scheduler,
+                                          knownIocIndex=taskScheduler.knownIocIndex)
         mongoService = MongoService(logging.getLogger('MongoService'), scheduler)
     except Exception as e:
         logging.error('Failed to Initialize Databases', exc_info=e)
         return
 
-    featureExtractor = FeatureExtractor(logging.getLogger('FeatureExtractor'), postgresService, mongoService, scheduler, taskScheduler)
+    articleClaimer = None
+    if CLAIM_MODE_ENABLED:
+        try:
+            articleClaimer = ArticleClaimer(logging.getLogger('ArticleClaimer'), postgresService, scheduler)
+        except Exception as e:
+            logging.error('Failed to Initialize Article Claimer', exc_info=e)
+            postgresService.close()
+            return
+        logging.info('Claim mode enabled for instance %s', articleClaimer.instanceId)
+
+    featureExtractor = FeatureExtractor(logging.getLogger('FeatureExtractor'), postgresService, mongoService, scheduler,
+                                        taskScheduler, articleClaimer)
 
     logging.info('Startup Completed')
     # Start Extraction
-    featureExtractor.run()
+    if DAEMON_MODE_ENABLED:
+        runDaemon(postgresService, featureExtractor, articleClaimer)
+    else:
+        featureExtractor.run()
 
     logging.info('Shutting down feature extractor')
 
-    # Cleanup
+    if articleClaimer is not None:
+        articleClaimer.close()
     postgresService.close()
-    taskScheduler.dispose()
 
-    logging.info('Done')
+
+def runDaemon(postgresService, featureExtractor, articleClaimer):
+    daemon = ExtractionDaemon(logging.getLogger('ExtractionDaemon'), postgresService, featureExtractor, articleClaimer)
+
+    # Finish articles in flight before shutting down
+    def onSignal(signum, frame):
+        logging.info('Received signal %s, stopping extraction daemon', str(signum))
+        daemon.stop()
+
+    signal.signal(signal.SIGTERM, onSignal)
+    signal.signal(signal.SIGINT, onSignal)
+
+    daemon.run()
+
+
+async def runAsyncEngine(taskScheduler):
+    # Instantiate Database services for feature extractor on the running event loop
+    try:
+        postgresService = AsyncPostgresService(logging.getLogger('AsyncPostgresService'))
+        await postgresService.open()
+        mongoService = AsyncMongoService(logging.getLogger('AsyncMongoService'))
+    except Exception as e:
+        logging.error('Failed to Initialize Databases', exc_info=e)
+        return
+
+    # Claims and parent writes are batched and may block, so they use a blocking service outside the event loop
+    blockingPostgresService = None
+    articleClaimer = None
+    if CLAIM_MODE_ENABLED or PARENT_WRITES_ENABLED:
+        try:
+            blockingPostgresService = PostgresService(logging.getLogger('PostgresService'), CurrentThreadScheduler(),
+                                                      knownIocIndex=taskScheduler.knownIocIndex)
+            if CLAIM_MODE_ENABLED:
+                articleClaimer = ArticleClaimer(logging.getLogger('ArticleClaimer'), blockingPostgresService,
+                                                CurrentThreadScheduler())
+        except Exception as e:
+            logging.error('Failed to Initialize Databases', exc_info=e)
+            if blockingPostgresService is not None:
+                blockingPostgresService.close()
+            await postgresService.close()
+            mongoService.close()
+            return
+        if articleClaimer is not None:
+            logging.info('Claim mode enabled for instance %s', articleClaimer.instanceId)
+
+    featureExtractor = AsyncFeatureExtractor(logging.getLogger('FeatureExtractor'), postgresService, mongoService,
+                                             taskScheduler, articleClaimer=articleClaimer,
+                                             featureWriter=blockingPostgresService)
+
+    logging.info('Startup Completed')
+    # Start Extraction
+    await featureExtractor.run()
+
+    logging.info('Shutting down feature extractor')
+
+    if articleClaimer is not None:
+        articleClaimer.close()
+    if blockingPostgresService is not None:
+        blockingPostgresService.close()
+    await postgresService.close()
+    mongoService.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,111 @@
+import bisect
+import threading
+from typing import Optional
+
+from multiprocess.shared_memory import SharedMemory
+
+
+class ArticleArena:
+    """
+    Shared memory the main process writes article content into, so only a small descriptor is sent to the
+    process that extracts the article. Space is allocated first-fit from a list of free blocks kept by the
+    process that created the arena, and freed blocks merge with their free neighbours.
+    Other processes only read the blocks they are told about
+    """
+
+    def __init__(self, size: int, sharedMemoryName: Optional[str] = None):
+        self.size = size
+        self._isOwner = sharedMemoryName is None
+        if self._isOwner:
+            self._sharedMemory = SharedMemory(create=True, size=size)
+            # Sorted (offset, size) free blocks
+            self._freeBlocks = [(0, size)]
+            self._lock = threading.Lock()
+        else:
+            self._sharedMemory = SharedMemory(name=sharedMemoryName)
+
+    def __getstate__(self):
+        # Processes attach to the same shared memory instead of receiving a copy
+        return {"size": self.size, "sharedMemoryName": self._sharedMemory.name}
+
+    def __setstate__(self, state):
+        self.__init__(state["size"], state["sharedMemoryName"])
+
+    def freeBytes(self):
+        """
+        :return: Number of bytes not allocated
+        """
+        with self._lock:
+            return sum(blockSize for _, blockSize in self._freeBlocks)
+
+    def write(self, content: bytes):
+        """
+        Allocates a block and writes content into it
+        :param content: Bytes to write
+        :return: Offset of the block, or None if no free block is large enough
+        """
+        length = len(content)
+        if length == 0:
+            return 0
+
+        with self._lock:
+            for index, (offset, blockSize) in enumerate(self._freeBlocks):
+                if blockSize >= length:
+                    break
+            else:
+                return None
+
+            if blockSize == length:
+                del self._freeBlocks[index]
+            else:
+                self._freeBlocks[index] = (offset + length, blockSize - length)
+
+        self._sharedMemory.buf[offset:offset + length] = content
+        return offset
+
+    def read(self, offset: int, length: int):
+        """
+        Reads a block as text
+        :param offset: Offset of the block
+        :param length: Length of the block in bytes
+        :return: Block decoded as UTF-8
+        """
+        with self._sharedMemory.buf[offset:offset + length] as view:
+            return str(view, 'utf-8', 'replace')
+
+    def free(self, offset: int, length: int):
+        """
+        Frees a block returned by {write}
+        :param offset: Offset of the block
+        :param length: Length of the block in bytes
+        """
+        if length == 0:
+            return
+
+        with self._lock:
+            index = bisect.bisect_left(self._freeBlocks, (offset, length))
+            # Merge with the following block
+            if index < len(self._freeBlocks) and self._freeBlocks[index][0] == offset + length:
+                length += self._freeBlocks[index][1]
+                del self._freeBlocks[index]
+            # Merge with the preceding block
+            if index > 0:
+                previousOffset, previousSize = self._freeBlocks[index - 1]
+                if previousOffset + previousSize == offset:
+                    self._freeBlocks[index - 1] = (previousOffset, previousSize + length)
+                    return
+            self._freeBlocks.insert(index, (offset, length))
+
+    def close(self):
+        """
+        Detaches from the shared memory
+        """
+        self._sharedMemory.close()
+
+    def unlink(self):
+        """
+        Detaches from and frees the shared memory. Only called by the process that created the arena
+        """
+        self.close()
+        if self._isOwner:
+            self._sharedMemory.unlink()
@@ -0,0 +1,147 @@
+import threading
+from logging import Logger
+from uuid import UUID, uuid4
+
+import reactivex as rx
+from reactivex import operators as ops
+
+from src.collections import ArticleInfo
+from src.config import *
+
+
+class ArticleClaimer:
+    """
+    Claims articles to extract in batches with leases, so several instances can extract from the same databases.
+    A new batch is only claimed once there is room for it among the {maxInFlight} articles in flight.
+    Leases of articles in flight are renewed every {renewInterval} seconds. Leases of a crashed instance expire
+    and their articles are claimed again
+    """
+
+    def __init__(self, logger: Logger, postgresService, scheduler, instanceId: str = INSTANCE_ID,
+                 batchSize: int = CLAIM_BATCH_SIZE, maxInFlight: int = CLAIM_MAX_IN_FLIGHT,
+                 leaseDuration: float = CLAIM_LEASE_DURATION, renewInterval: float = CLAIM_RENEW_INTERVAL):
+        self.logger = logger
+        self.postgresService = postgresService
+        self.scheduler = scheduler
+        # Unique per run, so leases left by a previous run with the same instance id are never renewed
+        self.instanceId = "{}-{}".format(instanceId, uuid4())
+        self.batchSize = batchSize
+        self.leaseDuration = leaseDuration
+        self.renewInterval = renewInterval
+
+        self._inFlight = set()
+        self._inFlightLock = threading.Lock()
+        self._slots = threading.Semaphore(max(batchSize, maxInFlight))
+        self._closed = threading.Event()
+
+        postgresService.createLeaseTable()
+
+        self._renewThread = threading.Thread(target=self._renewPeriodically, daemon=True)
+        self._renewThread.start()
+
+    def getClaimedIds(self):
+        """
+        Claims batches of articles until no article is left to claim. Blocks while there is no room for a batch
+        :return: generator of claimed article ids
+        """
+        while not self._closed.is_set():
+            # Wait for room for a whole batch so leases are not held long before their articles are extracted
+            for i in range(self.batchSize):
+                self._slots.acquire()
+            if self._closed.is_set():
+                return
+
+            try:
+                claimed = self.postgresService.claimArticles(self.instanceId, self.batchSize, self.leaseDuration)
+            except Exception:
+                self._releaseSlots(self.batchSize)
+                raise
+
+            self._releaseSlots(self.batchSize - len(claimed))
+            if len(claimed) == 0:
+                return
+
+            with self._inFlightLock:
+                self._inFlight.update(articleInfo.articleId for articleInfo in claimed)
+            self.logger.info("Claimed %s articles", str(len(claimed)))
+
+            yield from claimed
+
+    def getClaimedIdsAsStream(self):
+        """
+        Claims batches of articles as a stream, see {getClaimedIds}
+        :return: Observable that emits claimed article ids
+        """
+        count = {"value": 0}
+
+        def onClaimed(articleInfo: ArticleInfo):
+            count["value"] += 1
+
+        # Deferred so every retry continues claiming with a new generator
+        return rx.defer(lambda scheduler: rx.from_iterable(self.getClaimedIds())).pipe(
+            ops.do_action(on_next=onClaimed),
+            # Retry
+            ops.do_action(on_error=lambda err: self.logger.error("Failed to claim articles", exc_info=err)),
+            ops.retry(DB_MAX_RETRIES),
+            ops.do_action(on_error=lambda err: self.logger.error("Retries Exhausted", exc_info=err)),
+            ops.catch(rx.empty()),
+            ops.do_action(on_completed=lambda: self.logger.info("Claimed %s articles to process", str(count["value"]))),
+            # Scheduler setup
+            ops.subscribe_on(self.scheduler)
+        )
+
+    def complete(self, articleId: UUID):
+        """
+        Called once an article left extraction, whether it succeeded or not. Its lease is no longer renewed
+        and is released by the extracted mark, or expires so the article is retried later
+        :param articleId: Article id that was claimed
+        """
+        with self._inFlightLock:
+            if articleId not in self._inFlight:
+                return
+            self._inFlight.remove(articleId)
+        self._slots.release()
+
+    def _releaseSlots(self, count: int):
+        for i in range(count):
+            self._slots.release()
+
+    def _renewPeriodically(self):
+        while not self._closed.wait(self.renewInterval):
+            self.renewLeases()
+
+    def renewLeases(self):
+        """
+        Renews the leases of all articles in flight
+        """
+        with self._inFlightLock:
+            articleIds = list(self._inFlight)
+
+        if len(articleIds) == 0:
+            return
+
+        try:
+            self.postgresService.renewLeases(self.instanceId, articleIds, self.leaseDuration)
+        except Exception as err:
+            self.logger.error("Failed to renew leases", exc_info=err)
+
+    def close(self):
+        """
+        Stops renewing leases and releases the leases of articles still in flight, so other instances claim them
+        """
+        self._closed.set()
+        self._renewThread.join()
+        # Wakes up a claim waiting for room
+        self._releaseSlots(self.batchSize)
+
+        with self._inFlightLock:
+            articleIds = list(self._inFlight)
+            self._inFlight.clear()
+
+        if len(articleIds) == 0:
+            return
+
+        try:
+            self.postgresService.releaseLeases(articleIds)
+        except Exception as err:
+            self.logger.error("Failed to release leases", exc_info=err)
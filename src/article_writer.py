@@ -0,0 +1,66 @@
+from uuid import UUID
+import reactivex as rx
+from reactivex import operators as ops
+
+
+class ArticleWriter:
+    """
+    Collects the relation writes of a single article so they can be sent to the db together.
+    Has the same write streams as PostgresService, so extractors can write through either.
+    IOC ids are resolved immediately as the relations depend on them.
+    Also serves as the unit of work of PostgresService.articleTransaction
+    """
+
+    def __init__(self, postgresService, articleId: UUID):
+        self.postgresService = postgresService
+        self.articleId = articleId
+        # (article id, IOC id) pairs
+        self.articleIocs = []
+        # (category id, article id) pairs
+        self.categoryArticles = []
+
+    def addIOCsIfNotExistAsStream(self, iocs: list[tuple[str, int]]):
+        """
+        Adds all IOCs to db that do not exist as a stream
+        :param iocs: List of (normalized IOC value, IOC type id) pairs
+        :return: Observable containing a dict mapping each pair to its IOC Id
+        """
+        return self.postgresService.addIOCsIfNotExistAsStream(iocs)
+
+    def addArticleIoc(self, iocId, articleId):
+        """
+        Collects Article IOC Relation until the article is written
+        :param iocId: IOC id to add
+        :param articleId: Article Id to add
+        """
+        self.articleIocs.append((articleId, iocId))
+
+    def addArticleIocAsStream(self, iocId, articleId):
+        """
+        Collects Article IOC Relation until the article is written as a stream
+        :param iocId: IOC id to add
+        :param articleId: Article Id to add
+        :return: Observable that collects article IOC relation
+        """
+        return rx.of((iocId, articleId)).pipe(
+            ops.do_action(lambda args: self.addArticleIoc(args[0], args[1]))
+        )
+
+    def insertCategoryArticle(self, categoryId: str, articleId: UUID):
+        """
+        Collects Article Category Relation until the article is written
+        :param categoryId: Category id to add
+        :param articleId: Article Id to add
+        """
+        self.categoryArticles.append((categoryId, articleId))
+
+    def insertCategoryArticleAsStream(self, categoryId: str, articleId: UUID):
+        """
+        Collects Article Category Relation until the article is written as a stream
+        :param categoryId: Category id to add
+        :param articleId: Article Id to add
+        :return: Observable that collects article category relation
+        """
+        return rx.of((categoryId, articleId)).pipe(
+            ops.do_action(lambda args: self.insertCategoryArticle(args[0], args[1]))
+        )
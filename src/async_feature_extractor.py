@@ -0,0 +1,112 @@
+import asyncio
+from logging import Logger
+
+from src.collections import ArticleInfo
+from src.config import *
+
+
+class AsyncFeatureExtractor:
+    """
+    Extracts features from articles using asyncio for all database reads of the main process.
+    Extraction still runs in the process pool
+    """
+
+    def __init__(self, logger: Logger, postgresService, mongoService, processPool,
+                 maxInFlight: int = ASYNC_MAX_IN_FLIGHT, articleClaimer=None, featureWriter=None):
+        self.articleCount = 0
+
+        self.postgresService = postgresService
+        self.mongoService = mongoService
+        self.logger = logger
+        self.processPool = processPool
+        self.maxInFlight = maxInFlight
+        self.articleClaimer = articleClaimer
+        # Blocking PostgresService writing the features computed by the process pool, with parent writes
+        self.featureWriter = featureWriter
+
+    def countAndLog(self):
+        """
+        Counts articles that went through extraction. Logs based off the frequency defined in {LOG_FREQUENCY}.
+        Only called from the event loop so no locking is required.
+        """
+        self.articleCount += 1
+        if self.articleCount % LOG_FREQUENCY == 0:
+            self.logger.info("Completed extraction for %s articles", self.articleCount)
+            self.postgresService.logPoolStats()
+
+    async def run(self):
+        """
+        Starts Feature extraction. Completes when all articles are extracted or on program timeout.
+        """
+        try:
+            await asyncio.wait_for(self.extractAll(), PROGRAM_TIMEOUT)
+            self.logger.info("Completed extraction for %s articles", self.articleCount)
+        except asyncio.TimeoutError as err:
+            self.logger.error("Error occurred during execution", exc_info=err)
+
+    async def extractAll(self):
+        """
+        Extracts every non-extracted article with at most {maxInFlight} articles in flight
+        """
+        inFlight = asyncio.Semaphore(self.maxInFlight)
+        tasks = set()
+
+        # Ids are only read while fewer than {maxInFlight} articles are in flight
+        async for articleInfo in self.readArticleIds():
+            await inFlight.acquire()
+            task = asyncio.create_task(self.extractArticle(articleInfo))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            task.add_done_callback(lambda t: inFlight.release())
+
+        if len(tasks) > 0:
+            await asyncio.wait(tasks)
+
+    async def readArticleIds(self):
+        """
+        Reads the ids of articles to extract, in claim mode only the ids leased to this instance
+        :return: async generator of article ids
+        """
+        if self.articleClaimer is None:
+            async for articleInfo in self.postgresService.getNonExtractedIdsWithRetry():
+                yield articleInfo
+            return
+
+        # Claiming blocks while there is no room for a batch, so it runs outside the event loop
+        loop = asyncio.get_running_loop()
+        failures = 0
+        while failures < DB_MAX_RETRIES:
+            claimedIds = self.articleClaimer.getClaimedIds()
+            try:
+                while (articleInfo := await loop.run_in_executor(None, next, claimedIds, None)) is not None:
+                    yield articleInfo
+                return
+            except Exception as err:
+                self.logger.error("Failed to claim articles", exc_info=err)
+                failures += 1
+
+        self.logger.error("Retries Exhausted")
+
+    async def extractArticle(self, articleInfo: ArticleInfo):
+        """
+        Reads an article and extracts its features in the process pool
+        :param articleInfo: Article to extract
+        """
+        try:
+            article = await self.mongoService.getByIdWithRetry(articleInfo)
+            if article is None:
+                return
+
+            result = await asyncio.wrap_future(self.processPool.submitArticle(article))
+            if not result.succeeded:
+                self.logger.warning("Extraction failed for article %s: %s", str(result.articleId), result.error)
+            if result.features is not None:
+                # Queueing may flush the batch, which blocks
+                await asyncio.get_running_loop().run_in_executor(None, self.featureWriter.queueArticleFeatures,
+                                                                 result.features)
+            self.countAndLog()
+        except Exception as err:
+            self.logger.error("Error occurred.", exc_info=err)
+        finally:
+            if self.articleClaimer is not None:
+                self.articleClaimer.complete(articleInfo.articleId)
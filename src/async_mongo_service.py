@@ -0,0 +1,47 @@
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from src.async_utils import retryAsync
+from src.collections import ArticleInfo
+from src.config import *
+from src.mongo_service import ARTICLE_PROJECTION, toArticleContent, getArticleCollection
+
+
+class AsyncMongoService:
+    """
+    Service that handles the mongo db operations of the asyncio engine.
+    Must be created and used from a single running event loop
+    """
+
+    def __init__(self, logger, rawBson: bool = MONGO_RAW_BSON_ENABLED):
+        self.logger = logger
+
+        self.client = AsyncIOMotorClient("mongodb://{}:{}/".format(MONGO_HOST, MONGO_PORT),
+                                         username=MONGO_USERNAME,
+                                         password=MONGO_PASSWORD,
+                                         uuidRepresentation='standard')
+        self.collection = getArticleCollection(self.client, rawBson)
+
+    async def getById(self, articleId: ArticleInfo):
+        """
+        Get document by id
+        :param articleId: UUID of desired article.
+        :return: Article Content object containing the article or None if not available
+        """
+        result = await self.collection.find_one({"_id": articleId.articleId, "web_scrap": {"$exists": True}},
+                                                projection=ARTICLE_PROJECTION)
+
+        return toArticleContent(self.logger, articleId, result)
+
+    async def getByIdWithRetry(self, articleId: ArticleInfo):
+        """
+        Get document by id, retrying on failure
+        :param articleId: UUID of desired article.
+        :return: Article Content object containing the article or None if not available or retries are exhausted
+        """
+        return await retryAsync(self.logger, lambda: self.getById(articleId), "Failed to read from db")
+
+    def close(self):
+        """
+        Closes the client
+        """
+        self.client.close()
@@ -0,0 +1,95 @@
+from logging import Logger
+from uuid import UUID
+from psycopg_pool import AsyncConnectionPool
+
+from src.collections import ArticleInfo
+from src.config import *
+from src.postgres_service import (GET_NON_EXTRACTED_IDS_QUERY, GET_NON_EXTRACTED_IDS_AFTER_QUERY,
+                                  NON_EXTRACTED_IDS_CURSOR_NAME, getPostgresConnectionInfo)
+
+
+class AsyncPostgresService:
+    """
+    Service that handles the Postgres Db Operations of the asyncio engine.
+    Must be used from a single event loop
+    """
+
+    def __init__(self, logger: Logger, poolMinSize: int = POSTGRES_POOL_MIN_SIZE,
+                 poolMaxSize: int = POSTGRES_POOL_MAX_SIZE):
+        self.logger = logger
+
+        self.pool = AsyncConnectionPool(getPostgresConnectionInfo(),
+                                        min_size=poolMinSize,
+                                        max_size=max(poolMinSize, poolMaxSize),
+                                        max_idle=POSTGRES_POOL_MAX_IDLE,
+                                        timeout=POSTGRES_POOL_TIMEOUT,
+                                        check=AsyncConnectionPool.check_connection,
+                                        kwargs={"autocommit": True},
+                                        open=False)
+
+    async def open(self):
+        """
+        Opens the connection pool. Fails if the database is not reachable
+        """
+        await self.pool.open(wait=True, timeout=POSTGRES_POOL_TIMEOUT)
+
+    async def getNonExtractedIds(self, afterArticleId: UUID = None):
+        """
+        Gets article ids for articles that has not been feature extracted. Rows are streamed from a server side
+        cursor {NON_EXTRACTED_IDS_ITERSIZE} at a time, so memory does not grow with the backlog
+        :param afterArticleId: Only read articles with a greater id. Used to resume an interrupted read
+        :return: async generator of article ids that requires extraction
+        """
+        # Named cursors only live inside a transaction
+        async with self.pool.connection() as connection, connection.transaction():
+            async with connection.cursor(name=NON_EXTRACTED_IDS_CURSOR_NAME) as cursor:
+                cursor.itersize = NON_EXTRACTED_IDS_ITERSIZE
+                if afterArticleId is None:
+                    await cursor.execute(GET_NON_EXTRACTED_IDS_QUERY)
+                else:
+                    await cursor.execute(GET_NON_EXTRACTED_IDS_AFTER_QUERY, (afterArticleId,))
+
+                async for row in cursor:
+                    yield ArticleInfo(row[0], row[1])
+
+    async def getNonExtractedIdsWithRetry(self):
+        """
+        Gets article ids for articles that has not been feature extracted as they are read.
+        A retry resumes after the last returned id. Stops reading when retries are exhausted
+        :return: async generator of article ids that requires extraction
+        """
+        self.logger.info("Reading Article ids to extract")
+        lastArticleId = None
+        count = 0
+        failures = 0
+
+        while True:
+            try:
+                async for articleInfo in self.getNonExtractedIds(lastArticleId):
+                    lastArticleId = articleInfo.articleId
+                    count += 1
+                    yield articleInfo
+                break
+            except Exception as err:
+                self.logger.error("Failed to read from db", exc_info=err)
+                failures += 1
+                if failures >= DB_MAX_RETRIES:
+                    self.logger.error("Retries Exhausted")
+                    break
+
+        self.logger.info("Read %s articles to process", str(count))
+
+    def logPoolStats(self):
+        """
+        Logs connection pool usage
+        """
+        stats = self.pool.get_stats()
+        self.logger.info("Connection pool: %s/%s connections in use, %s waiting",
+                         stats["pool_size"] - stats["pool_available"], stats["pool_max"],
+                         stats.get("requests_waiting", 0))
+
+    async def close(self):
+        """
+        Closes the connection pool
+        """
+        await self.pool.close()
@@ -0,0 +1,23 @@
+from logging import Logger
+from typing import Awaitable, Callable
+
+from src.config import DB_MAX_RETRIES
+
+
+async def retryAsync(logger: Logger, action: Callable[[], Awaitable], errorMessage: str, default=None):
+    """
+    Awaits an action and retries it when it fails. Mirrors the retry operators of the Rx services
+    :param logger: Logger to report failures
+    :param action: Function creating the awaitable to run on every attempt
+    :param errorMessage: Message logged when an attempt fails
+    :param default: Value returned when all {DB_MAX_RETRIES} attempts failed
+    :return: Result of the action or default
+    """
+    for attempt in range(DB_MAX_RETRIES):
+        try:
+            return await action()
+        except Exception as err:
+            logger.error(errorMessage, exc_info=err)
+
+    logger.error("Retries Exhausted")
+    return default
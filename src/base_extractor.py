@@ -8,10 +8,11 @@ class BaseExtractor(ABC):
     """
 
     @abstractmethod
-    def extract_features(self, article: ArticleContent):
+    def extract_features(self, article: ArticleContent, writer=None):
         """
         Extracts Features from provided article and inserts into database as required
         :param article: Article to grab features
+        :param writer: ArticleWriter collecting the writes of the article. Writes go directly to the db when None
         :return: Observable that extracts features and inserts into db
         """
         pass
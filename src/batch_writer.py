@@ -0,0 +1,93 @@
+import threading
+from logging import Logger
+from typing import Callable
+
+import reactivex as rx
+from reactivex import operators as ops
+
+from src.config import DB_MAX_RETRIES
+from src.exceptions import DisposedException
+
+
+class BufferedBatchWriter:
+    """
+    Buffers items and writes them as a single batch once {flushSize} items are buffered
+    or {flushInterval} seconds have passed since the last periodic flush
+    """
+
+    def __init__(self, logger: Logger, writeBatch: Callable[[list], None], flushSize: int, flushInterval: float):
+        self.logger = logger
+        self.writeBatch = writeBatch
+        self.flushSize = flushSize
+        self.flushInterval = flushInterval
+
+        self._buffer = []
+        self._bufferLock = threading.Lock()
+        # Only one batch is written at a time so batches are written in the order they were buffered
+        self._flushLock = threading.Lock()
+        self._closed = threading.Event()
+
+        self._flushThread = threading.Thread(target=self._flushPeriodically, daemon=True)
+        self._flushThread.start()
+
+    def add(self, item):
+        """
+        Adds item to buffer. Flushes in the calling thread if the buffer is full
+        :param item: Item to write
+        """
+        self.addAll([item])
+
+    def addAll(self, items: list):
+        """
+        Adds items to buffer. Flushes in the calling thread if the buffer is full
+        :param items: Items to write
+        """
+        if self._closed.is_set():
+            raise DisposedException()
+
+        with self._bufferLock:
+            self._buffer.extend(items)
+            isFull = len(self._buffer) >= self.flushSize
+
+        if isFull:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes all buffered items. Blocks until the write completes or retries are exhausted
+        """
+        with self._flushLock:
+            with self._bufferLock:
+                batch = self._buffer
+                self._buffer = []
+
+            if len(batch) == 0:
+                return
+
+            rx.of(batch).pipe(
+                ops.do_action(self.writeBatch),
+                # Retry
+                ops.do_action(on_error=lambda err: self.logger.error("Failed to write batch to db", exc_info=err)),
+                ops.retry(DB_MAX_RETRIES),
+                ops.do_action(on_error=lambda err: self.logger.error(
+                    "Retries Exhausted. Dropped batch of %s items", str(len(batch)), exc_info=err)),
+                ops.catch(rx.empty()),
+                # Ensures something is always returned
+                ops.to_list()
+            ).run()
+
+    def __len__(self):
+        with self._bufferLock:
+            return len(self._buffer)
+
+    def _flushPeriodically(self):
+        while not self._closed.wait(self.flushInterval):
+            self.flush()
+
+    def close(self):
+        """
+        Stops periodic flushing and writes remaining items
+        """
+        self._closed.set()
+        self._flushThread.join()
+        self.flush()
@@ -18,14 +18,15 @@ class CategoryAssigner(BaseExtractor):
             ops.replay(buffer_size=1),
         )
 
-    def extract_features(self, article: ArticleContent):
+    def extract_features(self, article: ArticleContent, writer=None):
+        writer = self.postgresService if writer is None else writer
         return rx.of(article).pipe(
             # Find Category
             ops.flat_map(lambda a: self.get_category(a)),
             # If None, writing is not required
             ops.filter(lambda item: item is not None),
             # Write Category
-            ops.flat_map(lambda category_rule: self.insert_category(article, category_rule)),
+            ops.flat_map(lambda category_rule: self.insert_category(article, category_rule, writer)),
             # Error Handling
             ops.do_action(on_error=lambda err: self.logger.error("Error occurred in Category Assigner", exc_info=err)),
             ops.catch(rx.empty()),
@@ -49,5 +50,6 @@ class CategoryAssigner(BaseExtractor):
             ops.catch(rx.empty()),
         )
 
-    def insert_category(self, article: ArticleContent, category: CategoryAssignerRule):
-        return self.postgresService.insertCategoryArticleAsStream(str(category.category_id), article.articleId)
+    def insert_category(self, article: ArticleContent, category: CategoryAssignerRule, writer=None):
+        writer = self.postgresService if writer is None else writer
+        return writer.insertCategoryArticleAsStream(str(category.category_id), article.articleId)
@@ -0,0 +1,87 @@
+import math
+import threading
+
+from src.collections import ArticleContent
+from src.config import *
+
+
+def articleSize(article: ArticleContent):
+    """
+    :return: Size of the content of an article, in bytes for raw content and characters otherwise
+    """
+    return len(article.articleContent) if article.articleContent is not None else 0
+
+
+class ChunkSizer:
+    """
+    Splits articles into chunks sent to the process pool in a single message, so small articles share the
+    serialization and IPC cost. Chunks are sized to take about {targetLatency} seconds to extract based on an
+    exponentially weighted moving average of the observed time per article, and never exceed {maxArticles}
+    articles or {maxBytes} bytes of content. A batch is never split into fewer chunks than there are workers
+    """
+
+    def __init__(self, workers: int, targetLatency: float = CHUNK_TARGET_LATENCY,
+                 maxArticles: int = CHUNK_MAX_ARTICLES, maxBytes: int = CHUNK_MAX_BYTES,
+                 smoothing: float = CHUNK_LATENCY_SMOOTHING):
+        self.workers = max(1, workers)
+        self.targetLatency = targetLatency
+        self.maxArticles = max(1, maxArticles)
+        self.maxBytes = maxBytes
+        self.smoothing = smoothing
+        # Seconds per article, None until a chunk completed
+        self.articleLatency = None
+        self._lock = threading.Lock()
+
+    def targetArticles(self):
+        """
+        :return: Number of articles per chunk for the current latency
+        """
+        with self._lock:
+            articleLatency = self.articleLatency
+        if articleLatency is None:
+            # Start small until latency is known
+            return 1
+        if articleLatency <= 0:
+            return self.maxArticles
+        return max(1, min(self.maxArticles, int(self.targetLatency / articleLatency)))
+
+    def split(self, articles: list[ArticleContent]):
+        """
+        Splits articles into chunks
+        :param articles: Articles to split
+        :return: List of chunks, each a list of articles
+        """
+        # Spread batches across all workers
+        targetArticles = min(self.targetArticles(), math.ceil(len(articles) / self.workers))
+
+        chunks = []
+        chunk = []
+        chunkBytes = 0
+        for article in articles:
+            size = articleSize(article)
+            if len(chunk) > 0 and (len(chunk) >= targetArticles or chunkBytes + size > self.maxBytes):
+                chunks.append(chunk)
+                chunk = []
+                chunkBytes = 0
+            chunk.append(article)
+            chunkBytes += size
+
+        if len(chunk) > 0:
+            chunks.append(chunk)
+        return chunks
+
+    def observe(self, articleCount: int, durationSeconds: float):
+        """
+        Records the time a chunk took to extract
+        :param articleCount: Number of articles of the chunk
+        :param durationSeconds: Time the chunk took to extract in its process
+        """
+        if articleCount == 0:
+            return
+
+        articleLatency = durationSeconds / articleCount
+        with self._lock:
+            if self.articleLatency is None:
+                self.articleLatency = articleLatency
+            else:
+                self.articleLatency += self.smoothing * (articleLatency - self.articleLatency)
@@ -1,4 +1,5 @@
 from collections import OrderedDict
+from typing import Optional, Union
 from uuid import UUID
 import re
 
@@ -26,19 +27,72 @@ class IOCResult:
 
 class ArticleContent:
     """
-    Object containing Article content and id
+    Object containing Article content and id. Content read as raw BSON is kept as UTF-8 bytes until {decoded}
     """
-    def __init__(self, articleId: UUID, articleContent: str, sourceId: int):
+    def __init__(self, articleId: UUID, articleContent: Union[str, bytes], sourceId: int):
         self.articleId = articleId
         self.articleContent = articleContent
         self.sourceId = sourceId
 
+    def decoded(self):
+        """
+        :return: Article Content with str content
+        """
+        if isinstance(self.articleContent, str):
+            return self
+        return ArticleContent(self.articleId, self.articleContent.decode('utf-8', errors='replace'), self.sourceId)
+
     def __eq__(self, other):
         return (isinstance(other, ArticleContent)
                 and self.articleId == other.articleId
                 and self.articleContent == other.articleContent
                 and self.sourceId == other.sourceId)
 
+class ArticleFeatures:
+    """
+    Features extracted from an article, written to the db by the main process
+    """
+    def __init__(self, articleId: UUID, iocs: list[tuple[str, int]], categoryIds: list[str]):
+        self.articleId = articleId
+        # (normalized IOC value, IOC type id) pairs
+        self.iocs = iocs
+        self.categoryIds = categoryIds
+
+    def __eq__(self, other):
+        return (isinstance(other, ArticleFeatures)
+                and self.articleId == other.articleId
+                and self.iocs == other.iocs
+                and self.categoryIds == other.categoryIds)
+
+class ArticleDescriptor:
+    """
+    Location of the content of an article in an ArticleArena
+    """
+    def __init__(self, articleId: UUID, sourceId: int, offset: int, length: int):
+        self.articleId = articleId
+        self.sourceId = sourceId
+        self.offset = offset
+        self.length = length
+
+class ExtractionResult:
+    """
+    Outcome of the extraction of an article in the process pool
+    """
+    def __init__(self, articleId: UUID, succeeded: bool, durationSeconds: float, error: Optional[str] = None,
+                 features: Optional[ArticleFeatures] = None):
+        self.articleId = articleId
+        self.succeeded = succeeded
+        self.durationSeconds = durationSeconds
+        self.error = error
+        # Set when the main process writes the features
+        self.features = features
+
+    def __eq__(self, other):
+        return (isinstance(other, ExtractionResult)
+                and self.articleId == other.articleId
+                and self.succeeded == other.succeeded
+                and self.error == other.error)
+
 class IOCFilterPattern:
     def __init__(self, typeId: int, pattern: str):
         self.typeId = typeId
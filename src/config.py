@@ -1,4 +1,5 @@
 import os
+import socket
 
 # Db Variables
 POSTGRES_HOST = os.getenv('POSTGRES_HOST')
@@ -12,11 +13,81 @@ MONGO_USERNAME = os.getenv('MONGO_USERNAME')
 MONGO_PASSWORD = os.getenv('MONGO_PASSWORD')
 MONGO_DB_NAME = os.getenv('MONGO_DB_NAME')
 MONGO_COLLECTION = os.getenv('MONGO_COLLECTION', "articleContent")
+# Reads documents as raw BSON, article content is then decoded by the extraction processes only
+MONGO_RAW_BSON_ENABLED = os.getenv('MONGO_RAW_BSON_ENABLED', 'false').lower() == 'true'
+# Articles read per query, also the number of documents per round trip
+MONGO_FETCH_BATCH_SIZE = int(os.getenv('MONGO_FETCH_BATCH_SIZE', '500'))
+# Maximum time in seconds an article id waits for its batch to fill
+MONGO_FETCH_BATCH_INTERVAL = float(os.getenv('MONGO_FETCH_BATCH_INTERVAL', '0.5'))
 DB_MAX_RETRIES = int(os.getenv('DB_MAX_RETRIES', "3"))
 
+# Postgres connection pool (per process)
+POSTGRES_POOL_MIN_SIZE = int(os.getenv('POSTGRES_POOL_MIN_SIZE', '1'))
+POSTGRES_POOL_MAX_SIZE = int(os.getenv('POSTGRES_POOL_MAX_SIZE', os.getenv('THREADS_PER_CORE', '3')))
+POSTGRES_POOL_MAX_IDLE = float(os.getenv('POSTGRES_POOL_MAX_IDLE', '600'))
+POSTGRES_POOL_TIMEOUT = float(os.getenv('POSTGRES_POOL_TIMEOUT', '30'))
+
+# Number of article ids fetched per round trip while streaming the backlog
+NON_EXTRACTED_IDS_ITERSIZE = int(os.getenv('NON_EXTRACTED_IDS_ITERSIZE', '1000'))
+
+# Bulk writes of article relations (ioc_articles, article_category)
+BULK_WRITE_ENABLED = os.getenv('BULK_WRITE_ENABLED', 'false').lower() == 'true'
+BULK_FLUSH_SIZE = int(os.getenv('BULK_FLUSH_SIZE', '5000'))
+BULK_FLUSH_INTERVAL = float(os.getenv('BULK_FLUSH_INTERVAL', '5'))
+MARK_EXTRACTED_FLUSH_SIZE = int(os.getenv('MARK_EXTRACTED_FLUSH_SIZE', '500'))
+MARK_EXTRACTED_FLUSH_INTERVAL = float(os.getenv('MARK_EXTRACTED_FLUSH_INTERVAL', '5'))
+PIPELINE_WRITES_ENABLED = os.getenv('PIPELINE_WRITES_ENABLED', 'false').lower() == 'true'
+TRANSACTIONAL_WRITES_ENABLED = os.getenv('TRANSACTIONAL_WRITES_ENABLED', 'false').lower() == 'true'
+ARTICLE_TRANSACTION_BATCH_SIZE = int(os.getenv('ARTICLE_TRANSACTION_BATCH_SIZE', '1'))
+ARTICLE_TRANSACTION_FLUSH_INTERVAL = float(os.getenv('ARTICLE_TRANSACTION_FLUSH_INTERVAL', '5'))
+
+# Extraction processes only compute features, the main process writes them in batches across articles
+PARENT_WRITES_ENABLED = os.getenv('PARENT_WRITES_ENABLED', 'false').lower() == 'true'
+PARENT_WRITE_FLUSH_SIZE = int(os.getenv('PARENT_WRITE_FLUSH_SIZE', '200'))
+PARENT_WRITE_FLUSH_INTERVAL = float(os.getenv('PARENT_WRITE_FLUSH_INTERVAL', '2'))
+
+# Shared index of known IOCs, loaded at startup
+KNOWN_IOC_INDEX_ENABLED = os.getenv('KNOWN_IOC_INDEX_ENABLED', 'false').lower() == 'true'
+KNOWN_IOC_INDEX_HEADROOM = int(os.getenv('KNOWN_IOC_INDEX_HEADROOM', '100000'))
+KNOWN_IOC_INDEX_BLOOM_BITS_PER_ENTRY = int(os.getenv('KNOWN_IOC_INDEX_BLOOM_BITS_PER_ENTRY', '0'))
+KNOWN_IOCS_ITERSIZE = int(os.getenv('KNOWN_IOCS_ITERSIZE', '10000'))
+
+# Lease based claiming so several instances can extract from the same databases
+CLAIM_MODE_ENABLED = os.getenv('CLAIM_MODE_ENABLED', 'false').lower() == 'true'
+INSTANCE_ID = os.getenv('INSTANCE_ID', socket.gethostname())
+CLAIM_BATCH_SIZE = int(os.getenv('CLAIM_BATCH_SIZE', '100'))
+CLAIM_MAX_IN_FLIGHT = int(os.getenv('CLAIM_MAX_IN_FLIGHT', str(2 * CLAIM_BATCH_SIZE)))
+CLAIM_LEASE_DURATION = float(os.getenv('CLAIM_LEASE_DURATION', '300'))
+CLAIM_RENEW_INTERVAL = float(os.getenv('CLAIM_RENEW_INTERVAL', '60'))
+
+# Continuous extraction driven by notifications, with periodic sweeps for missed notifications
+DAEMON_MODE_ENABLED = os.getenv('DAEMON_MODE_ENABLED', 'false').lower() == 'true'
+DAEMON_NOTIFY_CHANNEL = os.getenv('DAEMON_NOTIFY_CHANNEL', 'articles_to_extract')
+DAEMON_SWEEP_INTERVAL = float(os.getenv('DAEMON_SWEEP_INTERVAL', '300'))
+DAEMON_DEDUPE_TTL = float(os.getenv('DAEMON_DEDUPE_TTL', '60'))
+DAEMON_SHUTDOWN_TIMEOUT = float(os.getenv('DAEMON_SHUTDOWN_TIMEOUT', '60'))
+DAEMON_RECONNECT_DELAY = float(os.getenv('DAEMON_RECONNECT_DELAY', '5'))
+
+# Chunks of articles sent to a worker process in a single message
+CHUNK_TARGET_LATENCY = float(os.getenv('CHUNK_TARGET_LATENCY', '0.1'))
+CHUNK_MAX_ARTICLES = int(os.getenv('CHUNK_MAX_ARTICLES', '64'))
+CHUNK_MAX_BYTES = int(os.getenv('CHUNK_MAX_BYTES', str(1024 * 1024)))
+CHUNK_LATENCY_SMOOTHING = float(os.getenv('CHUNK_LATENCY_SMOOTHING', '0.2'))
+
+# Size in bytes of the shared memory article content is sent through to worker processes, 0 disables it
+ARTICLE_ARENA_SIZE = int(os.getenv('ARTICLE_ARENA_SIZE', '0'))
+
+# Articles between reading their id and completing extraction in the reactivex engine, by count and content size
+IN_FLIGHT_MAX_ARTICLES = int(os.getenv('IN_FLIGHT_MAX_ARTICLES', '1000'))
+IN_FLIGHT_MAX_BYTES = int(os.getenv('IN_FLIGHT_MAX_BYTES', str(512 * 1024 * 1024)))
+
 # Threading Variables
 THREADS_PER_CORE = int(os.getenv('THREADS_PER_CORE', "3"))
 
+# Extraction engine. "reactivex" runs db calls on thread pools, "asyncio" runs them on a single event loop
+EXTRACTION_ENGINE = os.getenv('EXTRACTION_ENGINE', 'reactivex')
+ASYNC_MAX_IN_FLIGHT = int(os.getenv('ASYNC_MAX_IN_FLIGHT', '1000'))
+
 # Retry mechanism
 PROGRAM_TIMEOUT = float(os.getenv('PROGRAM_TIMEOUT', "10800"))
 
@@ -0,0 +1,150 @@
+import threading
+import time
+from logging import Logger
+from uuid import UUID
+
+from reactivex.subject import Subject
+
+from src.collections import ArticleInfo
+from src.config import *
+
+
+class ExtractionDaemon:
+    """
+    Keeps extracting articles until stopped, reusing the warm process pool of the feature extractor.
+    New articles are read as soon as a notification on {channel} names them. Notifications are not stored by
+    Postgres while nobody listens, so articles are also swept every {sweepInterval} seconds and after reconnecting.
+    An article is only extracted once while in flight and for {dedupeTtl} seconds after, as notifications and sweeps
+    overlap and articles are marked as extracted in batches
+    """
+
+    def __init__(self, logger: Logger, postgresService, featureExtractor, articleClaimer=None,
+                 channel: str = DAEMON_NOTIFY_CHANNEL, sweepInterval: float = DAEMON_SWEEP_INTERVAL,
+                 dedupeTtl: float = DAEMON_DEDUPE_TTL):
+        self.logger = logger
+        self.postgresService = postgresService
+        self.featureExtractor = featureExtractor
+        self.articleClaimer = articleClaimer
+        self.channel = channel
+        self.sweepInterval = sweepInterval
+        self.dedupeTtl = dedupeTtl
+
+        self.articleIds = Subject()
+        # Article id -> time extraction completed, None while in flight
+        self._seenArticles: dict[UUID, float] = {}
+        self._seenLock = threading.Lock()
+        self._stopped = threading.Event()
+        self._sweepRequested = threading.Event()
+        self._pipelineCompleted = threading.Event()
+
+    def run(self):
+        """
+        Extracts articles until {stop} is called. Blocks the calling thread
+        """
+        self.featureExtractor.completedArticles.subscribe(on_next=self._onArticleCompleted)
+        self.featureExtractor.buildExtractPipeline(self.articleIds).subscribe(
+            on_completed=self._pipelineCompleted.set,
+            on_error=lambda err: self._pipelineCompleted.set()
+        )
+
+        listenThread = threading.Thread(target=self._listenUntilStopped, daemon=True)
+        listenThread.start()
+
+        self.logger.info("Extraction daemon started, listening on channel %s", self.channel)
+        while not self._stopped.is_set():
+            self.sweep()
+            self._sweepRequested.wait(self.sweepInterval)
+            self._sweepRequested.clear()
+
+        listenThread.join()
+        self.articleIds.on_completed()
+        if not self._pipelineCompleted.wait(DAEMON_SHUTDOWN_TIMEOUT):
+            self.logger.error("Articles still in flight after %s seconds, shutting down", str(DAEMON_SHUTDOWN_TIMEOUT))
+
+    def stop(self):
+        """
+        Stops reading new articles. {run} returns once articles in flight completed
+        """
+        self._stopped.set()
+        self._sweepRequested.set()
+
+    def sweep(self):
+        """
+        Submits every article waiting for extraction, in claim mode the articles this instance can claim
+        """
+        self._forgetExpiredArticles()
+        try:
+            if self.articleClaimer is None:
+                articleInfos = self.postgresService.getNonExtractedIds()
+            else:
+                articleInfos = self.articleClaimer.getClaimedIds()
+
+            submitted = 0
+            for articleInfo in articleInfos:
+                if self._stopped.is_set():
+                    break
+                if self.submit(articleInfo):
+                    submitted += 1
+        except Exception as err:
+            self.logger.error("Failed to sweep articles", exc_info=err)
+            return
+
+        self.logger.info("Sweep submitted %s articles", str(submitted))
+
+    def onNotifications(self, payloads: list[str]):
+        """
+        Submits the articles named by notifications
+        :param payloads: Notification payloads, each containing an article id
+        """
+        # Claims are not made per article, wake the sweeper to claim instead
+        if self.articleClaimer is not None:
+            self._sweepRequested.set()
+            return
+
+        articleIds = []
+        for payload in payloads:
+            try:
+                articleIds.append(UUID(payload))
+            except ValueError:
+                self.logger.error("Ignored notification with payload %s", payload)
+
+        if len(articleIds) == 0:
+            return
+
+        for articleInfo in self.postgresService.getNonExtractedIdsIn(articleIds):
+            self.submit(articleInfo)
+
+    def submit(self, articleInfo: ArticleInfo):
+        """
+        Submits an article for extraction unless it is in flight or was recently extracted
+        :return: True if the article was submitted
+        """
+        with self._seenLock:
+            if articleInfo.articleId in self._seenArticles:
+                return False
+            self._seenArticles[articleInfo.articleId] = None
+
+        self.articleIds.on_next(articleInfo)
+        return True
+
+    def _onArticleCompleted(self, articleInfo: ArticleInfo):
+        with self._seenLock:
+            self._seenArticles[articleInfo.articleId] = time.monotonic()
+
+    def _forgetExpiredArticles(self):
+        expiredBefore = time.monotonic() - self.dedupeTtl
+        with self._seenLock:
+            expired = [articleId for articleId, completedAt in self._seenArticles.items()
+                       if completedAt is not None and completedAt < expiredBefore]
+            for articleId in expired:
+                del self._seenArticles[articleId]
+
+    def _listenUntilStopped(self):
+        while not self._stopped.is_set():
+            try:
+                self.postgresService.listen(self.channel, self.onNotifications, self._stopped)
+            except Exception as err:
+                self.logger.error("Lost notification channel, reconnecting", exc_info=err)
+                # Notifications sent while disconnected are lost
+                self._sweepRequested.set()
+                self._stopped.wait(DAEMON_RECONNECT_DELAY)
@@ -0,0 +1,37 @@
+from uuid import UUID
+
+import reactivex as rx
+from reactivex import operators as ops
+
+from src.collections import ArticleFeatures
+
+
+class FeatureCollector:
+    """
+    Collects the features of a single article without any db call, so extraction processes only compute.
+    Has the write streams of PostgresService used by the extractors. IOC ids are resolved when the
+    features are written by the main process
+    """
+
+    def __init__(self, articleId: UUID):
+        self.features = ArticleFeatures(articleId, [], [])
+
+    def addIOCsIfNotExistAsStream(self, iocs: list[tuple[str, int]]):
+        """
+        Collects IOCs of the article as a stream
+        :param iocs: List of (normalized IOC value, IOC type id) pairs
+        :return: Observable containing an empty dict, as no IOC id is known yet
+        """
+        self.features.iocs.extend(iocs)
+        return rx.of({})
+
+    def insertCategoryArticleAsStream(self, categoryId: str, articleId: UUID):
+        """
+        Collects the category of the article as a stream
+        :param categoryId: Category id to add
+        :param articleId: Article Id to add
+        :return: Observable that collects the category
+        """
+        return rx.of(categoryId).pipe(
+            ops.do_action(lambda category: self.features.categoryIds.append(category))
+        )
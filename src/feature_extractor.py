@@ -1,11 +1,14 @@
 import threading
 from logging import Logger
 import reactivex as rx
-from reactivex import operators as ops
+from reactivex import Observable, operators as ops
+from reactivex.scheduler import TimeoutScheduler
 from reactivex.subject import Subject
 
-from src.collections import ArticleContent
+from src.chunk_sizer import articleSize
+from src.collections import ArticleContent, ArticleInfo, ExtractionResult
 from src.config import *
+from src.in_flight_limiter import InFlightLimiter
 
 
 class FeatureExtractor:
@@ -13,8 +16,11 @@ class FeatureExtractor:
     Class for Extracting Features from articles
     """
 
-    def __init__(self, logger: Logger, postgresService, mongoService, scheduler, processPool):
+    def __init__(self, logger: Logger, postgresService, mongoService, scheduler, processPool, articleClaimer=None,
+                 inFlightLimiter: InFlightLimiter = None):
         self.completeSubject = Subject()
+        # Emits every article that left the pipeline
+        self.completedArticles = Subject()
         self.countingLock = threading.Lock()
         self.articleCount = 0
 
@@ -23,6 +29,8 @@ class FeatureExtractor:
         self.scheduler = scheduler
         self.logger = logger
         self.processPool = processPool
+        self.articleClaimer = articleClaimer
+        self.inFlightLimiter = InFlightLimiter() if inFlightLimiter is None else inFlightLimiter
 
     def complete(self):
         """
@@ -42,6 +50,10 @@ class FeatureExtractor:
             self.articleCount += 1
             if self.articleCount % LOG_FREQUENCY == 0:
                 self.logger.info("Completed extraction for %s articles", self.articleCount)
+                self.logger.info("In flight: %s articles, %.1f MB of content, %s queued in process pool",
+                                 self.inFlightLimiter.articles, self.inFlightLimiter.bytes / (1024 * 1024),
+                                 self.processPool.pendingCount())
+                self.postgresService.logPoolStats()
 
     def run(self):
         """
@@ -56,17 +68,26 @@ class FeatureExtractor:
             ops.do_action(on_error=lambda err: self.logger.error("Error occurred during execution", exc_info=err))
         ).run()
 
-    def buildExtractPipeline(self):
+    def buildExtractPipeline(self, articleIdStream: Observable = None):
         """
         Builds observable stream for ioc extractor
+        :param articleIdStream: Ids of the articles to extract. Defaults to all non-extracted articles
         :return: Observable containing IOC Extracting pipeline
         """
-        # Call Postgres to get non-extracted ids
-        return self.postgresService.getNonExtractedIdsAsStream().pipe(
-            # Get Article content from mongo as a stream
-            ops.flat_map(lambda articleId: self.mongoService.getByIdAsStream(articleId)),
-            # Extracts content
-            ops.flat_map(lambda article: self.getExtractedFeatures(article)),
+        # Call Postgres to get non-extracted ids, in claim mode only the ids leased to this instance
+        if articleIdStream is None and self.articleClaimer is None:
+            articleIdStream = self.postgresService.getNonExtractedIdsAsStream()
+        elif articleIdStream is None:
+            articleIdStream = self.articleClaimer.getClaimedIdsAsStream()
+
+        return articleIdStream.pipe(
+            # Backpressure, blocks reading ids until there is room for the article
+            ops.do_action(lambda articleInfo: self.inFlightLimiter.acquire()),
+            # Reads articles from mongo in batches, batch timers run on their own threads
+            ops.buffer_with_time_or_count(MONGO_FETCH_BATCH_INTERVAL, MONGO_FETCH_BATCH_SIZE,
+                                          scheduler=TimeoutScheduler()),
+            ops.filter(lambda articleInfos: len(articleInfos) > 0),
+            ops.flat_map(lambda articleInfos: self.extractBatch(articleInfos)),
             # Counts article
             ops.do_action(on_next=lambda article: self.countAndLog()),
             # Error handling
@@ -76,9 +97,58 @@ class FeatureExtractor:
             ops.subscribe_on(scheduler=self.scheduler),
         )
 
-    def getExtractedFeatures(self, articleContent: ArticleContent):
-        return rx.just(articleContent).pipe(
-            ops.do_action(lambda article: self.processPool.submitArticle(article)),
+    def extractBatch(self, articleInfos: list[ArticleInfo]):
+        """
+        Reads a batch of articles and extracts them, the process pool sends articles of the batch in chunks
+        :param articleInfos: Articles to extract
+        :return: Observable that emits the ExtractionResult of each article
+        """
+        contentSize = {"value": 0}
+
+        def onRead(articles: list[ArticleContent]):
+            contentSize["value"] = sum(articleSize(article) for article in articles)
+            self.inFlightLimiter.addBytes(contentSize["value"])
+
+        def onCompleted():
+            self.inFlightLimiter.release(len(articleInfos), contentSize["value"])
+            self.completeArticles(articleInfos)
+
+        return self.mongoService.getByIdsAsStream(articleInfos).pipe(
+            ops.to_list(),
+            ops.do_action(onRead),
+            ops.flat_map(lambda articles: self.getExtractedFeatures(articles)),
+            ops.finally_action(onCompleted)
+        )
+
+    def completeArticles(self, articleInfos: list[ArticleInfo]):
+        """
+        Called once a batch of articles left the pipeline, whether they were extracted or not
+        """
+        for articleInfo in articleInfos:
+            if self.articleClaimer is not None:
+                self.articleClaimer.complete(articleInfo.articleId)
+            self.completedArticles.on_next(articleInfo)
+
+    def logFailure(self, result: ExtractionResult):
+        if not result.succeeded:
+            self.logger.warning("Extraction failed for article %s: %s", str(result.articleId), result.error)
+
+    def writeFeatures(self, result: ExtractionResult):
+        """
+        Queues the features computed by the process pool when the main process writes them
+        """
+        if result.features is not None:
+            self.postgresService.queueArticleFeatures(result.features)
+
+    def getExtractedFeatures(self, articles: list[ArticleContent]):
+        if len(articles) == 0:
+            return rx.empty()
+
+        return self.processPool.submitArticlesAsStream(articles).pipe(
+            # Results are emitted by the thread collecting them from the process pool
+            ops.observe_on(self.scheduler),
+            ops.do_action(lambda result: self.logFailure(result)),
+            ops.do_action(lambda result: self.writeFeatures(result)),
             ops.do_action(on_error=lambda err: self.logger.error("Error occurred.", exc_info=err)),
             ops.catch(rx.empty()),
             # Scheduler setup
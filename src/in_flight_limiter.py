@@ -0,0 +1,47 @@
+import threading
+
+from src.config import *
+
+
+class InFlightLimiter:
+    """
+    Limits the articles between reading their id and completing their extraction, by count and by content size.
+    Reading ids blocks while {maxArticles} articles are in flight or {maxBytes} bytes of content are held, so
+    articles are only read from mongo when the process pool has capacity. Content size is only known once an
+    article was read, so the byte limit stops further reads instead of rejecting the article that exceeded it
+    """
+
+    def __init__(self, maxArticles: int = IN_FLIGHT_MAX_ARTICLES, maxBytes: int = IN_FLIGHT_MAX_BYTES):
+        self.maxArticles = max(1, maxArticles)
+        self.maxBytes = maxBytes
+        self.articles = 0
+        self.bytes = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """
+        Reserves room for an article. Blocks until there is room, an article always fits when none is in flight
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self.articles == 0 or (self.articles < self.maxArticles
+                                                                    and self.bytes < self.maxBytes))
+            self.articles += 1
+
+    def addBytes(self, size: int):
+        """
+        Records the content size of articles in flight
+        :param size: Size of the content read
+        """
+        with self._condition:
+            self.bytes += size
+
+    def release(self, articles: int, size: int = 0):
+        """
+        Releases completed articles
+        :param articles: Number of articles completed
+        :param size: Size of the content of the completed articles recorded with {addBytes}
+        """
+        with self._condition:
+            self.articles -= articles
+            self.bytes -= size
+            self._condition.notify_all()
@@ -26,18 +26,24 @@ class IocExtractor(BaseExtractor):
         self.globalFilterObservable.connect()
         self.iocSourceFilterCache = LeastRecentlyUsedDict(SOURCE_FILTER_CACHE_SIZE)
 
-    def extract_features(self, article):
+    def extract_features(self, article, writer=None):
+        writer = self.postgresService if writer is None else writer
         return rx.of(article).pipe(
             ops.map(lambda singleArt: singleArt.articleContent),
             # Remove HTML (undo escape and remove it)
             ops.map(lambda singleArt: self.removeHTML(singleArt)),
             # Extracts IOCs
             ops.flat_map(lambda singleArt: self.extractIocs(singleArt, article.sourceId)),
-            # Push IOC to db
-            ops.flat_map(lambda ioc: self.postgresService.addIOCIfNotExistAsStream(ioc.iocValue, ioc.iocType)),
+            # Push all IOCs of the article to db at once
+            ops.to_list(),
+            ops.filter(lambda iocs: len(iocs) > 0),
+            ops.flat_map(lambda iocs: writer.addIOCsIfNotExistAsStream(
+                [(ioc.iocValue, ioc.iocType) for ioc in iocs]
+            )),
+            ops.flat_map(lambda iocIdDict: rx.from_iterable(iocIdDict.values())),
             ops.filter(lambda iocId: iocId is not None),
             # Push IOC Article relation to db
-            ops.flat_map(lambda ioc_Id: self.postgresService.addArticleIocAsStream(ioc_Id, article.articleId)),
+            ops.flat_map(lambda ioc_Id: writer.addArticleIocAsStream(ioc_Id, article.articleId)),
             # Error Handling
             ops.do_action(on_error=lambda err: self.logger.error("Error occurred in IOC Extractor", exc_info=err)),
             ops.catch(rx.empty()),
@@ -1,9 +1,63 @@
 import reactivex as rx
 from reactivex import operators as ops
+from bson.raw_bson import RawBSONDocument
 from pymongo import MongoClient
 
 from src.collections import ArticleInfo, ArticleContent
 from src.config import *
+from src.raw_bson import RAW_BSON_CODEC_OPTIONS, decodeRawField, rawStringField
+
+# Only the scraped content is used by extraction
+ARTICLE_PROJECTION = {"web_scrap": 1}
+
+
+def toArticleContent(logger, articleId: ArticleInfo, document):
+    """
+    Converts an article document read from mongo to Article Content
+    :param logger: Logger used to report missing articles
+    :param articleId: Article info of the requested article
+    :param document: Document that was found or None
+    :return: Article Content object containing the article or None if the article is not available
+    """
+    if document is None:
+        logger.warning("Failed to find article with id %s. Might not be web scrapped?", str(articleId.articleId))
+        return None
+
+    if isinstance(document, RawBSONDocument):
+        # Only the content bytes are read, they are decoded by the extraction process
+        webScrapResult = rawStringField(document.raw, "web_scrap")
+    else:
+        webScrapResult = document["web_scrap"]
+
+    # Not yet web scraped
+    if webScrapResult is None:
+        logger.info("Article id %s has no web scrapped data. Marking empty", str(articleId.articleId))
+        # Empty string allows it to go through, so it may be marked as extracted while
+        # acting as if there is no content
+        webScrapResult = ""
+
+    return ArticleContent(articleId.articleId, webScrapResult, articleId.sourceId)
+
+
+def getDocumentId(document):
+    """
+    :return: Id of a document read from mongo, without decoding the rest of a raw document
+    """
+    if isinstance(document, RawBSONDocument):
+        return decodeRawField(document.raw, "_id")
+    return document["_id"]
+
+
+def getArticleCollection(client, rawBson: bool):
+    """
+    :param client: Mongo client
+    :param rawBson: Whether documents are read as raw BSON
+    :return: Collection of articles
+    """
+    database = client[MONGO_DB_NAME]
+    if rawBson:
+        return database.get_collection(MONGO_COLLECTION, codec_options=RAW_BSON_CODEC_OPTIONS)
+    return database[MONGO_COLLECTION]
 
 
 class MongoService:
@@ -11,7 +65,7 @@ class MongoService:
     Service that handles all mongo db operations
     """
 
-    def __init__(self, logger, scheduler):
+    def __init__(self, logger, scheduler, rawBson: bool = MONGO_RAW_BSON_ENABLED):
         self.logger = logger
         self.scheduler = scheduler
 
@@ -19,7 +73,7 @@ class MongoService:
                                   username=MONGO_USERNAME,
                                   password=MONGO_PASSWORD,
                                   uuidRepresentation='standard')
-        self.collection = self.client[MONGO_DB_NAME][MONGO_COLLECTION]
+        self.collection = getArticleCollection(self.client, rawBson)
 
     def getById(self, articleId: ArticleInfo):
         """
@@ -27,22 +81,10 @@ class MongoService:
         :param articleId: UUID of desired article.
         :return: Article Content object containing the article.
         """
-        result = self.collection.find_one({"_id": articleId.articleId, "web_scrap": {"$exists": True}})
-
-        if result is None:
-            self.logger.warning("Failed to find article with id %s. Might not be web scrapped?", str(articleId.articleId))
-            return None
-
-        webScrapResult = result["web_scrap"]
+        result = self.collection.find_one({"_id": articleId.articleId, "web_scrap": {"$exists": True}},
+                                          projection=ARTICLE_PROJECTION)
 
-        # Not yet web scraped
-        if webScrapResult is None:
-            self.logger.info("Article id %s has no web scrapped data. Marking empty", str(articleId.articleId))
-            # Empty string allows it to go through, so it may be marked as extracted while
-            # acting as if there is no content
-            webScrapResult = ""
-
-        return ArticleContent(articleId.articleId, webScrapResult, articleId.sourceId)
+        return toArticleContent(self.logger, articleId, result)
 
     def getByIdAsStream(self, articleId: ArticleInfo):
         """
@@ -62,3 +104,45 @@ class MongoService:
             ops.filter(lambda doc: doc is not None),
             ops.subscribe_on(scheduler=self.scheduler),
         )
+
+    def getByIds(self, articleIds: list[ArticleInfo]):
+        """
+        Get documents of many articles with a single query
+        :param articleIds: Article infos of desired articles.
+        :return: List of Article Content objects of the available articles. Missing articles are reported and skipped
+        """
+        articleInfos = {articleInfo.articleId: articleInfo for articleInfo in articleIds}
+        cursor = self.collection.find(
+            {"_id": {"$in": list(articleInfos.keys())}, "web_scrap": {"$exists": True}},
+            projection=ARTICLE_PROJECTION
+        ).batch_size(MONGO_FETCH_BATCH_SIZE)
+
+        articles = []
+        for document in cursor:
+            articleInfo = articleInfos.pop(getDocumentId(document), None)
+            if articleInfo is not None:
+                articles.append(toArticleContent(self.logger, articleInfo, document))
+
+        # Reports every article that was not found
+        for articleInfo in articleInfos.values():
+            toArticleContent(self.logger, articleInfo, None)
+
+        return articles
+
+    def getByIdsAsStream(self, articleIds: list[ArticleInfo]):
+        """
+        Get articles by ids with a single query using Observable Stream
+        :param articleIds: Article infos of desired articles.
+        :return: Observable that emits the content of every available article
+        """
+        return rx.of(articleIds).pipe(
+            # Get by ids
+            ops.map(lambda uids: self.getByIds(uids)),
+            # Retry
+            ops.do_action(on_error=lambda err: self.logger.error("Failed to read from db", exc_info=err)),
+            ops.retry(DB_MAX_RETRIES),
+            ops.do_action(on_error=lambda err: self.logger.error("Retries Exhausted", exc_info=err)),
+            ops.catch(rx.empty()),
+            ops.flat_map(lambda articles: rx.from_iterable(articles)),
+            ops.subscribe_on(scheduler=self.scheduler),
+        )
@@ -1,16 +1,86 @@
-import psycopg
-from uuid import UUID
+import select
+import threading
+from psycopg import Connection, sql
+from psycopg_pool import ConnectionPool
+from uuid import UUID, uuid4
 from logging import Logger
 import reactivex as rx
 from reactivex import Observable, operators as ops
 from collections import defaultdict
+from contextlib import contextmanager, nullcontext
 
-from src.collections import ArticleInfo, IOCFilterPattern, CategoryAssignerRule
+from src.article_writer import ArticleWriter
+from src.batch_writer import BufferedBatchWriter
+from src.collections import ArticleInfo, ArticleFeatures, IOCFilterPattern, CategoryAssignerRule
+from src.known_ioc_index import KnownIocIndex
 from src.config import *
 
+# Ordered by id so an interrupted read can resume after the last article it returned
 GET_NON_EXTRACTED_IDS_QUERY = """
     SELECT article_ID, source_ID FROM articles
     WHERE is_feature_ext = FALSE
+    ORDER BY article_ID
+"""
+
+GET_NON_EXTRACTED_IDS_AFTER_QUERY = """
+    SELECT article_ID, source_ID FROM articles
+    WHERE is_feature_ext = FALSE
+    AND article_ID > %s
+    ORDER BY article_ID
+"""
+
+NON_EXTRACTED_IDS_CURSOR_NAME = "non_extracted_ids"
+
+GET_NON_EXTRACTED_IDS_IN_QUERY = """
+    SELECT article_ID, source_ID FROM articles
+    WHERE is_feature_ext = FALSE
+    AND article_ID = ANY(%s)
+    ORDER BY article_ID
+"""
+
+# Claim mode leases articles to a single instance. A lease that is not renewed expires and can be claimed again.
+# Candidate articles are locked with SKIP LOCKED so concurrent claims pick different articles, and a lease is only
+# taken over when it is expired, which also covers claims that read the lease table before a concurrent commit.
+CREATE_ARTICLE_LEASE_TABLE_QUERY = """
+    CREATE TABLE IF NOT EXISTS article_extraction_lease (
+        article_ID uuid PRIMARY KEY,
+        instance_ID text NOT NULL,
+        expires_at timestamptz NOT NULL
+    )
+"""
+
+CLAIM_ARTICLES_QUERY = """
+    WITH candidates AS (
+        SELECT articles.article_ID, articles.source_ID FROM articles
+        LEFT JOIN article_extraction_lease lease ON lease.article_ID = articles.article_ID
+        WHERE articles.is_feature_ext = FALSE
+        AND (lease.article_ID IS NULL OR lease.expires_at < now())
+        ORDER BY articles.article_ID
+        LIMIT %(batchSize)s
+        FOR UPDATE OF articles SKIP LOCKED
+    ), claimed AS (
+        INSERT INTO article_extraction_lease (article_ID, instance_ID, expires_at)
+        SELECT article_ID, %(instanceId)s, now() + make_interval(secs => %(leaseDuration)s) FROM candidates
+        ON CONFLICT (article_ID) DO UPDATE
+        SET instance_ID = EXCLUDED.instance_ID, expires_at = EXCLUDED.expires_at
+        WHERE article_extraction_lease.expires_at < now()
+        RETURNING article_ID
+    )
+    SELECT candidates.article_ID, candidates.source_ID FROM candidates
+    JOIN claimed ON claimed.article_ID = candidates.article_ID
+    ORDER BY candidates.article_ID
+"""
+
+RENEW_LEASES_QUERY = """
+    UPDATE article_extraction_lease
+    SET expires_at = now() + make_interval(secs => %(leaseDuration)s)
+    WHERE instance_ID = %(instanceId)s
+    AND article_ID = ANY(%(articleIds)s)
+"""
+
+RELEASE_LEASES_QUERY = """
+    DELETE FROM article_extraction_lease
+    WHERE article_ID = ANY(%s)
 """
 
 MARK_EXTRACTED_QUERY = """
@@ -19,6 +89,12 @@ MARK_EXTRACTED_QUERY = """
     WHERE article_ID = %s
 """
 
+MARK_EXTRACTED_BATCH_QUERY = """
+    UPDATE articles
+    SET is_feature_ext = TRUE
+    WHERE article_ID = ANY(%s)
+"""
+
 INSERT_IOC_QUERY = """
     INSERT INTO iocs (ioc_type, ioc_value)
     VALUES (%s, %s) 
@@ -31,6 +107,41 @@ GET_IOC_ID_QUERY = """
     AND ioc_value = %s
 """
 
+# Resolves a whole set of IOCs in one statement. Rows inserted by the CTE are not visible to the
+# second SELECT (same snapshot), so new IOCs come from RETURNING and existing ones from the join.
+# Input is sorted so concurrent batches take row locks in the same order.
+ADD_IOCS_QUERY = """
+    WITH input (ioc_type, ioc_value) AS (
+        SELECT DISTINCT * FROM unnest(%s::int[], %s::text[])
+    ), inserted AS (
+        INSERT INTO iocs (ioc_type, ioc_value)
+        SELECT ioc_type, ioc_value FROM input
+        ORDER BY ioc_type, ioc_value
+        ON CONFLICT DO NOTHING
+        RETURNING ioc_ID, ioc_type, ioc_value
+    )
+    SELECT ioc_ID, ioc_type, ioc_value FROM inserted
+    UNION ALL
+    SELECT iocs.ioc_ID, iocs.ioc_type, iocs.ioc_value FROM iocs
+    JOIN input ON iocs.ioc_type = input.ioc_type AND iocs.ioc_value = input.ioc_value
+"""
+
+GET_IOC_COUNT_QUERY = """
+    SELECT count(*) FROM iocs
+"""
+
+GET_IOCS_QUERY = """
+    SELECT ioc_ID, ioc_type, ioc_value FROM iocs
+"""
+
+IOCS_CURSOR_NAME = "known_iocs"
+
+GET_IOC_IDS_QUERY = """
+    SELECT iocs.ioc_ID, iocs.ioc_type, iocs.ioc_value FROM iocs
+    JOIN unnest(%s::int[], %s::text[]) AS input (ioc_type, ioc_value)
+    ON iocs.ioc_type = input.ioc_type AND iocs.ioc_value = input.ioc_value
+"""
+
 ADD_ARTICLE_IOC_QUERY = """
     INSERT INTO ioc_articles (article_ID, ioc_ID)
     VALUES (%s, %s)
@@ -55,63 +166,290 @@ INSERT_CATEGORY_QUERY = """
     VALUES (%s, %s)
 """
 
+# Bulk write mode streams relation rows into unlogged staging tables with COPY, then moves a whole flush
+# into the target table with one statement. Rows are tagged with a batch id so concurrent flushes
+# from other processes never merge or delete each other's rows.
+CREATE_IOC_ARTICLES_STAGING_QUERY = """
+    CREATE UNLOGGED TABLE IF NOT EXISTS ioc_articles_staging (
+        batch_ID uuid NOT NULL,
+        article_ID uuid NOT NULL,
+        ioc_ID bigint NOT NULL
+    )
+"""
+
+COPY_IOC_ARTICLES_STAGING_QUERY = """
+    COPY ioc_articles_staging (batch_ID, article_ID, ioc_ID) FROM STDIN
+"""
+
+MERGE_IOC_ARTICLES_QUERY = """
+    WITH staged AS (
+        DELETE FROM ioc_articles_staging
+        WHERE batch_ID = %s
+        RETURNING article_ID, ioc_ID
+    )
+    INSERT INTO ioc_articles (article_ID, ioc_ID)
+    SELECT DISTINCT article_ID, ioc_ID FROM staged
+    ON CONFLICT DO NOTHING
+"""
+
+CREATE_ARTICLE_CATEGORY_STAGING_QUERY = """
+    CREATE UNLOGGED TABLE IF NOT EXISTS article_category_staging (
+        batch_ID uuid NOT NULL,
+        category_id bigint NOT NULL,
+        article_id uuid NOT NULL
+    )
+"""
+
+COPY_ARTICLE_CATEGORY_STAGING_QUERY = """
+    COPY article_category_staging (batch_ID, category_id, article_id) FROM STDIN
+"""
+
+MERGE_ARTICLE_CATEGORY_QUERY = """
+    WITH staged AS (
+        DELETE FROM article_category_staging
+        WHERE batch_ID = %s
+        RETURNING category_id, article_id
+    )
+    INSERT INTO article_category (category_id, article_id)
+    SELECT DISTINCT category_id, article_id FROM staged
+    ON CONFLICT DO NOTHING
+"""
+
+
+def getPostgresConnectionInfo():
+    """
+    Builds the connection string of the postgres database from the environment
+    """
+    return ("postgresql://{}:{}/{}?user={}&password={}"
+            .format(POSTGRES_HOST,
+                    POSTGRES_PORT,
+                    POSTGRES_DB_NAME,
+                    POSTGRES_USERNAME,
+                    POSTGRES_PASSWORD))
+
 
 class PostgresService:
     """
     Service that handles all Postgres Db Operations
     """
 
-    def __init__(self, logger: Logger, scheduler):
+    def __init__(self, logger: Logger, scheduler, bulkWrite: bool = BULK_WRITE_ENABLED,
+                 poolMinSize: int = POSTGRES_POOL_MIN_SIZE, poolMaxSize: int = POSTGRES_POOL_MAX_SIZE,
+                 pipelineWrites: bool = PIPELINE_WRITES_ENABLED,
+                 transactionalWrites: bool = TRANSACTIONAL_WRITES_ENABLED,
+                 knownIocIndex: KnownIocIndex = None, claimMode: bool = CLAIM_MODE_ENABLED,
+                 parentWrites: bool = PARENT_WRITES_ENABLED):
         self.logger = logger
         self.scheduler = scheduler
-
-        self.connection = psycopg.connect("postgresql://{}:{}/{}?user={}&password={}"
-                                          .format(POSTGRES_HOST,
-                                                  POSTGRES_PORT,
-                                                  POSTGRES_DB_NAME,
-                                                  POSTGRES_USERNAME,
-                                                  POSTGRES_PASSWORD),
-                                          autocommit=True)
-
-    def getNonExtractedIds(self):
-        """
-        Gets article ids for articles that has not been feature extracted
-        :return: list of article ids that requires extraction as UUID
-        """
-        with self.connection.cursor() as cursor:
-            cursor.execute(GET_NON_EXTRACTED_IDS_QUERY)
-
-            result = cursor.fetchall()
-            return [ArticleInfo(row[0], row[1]) for row in result]
+        self.bulkWrite = bulkWrite
+        self.pipelineWrites = pipelineWrites
+        self.transactionalWrites = transactionalWrites
+        self.knownIocIndex = knownIocIndex
+        self.claimMode = claimMode
+        self.parentWrites = parentWrites
+
+        # Every call borrows its own connection so threads do not serialize on a shared connection
+        self.pool = ConnectionPool(getPostgresConnectionInfo(),
+                                   min_size=poolMinSize,
+                                   max_size=max(poolMinSize, poolMaxSize),
+                                   max_idle=POSTGRES_POOL_MAX_IDLE,
+                                   timeout=POSTGRES_POOL_TIMEOUT,
+                                   check=ConnectionPool.check_connection,
+                                   kwargs={"autocommit": True},
+                                   open=True)
+        # Fail on startup if the database is not reachable
+        self.pool.wait(POSTGRES_POOL_TIMEOUT)
+
+        if bulkWrite:
+            self.articleIocWriter = BufferedBatchWriter(logger, self.copyArticleIocs,
+                                                        BULK_FLUSH_SIZE, BULK_FLUSH_INTERVAL)
+            self.categoryArticleWriter = BufferedBatchWriter(logger, self.copyCategoryArticles,
+                                                             BULK_FLUSH_SIZE, BULK_FLUSH_INTERVAL)
+
+        self.extractedArticleMarker = BufferedBatchWriter(logger, self.markArticlesAsExtracted,
+                                                          MARK_EXTRACTED_FLUSH_SIZE, MARK_EXTRACTED_FLUSH_INTERVAL)
+
+        if transactionalWrites:
+            self.articleTransactionWriter = BufferedBatchWriter(logger, self.commitArticles,
+                                                                ARTICLE_TRANSACTION_BATCH_SIZE,
+                                                                ARTICLE_TRANSACTION_FLUSH_INTERVAL)
+
+        if parentWrites:
+            self.articleFeatureWriter = BufferedBatchWriter(logger, self.writeArticleFeatures,
+                                                            PARENT_WRITE_FLUSH_SIZE, PARENT_WRITE_FLUSH_INTERVAL)
+
+    def getNonExtractedIds(self, afterArticleId: UUID = None):
+        """
+        Gets article ids for articles that has not been feature extracted. Rows are streamed from a server side
+        cursor {NON_EXTRACTED_IDS_ITERSIZE} at a time, so memory does not grow with the backlog
+        :param afterArticleId: Only read articles with a greater id. Used to resume an interrupted read
+        :return: generator of article ids that requires extraction
+        """
+        # Named cursors only live inside a transaction
+        with self.pool.connection() as connection, connection.transaction():
+            with connection.cursor(name=NON_EXTRACTED_IDS_CURSOR_NAME) as cursor:
+                cursor.itersize = NON_EXTRACTED_IDS_ITERSIZE
+                if afterArticleId is None:
+                    cursor.execute(GET_NON_EXTRACTED_IDS_QUERY)
+                else:
+                    cursor.execute(GET_NON_EXTRACTED_IDS_AFTER_QUERY, (afterArticleId,))
+
+                for row in cursor:
+                    yield ArticleInfo(row[0], row[1])
 
     def getNonExtractedIdsAsStream(self):
         """
-        Gets article ids for articles that has not been feature extracted as a stream
+        Gets article ids for articles that has not been feature extracted as a stream.
+        Ids are emitted as they are read. A retry resumes after the last emitted id
         :return: Observable that emits all article ids that requires extraction
         """
-        # Start stream with value so when database calls are called, errors are transmitted into stream
-        return rx.of(0).pipe(
-            ops.do_action(on_next=lambda v: self.logger.info("Reading Article ids to extract")),
-            # Extract id
-            ops.map(lambda b: self.getNonExtractedIds()),
+        readState = {"lastArticleId": None, "count": 0}
+
+        def onArticleRead(articleInfo: ArticleInfo):
+            readState["lastArticleId"] = articleInfo.articleId
+            readState["count"] += 1
+
+        def readIds(scheduler):
+            self.logger.info("Reading Article ids to extract")
+            return rx.from_iterable(self.getNonExtractedIds(readState["lastArticleId"]))
+
+        # Deferred so every retry starts a new read from the last emitted id
+        return rx.defer(readIds).pipe(
+            ops.do_action(on_next=onArticleRead),
             # Retry
             ops.do_action(on_error=lambda err: self.logger.error("Failed to read from db", exc_info=err)),
             ops.retry(DB_MAX_RETRIES),
             ops.do_action(on_error=lambda err: self.logger.error("Retries Exhausted", exc_info=err)),
             ops.catch(rx.empty()),
-            # Split array into individual elements
-            ops.do_action(on_next=lambda idList: self.logger.info("Found %s articles to process", str(len(idList)))),
-            ops.flat_map(lambda idList: rx.from_iterable(idList)),
+            ops.do_action(on_completed=lambda: self.logger.info("Read %s articles to process", str(readState["count"]))),
             # Scheduler setup
             ops.subscribe_on(self.scheduler)
         )
 
+    def getIocCount(self):
+        """
+        Gets the number of IOCs in db
+        """
+        with self.pool.connection() as connection, connection.cursor() as cursor:
+            cursor.execute(GET_IOC_COUNT_QUERY)
+            return cursor.fetchone()[0]
+
+    def getIocs(self):
+        """
+        Gets all IOCs in db. Rows are streamed from a server side cursor {KNOWN_IOCS_ITERSIZE} at a time
+        :return: generator of (IOC id, IOC type id, normalized IOC value) rows
+        """
+        # Named cursors only live inside a transaction
+        with self.pool.connection() as connection, connection.transaction():
+            with connection.cursor(name=IOCS_CURSOR_NAME) as cursor:
+                cursor.itersize = KNOWN_IOCS_ITERSIZE
+                cursor.execute(GET_IOCS_QUERY)
+
+                for row in cursor:
+                    yield row[0], row[1], row[2]
+
+    def loadKnownIocIndex(self, headroom: int = KNOWN_IOC_INDEX_HEADROOM,
+                          bloomBitsPerEntry: int = KNOWN_IOC_INDEX_BLOOM_BITS_PER_ENTRY):
+        """
+        Creates a known IOC index in shared memory containing every IOC in db
+        :param headroom: Number of IOCs that can be added after loading
+        :param bloomBitsPerEntry: Bits of Bloom filter per IOC. No Bloom filter is used when 0
+        :return: KnownIocIndex, owned by the caller
+        """
+        knownIocIndex = KnownIocIndex(self.getIocCount() + headroom, bloomBitsPerEntry=bloomBitsPerEntry)
+        try:
+            loaded = knownIocIndex.addAll(self.getIocs())
+        except Exception:
+            knownIocIndex.unlink()
+            raise
+
+        self.logger.info("Loaded %s known IOCs into shared index", str(loaded))
+        return knownIocIndex
+
+    def getNonExtractedIdsIn(self, articleIds: list[UUID]):
+        """
+        Gets the articles among {articleIds} that has not been feature extracted
+        :param articleIds: Article ids to check
+        :return: List of article ids that requires extraction
+        """
+        with self.pool.connection() as connection, connection.cursor() as cursor:
+            cursor.execute(GET_NON_EXTRACTED_IDS_IN_QUERY, (articleIds,))
+
+            result = cursor.fetchall()
+            return [ArticleInfo(row[0], row[1]) for row in result]
+
+    def listen(self, channel: str, onNotifications, stopped: threading.Event, pollInterval: float = 1):
+        """
+        Listens to a notification channel on a dedicated connection until {stopped} is set. Blocks the calling thread.
+        Raises when the connection is lost
+        :param channel: Channel to listen to
+        :param onNotifications: Called with the payloads of every burst of notifications received
+        :param stopped: Event that stops listening
+        :param pollInterval: Maximum time in seconds between checks of {stopped}
+        """
+        payloads = []
+        with Connection.connect(getPostgresConnectionInfo(), autocommit=True) as connection:
+            connection.add_notify_handler(lambda notify: payloads.append(notify.payload))
+            connection.execute(sql.SQL("LISTEN {}").format(sql.Identifier(channel)))
+
+            while not stopped.is_set():
+                readable, _, _ = select.select([connection.fileno()], [], [], pollInterval)
+                if len(readable) == 0:
+                    continue
+
+                # Any statement reads the notifications waiting on the socket and passes them to the handler
+                connection.execute("SELECT 1")
+                if len(payloads) > 0:
+                    onNotifications(list(payloads))
+                    payloads.clear()
+
+    def createLeaseTable(self):
+        """
+        Creates the lease table used by claim mode if it does not exist
+        """
+        with self.pool.connection() as connection, connection.cursor() as cursor:
+            cursor.execute(CREATE_ARTICLE_LEASE_TABLE_QUERY)
+
+    def claimArticles(self, instanceId: str, batchSize: int, leaseDuration: float):
+        """
+        Leases up to {batchSize} articles that has not been feature extracted and are not leased by another instance
+        :param instanceId: Id of the instance taking the leases
+        :param batchSize: Maximum number of articles to claim
+        :param leaseDuration: Time in seconds until the leases expire unless renewed
+        :return: List of claimed article ids
+        """
+        with self.pool.connection() as connection, connection.cursor() as cursor:
+            cursor.execute(CLAIM_ARTICLES_QUERY,
+                           {"batchSize": batchSize, "instanceId": instanceId, "leaseDuration": leaseDuration})
+
+            result = cursor.fetchall()
+            return [ArticleInfo(row[0], row[1]) for row in result]
+
+    def renewLeases(self, instanceId: str, articleIds: list[UUID], leaseDuration: float):
+        """
+        Extends the leases an instance holds on articles
+        :param instanceId: Id of the instance holding the leases
+        :param articleIds: Article ids of the leases to renew
+        :param leaseDuration: Time in seconds from now until the leases expire
+        """
+        with self.pool.connection() as connection, connection.cursor() as cursor:
+            cursor.execute(RENEW_LEASES_QUERY,
+                           {"instanceId": instanceId, "articleIds": articleIds, "leaseDuration": leaseDuration})
+
+    def releaseLeases(self, articleIds: list[UUID]):
+        """
+        Removes the leases on articles so they can be claimed again
+        :param articleIds: Article ids of the leases to release
+        """
+        with self.pool.connection() as connection, connection.cursor() as cursor:
+            cursor.execute(RELEASE_LEASES_QUERY, (articleIds,))
+
     def markArticleAsExtracted(self, articleId: UUID):
         """
         Marks Article in db as having been extracted.
         :param articleId: Article id to mark
         """
-        with self.connection.cursor() as cursor:
+        with self.pool.connection() as connection, connection.cursor() as cursor:
             cursor.execute(MARK_EXTRACTED_QUERY, (articleId,))
 
     def markArticleAsExtractedAsStream(self, articleId: UUID):
@@ -130,6 +468,27 @@ class PostgresService:
             ops.catch(rx.empty()),
         )
 
+    def markArticlesAsExtracted(self, articleIds: list[UUID]):
+        """
+        Marks Articles in db as having been extracted in a single statement.
+        Relations buffered by bulk write mode are written first, so an article is never marked before its features
+        :param articleIds: Article ids to mark
+        """
+        self.flush()
+
+        with self.pool.connection() as connection, connection.cursor() as cursor:
+            cursor.execute(MARK_EXTRACTED_BATCH_QUERY, (articleIds,))
+            if self.claimMode:
+                cursor.execute(RELEASE_LEASES_QUERY, (articleIds,))
+
+    def queueArticleAsExtracted(self, articleId: UUID):
+        """
+        Queues Article to be marked as extracted. Queued articles are marked together once
+        {MARK_EXTRACTED_FLUSH_SIZE} are queued, every {MARK_EXTRACTED_FLUSH_INTERVAL} seconds and on close
+        :param articleId: Article id to mark
+        """
+        self.extractedArticleMarker.add(articleId)
+
     def addIOCIfNotExist(self, normalizedIocValue: str, iocTypeId: int):
         """
         Adds IOC to db if it does not exist
@@ -137,13 +496,18 @@ class PostgresService:
         :param iocTypeId: The id number for the IOC Type
         :return: The IOC Id
         """
-        with self.connection.cursor() as cursor:
+        knownIocId = self._getKnownIocId(normalizedIocValue, iocTypeId)
+        if knownIocId is not None:
+            return knownIocId
+
+        with self.pool.connection() as connection, connection.cursor() as cursor:
             # Check if already exists
             cursor.execute(GET_IOC_ID_QUERY, (iocTypeId, normalizedIocValue))
 
             result = cursor.fetchone()
             if result is not None:
                 # Already exists
+                self._addKnownIocs({(normalizedIocValue, iocTypeId): result[0]})
                 return result[0]
 
             # It does not exist, insert into table
@@ -158,6 +522,7 @@ class PostgresService:
             if result is None:
                 self.logger.error("Failed to get recently inserted IOC into Db.")
                 return None
+            self._addKnownIocs({(normalizedIocValue, iocTypeId): result[0]})
             return result[0]
 
     def addIOCIfNotExistAsStream(self, normalizedIocValue: str, iocTypeId: int):
@@ -177,13 +542,85 @@ class PostgresService:
             ops.catch(rx.empty()),
         )
 
+    def addIOCsIfNotExist(self, iocs: list[tuple[str, int]]):
+        """
+        Adds all IOCs to db that do not exist in a single set based statement
+        :param iocs: List of (normalized IOC value, IOC type id) pairs
+        :return: Dict mapping each (normalized IOC value, IOC type id) pair to its IOC Id
+        """
+        uniqueIocs = list(dict.fromkeys(iocs))
+
+        knownIocs = {}
+        for ioc in uniqueIocs:
+            knownIocId = self._getKnownIocId(ioc[0], ioc[1])
+            if knownIocId is not None:
+                knownIocs[ioc] = knownIocId
+
+        unknownIocs = [ioc for ioc in uniqueIocs if ioc not in knownIocs]
+        if len(unknownIocs) == 0:
+            return knownIocs
+
+        with self.pool.connection() as connection, connection.cursor() as cursor:
+            cursor.execute(ADD_IOCS_QUERY, self._splitIocPairs(unknownIocs))
+            result = {(row[2], row[1]): row[0] for row in cursor.fetchall()}
+
+            # IOCs inserted by a concurrent transaction after our snapshot are neither inserted nor joined
+            missingIocs = [ioc for ioc in unknownIocs if ioc not in result]
+            if len(missingIocs) > 0:
+                cursor.nextset()
+                cursor.execute(GET_IOC_IDS_QUERY, self._splitIocPairs(missingIocs))
+                result.update({(row[2], row[1]): row[0] for row in cursor.fetchall()})
+
+        if len(result) < len(unknownIocs):
+            self.logger.error("Failed to get %s recently inserted IOCs from Db.", str(len(unknownIocs) - len(result)))
+
+        self._addKnownIocs(result)
+        result.update(knownIocs)
+        return result
+
+    def _getKnownIocId(self, normalizedIocValue: str, iocTypeId: int):
+        if self.knownIocIndex is None:
+            return None
+        return self.knownIocIndex.get(normalizedIocValue, iocTypeId)
+
+    def _addKnownIocs(self, iocIds: dict[tuple[str, int], int]):
+        if self.knownIocIndex is None or len(iocIds) == 0:
+            return
+        self.knownIocIndex.addAll((iocId, ioc[1], ioc[0]) for ioc, iocId in iocIds.items())
+
+    def _splitIocPairs(self, iocs: list[tuple[str, int]]):
+        """
+        Splits (value, type id) pairs into the type id and value arrays used with unnest
+        """
+        return [ioc[1] for ioc in iocs], [ioc[0] for ioc in iocs]
+
+    def addIOCsIfNotExistAsStream(self, iocs: list[tuple[str, int]]):
+        """
+        Adds all IOCs to db that do not exist as a stream
+        :param iocs: List of (normalized IOC value, IOC type id) pairs
+        :return: Observable containing a dict mapping each pair to its IOC Id
+        """
+        return rx.of(iocs).pipe(
+            # Add IOCs
+            ops.map(lambda iocList: self.addIOCsIfNotExist(iocList)),
+            # Retry
+            ops.do_action(on_error=lambda err: self.logger.error("Failed to write to db", exc_info=err)),
+            ops.retry(DB_MAX_RETRIES),
+            ops.do_action(on_error=lambda err: self.logger.error("Retries Exhausted", exc_info=err)),
+            ops.catch(rx.empty()),
+        )
+
     def addArticleIoc(self, iocId, articleId):
         """
-        Add Article IOC Relation to db
+        Add Article IOC Relation to db. In bulk write mode the relation is buffered until the next flush
         :param iocId: IOC id to add
         :param articleId: Article Id to add
         """
-        with self.connection.cursor() as cursor:
+        if self.bulkWrite:
+            self.articleIocWriter.add((articleId, iocId))
+            return
+
+        with self.pool.connection() as connection, connection.cursor() as cursor:
             cursor.execute(ADD_ARTICLE_IOC_QUERY, (articleId, iocId))
 
     def addArticleIocAsStream(self, iocId, articleId):
@@ -230,7 +667,7 @@ class PostgresService:
             Get all global filters from db
             :return IOCFilterPattern[]: Map containing id and pattern
         """
-        with self.connection.cursor() as cursor:
+        with self.pool.connection() as connection, connection.cursor() as cursor:
             cursor.execute(GET_GLOBAL_FILTERS_QUERY)
 
             result = cursor.fetchall()
@@ -250,7 +687,7 @@ class PostgresService:
             Get all global filters from db
             :return IOCFilterPattern[]: Map containing id and pattern
         """
-        with self.connection.cursor() as cursor:
+        with self.pool.connection() as connection, connection.cursor() as cursor:
             cursor.execute(GET_SOURCE_FILTERS_QUERY, (sourceId,))
 
             result = cursor.fetchall()
@@ -271,7 +708,7 @@ class PostgresService:
             Get category rules from db
             :return CategoryAssignerRule[]: List Containing category and rules
         """
-        with self.connection.cursor() as cursor:
+        with self.pool.connection() as connection, connection.cursor() as cursor:
             cursor.execute(GET_CATEGORY_RULES_QUERY)
 
             result = cursor.fetchall()
@@ -292,7 +729,16 @@ class PostgresService:
         )
 
     def insertCategoryArticle(self, categoryId: str, articleId: UUID):
-        with self.connection.cursor() as cursor:
+        """
+        Add Article Category Relation to db. In bulk write mode the relation is buffered until the next flush
+        :param categoryId: Category id to add
+        :param articleId: Article Id to add
+        """
+        if self.bulkWrite:
+            self.categoryArticleWriter.add((categoryId, articleId))
+            return
+
+        with self.pool.connection() as connection, connection.cursor() as cursor:
             cursor.execute(INSERT_CATEGORY_QUERY, (categoryId, articleId))
 
     def insertCategoryArticleAsStream(self, categoryId: str, articleId: UUID):
@@ -306,8 +752,208 @@ class PostgresService:
             ops.catch(rx.empty()),
         )
 
+    def articleWriter(self, articleId: UUID):
+        """
+        Creates a writer that collects the relation writes of an article, see {writeArticle}
+        :param articleId: Article id the writes belong to
+        :return: ArticleWriter for the article
+        """
+        return ArticleWriter(self, articleId)
+
+    def writeArticle(self, writer: ArticleWriter):
+        """
+        Writes all relations collected for an article in one burst. Statements are sent in pipeline mode as prepared
+        statements, so the burst costs a single round trip. In bulk write mode the relations are buffered instead
+        :param writer: Writer containing the relations of the article
+        """
+        if self.bulkWrite:
+            self.articleIocWriter.addAll(writer.articleIocs)
+            self.categoryArticleWriter.addAll(writer.categoryArticles)
+            return
+
+        if len(writer.articleIocs) == 0 and len(writer.categoryArticles) == 0:
+            return
+
+        # Leaving the pipeline waits for all results and raises the first error
+        with self.pool.connection() as connection, connection.pipeline(), connection.cursor() as cursor:
+            self._executeRelations(cursor, writer.articleIocs, writer.categoryArticles, prepare=True)
+
+    def _executeRelations(self, cursor, articleIocs: list[tuple], categoryArticles: list[tuple], prepare: bool = None):
+        for row in articleIocs:
+            cursor.execute(ADD_ARTICLE_IOC_QUERY, row, prepare=prepare)
+        for row in categoryArticles:
+            cursor.execute(INSERT_CATEGORY_QUERY, row, prepare=prepare)
+
+    def writeArticleAsStream(self, writer: ArticleWriter):
+        """
+        Writes all relations collected for an article in one burst as a stream
+        :param writer: Writer containing the relations of the article
+        :return: Observable that writes the relations
+        """
+        return rx.of(writer).pipe(
+            # Write burst
+            ops.do_action(self.writeArticle),
+            # Retry
+            ops.do_action(on_error=lambda err: self.logger.error("Failed to write to db", exc_info=err)),
+            ops.retry(DB_MAX_RETRIES),
+            ops.do_action(on_error=lambda err: self.logger.error("Retries Exhausted", exc_info=err)),
+            ops.catch(rx.empty()),
+        )
+
+    @contextmanager
+    def articleTransaction(self, articleId: UUID):
+        """
+        Unit of work for the writes of an article. Relations written through it are committed together with the
+        extracted mark of the article, in batches of {ARTICLE_TRANSACTION_BATCH_SIZE} articles. Nothing of the
+        article is written when the unit of work raises
+        :param articleId: Article id the writes belong to
+        :return: Context manager providing the ArticleWriter of the article
+        """
+        transaction = self.articleWriter(articleId)
+        yield transaction
+        self.articleTransactionWriter.add(transaction)
+
+    def commitArticles(self, writers: list[ArticleWriter]):
+        """
+        Writes the relations of the articles and marks them as extracted in a single transaction
+        :param writers: Writers containing the relations of each article
+        """
+        articleIocs = [row for writer in writers for row in writer.articleIocs]
+        categoryArticles = [row for writer in writers for row in writer.categoryArticles]
+
+        # COPY is not available in pipeline mode
+        usePipeline = self.pipelineWrites and not self.bulkWrite
+        with (self.pool.connection() as connection,
+              connection.pipeline() if usePipeline else nullcontext(),
+              connection.transaction(),
+              connection.cursor() as cursor):
+            if self.bulkWrite:
+                self._copyAndMergeWithCursor(cursor, articleIocs, CREATE_IOC_ARTICLES_STAGING_QUERY,
+                                             COPY_IOC_ARTICLES_STAGING_QUERY, MERGE_IOC_ARTICLES_QUERY)
+                self._copyAndMergeWithCursor(cursor, categoryArticles, CREATE_ARTICLE_CATEGORY_STAGING_QUERY,
+                                             COPY_ARTICLE_CATEGORY_STAGING_QUERY, MERGE_ARTICLE_CATEGORY_QUERY)
+            else:
+                self._executeRelations(cursor, articleIocs, categoryArticles, prepare=usePipeline or None)
+
+            articleIds = [writer.articleId for writer in writers]
+            cursor.execute(MARK_EXTRACTED_BATCH_QUERY, (articleIds,))
+            if self.claimMode:
+                cursor.execute(RELEASE_LEASES_QUERY, (articleIds,))
+
+    def queueArticleFeatures(self, features: ArticleFeatures):
+        """
+        Queues the features computed by an extraction process, written in batches across articles
+        :param features: Features of an article
+        """
+        self.articleFeatureWriter.add(features)
+
+    def writeArticleFeatures(self, featuresList: list[ArticleFeatures]):
+        """
+        Resolves the IOCs of all articles with a single statement, then writes the relations of the articles
+        and marks them as extracted in a single transaction
+        :param featuresList: Features of each article
+        """
+        iocIds = self.addIOCsIfNotExist([ioc for features in featuresList for ioc in features.iocs])
+
+        writers = []
+        for features in featuresList:
+            writer = self.articleWriter(features.articleId)
+            for iocId in dict.fromkeys(iocIds.get(ioc) for ioc in features.iocs):
+                if iocId is not None:
+                    writer.addArticleIoc(iocId, features.articleId)
+            for categoryId in features.categoryIds:
+                writer.insertCategoryArticle(categoryId, features.articleId)
+            writers.append(writer)
+
+        self.commitArticles(writers)
+
+    def copyArticleIocs(self, rows: list[tuple[UUID, int]]):
+        """
+        Writes Article IOC relations with COPY into the staging table and merges them in a single statement
+        :param rows: List of (article id, IOC id) pairs
+        """
+        self._copyAndMerge(rows, CREATE_IOC_ARTICLES_STAGING_QUERY,
+                           COPY_IOC_ARTICLES_STAGING_QUERY, MERGE_IOC_ARTICLES_QUERY)
+
+    def copyCategoryArticles(self, rows: list[tuple[str, UUID]]):
+        """
+        Writes Article Category relations with COPY into the staging table and merges them in a single statement
+        :param rows: List of (category id, article id) pairs
+        """
+        self._copyAndMerge(rows, CREATE_ARTICLE_CATEGORY_STAGING_QUERY,
+                           COPY_ARTICLE_CATEGORY_STAGING_QUERY, MERGE_ARTICLE_CATEGORY_QUERY)
+
+    def _copyAndMerge(self, rows: list[tuple], createStagingQuery: str, copyQuery: str, mergeQuery: str):
+        with self.pool.connection() as connection, connection.transaction(), connection.cursor() as cursor:
+            self._copyAndMergeWithCursor(cursor, rows, createStagingQuery, copyQuery, mergeQuery)
+
+    def _copyAndMergeWithCursor(self, cursor, rows: list[tuple], createStagingQuery: str, copyQuery: str,
+                                mergeQuery: str):
+        if len(rows) == 0:
+            return
+
+        batchId = uuid4()
+        cursor.execute(createStagingQuery)
+
+        with cursor.copy(copyQuery) as copy:
+            for row in rows:
+                copy.write_row((batchId, *row))
+
+        cursor.execute(mergeQuery, (batchId,))
+
+    def flush(self):
+        """
+        Writes all relations buffered by bulk write mode. Queued extracted articles are not marked
+        """
+        if self.bulkWrite:
+            self.articleIocWriter.flush()
+            self.categoryArticleWriter.flush()
+
+    def getPoolStats(self):
+        """
+        Gets connection pool usage to help size the pool
+        :return: dict containing pool size, connections in use, waiting requests, utilization of the max size
+                 and the average time in ms requests waited for a connection
+        """
+        stats = self.pool.get_stats()
+        inUse = stats["pool_size"] - stats["pool_available"]
+        requests = stats.get("requests_num", 0)
+
+        return {
+            "size": stats["pool_size"],
+            "max": stats["pool_max"],
+            "inUse": inUse,
+            "waiting": stats.get("requests_waiting", 0),
+            "utilization": inUse / stats["pool_max"],
+            "avgWaitMs": stats.get("requests_wait_ms", 0) / requests if requests > 0 else 0.0,
+            "timeouts": stats.get("requests_errors", 0),
+        }
+
+    def logPoolStats(self):
+        """
+        Logs connection pool usage
+        """
+        stats = self.getPoolStats()
+        self.logger.info("Connection pool: %s/%s connections in use (%.0f%% utilization), %s waiting, "
+                         "average wait %.1f ms, %s timeouts",
+                         stats["inUse"], stats["max"], stats["utilization"] * 100, stats["waiting"],
+                         stats["avgWaitMs"], stats["timeouts"])
+
     def close(self):
         """
-        Closes the connection
+        Writes buffered relations, marks queued articles and closes the connection pool
         """
-        self.connection.close()
+        if self.parentWrites:
+            self.articleFeatureWriter.close()
+
+        if self.transactionalWrites:
+            self.articleTransactionWriter.close()
+
+        # Marking flushes the relations of the marked articles first
+        self.extractedArticleMarker.close()
+
+        if self.bulkWrite:
+            self.articleIocWriter.close()
+            self.categoryArticleWriter.close()
+
+        self.pool.close()
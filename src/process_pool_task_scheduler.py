@@ -1,79 +1,198 @@
+import itertools
 import logging
+import threading
+import time
+from concurrent.futures import Future
 
 import reactivex as rx
-from multiprocess.synchronize import Lock
 from reactivex import operators as ops
-from multiprocess import Process, Queue, Manager
+from multiprocess import Process, Queue
 import dill
 from reactivex.scheduler import ThreadPoolScheduler
 
+from src.article_arena import ArticleArena
 from src.base_extractor import BaseExtractor
 from src.category_assigner import CategoryAssigner
-from src.collections import ArticleContent
-from src.config import THREADS_PER_CORE, LOGGER_FORMAT
+from src.chunk_sizer import ChunkSizer
+from src.collections import ArticleContent, ArticleDescriptor, ExtractionResult
+from src.config import THREADS_PER_CORE, LOGGER_FORMAT, LOG_FREQUENCY, ARTICLE_ARENA_SIZE, PARENT_WRITES_ENABLED
 from src.exceptions import DisposedException
+from src.feature_collector import FeatureCollector
 from src.ioc_extractor import IocExtractor
+from src.known_ioc_index import KnownIocIndex
 from src.postgres_service import PostgresService
 
+# Sent on the task queue to stop a process, and on the result queue to stop the collector
+STOP_MESSAGE = None
+# Sent on the result queue once a process is ready for tasks
+STARTED_MESSAGE = "started"
+
 
 class ProcessPoolTaskScheduler:
     """
     Allows to submit tasks for being processed in another process for parallel processing
+    Tasks are sent to the processes on a queue in chunks and their results come back on a result queue, where a
+    collector thread completes the future of each task, so no thread waits on a task.
+    With an arena, article content is written to shared memory and only its descriptor is queued. Content that does
+    not fit in the arena is queued with its task.
+    With parent writes, processes only compute the features of articles and return them in the ExtractionResult
     *Database calls must never be called from this task scheduler* as they are not process safe
     """
 
-    def __init__(self, max_workers=1):
+    def __init__(self, max_workers=1, knownIocIndex: KnownIocIndex = None, arenaSize: int = ARTICLE_ARENA_SIZE,
+                 parentWrites: bool = PARENT_WRITES_ENABLED):
         dill.settings['recurse'] = True
         self.max_workers = max_workers
+        self.knownIocIndex = knownIocIndex
+        self.parentWrites = parentWrites
         self._disposed = False
         self._processes = []
-        self._manager = Manager()
-        self._taskQueue = self._manager.Queue()
-        self._disposedValue = self._manager.Value(bool, False)
+        self._taskQueue = Queue()
+        self._resultQueue = Queue()
+        self._taskIds = itertools.count()
+        # Task id -> future of the task
+        self._pending: dict[int, Future] = {}
+        self._pendingLock = threading.Lock()
+        self.chunkSizer = ChunkSizer(max_workers)
+        self.articleArena = ArticleArena(arenaSize) if arenaSize > 0 else None
+        # Task id -> (offset, length) of its content in the arena
+        self._arenaBlocks: dict[int, tuple[int, int]] = {}
 
-        startLocks = []
         for pid in range(max_workers):
-            startLock: Lock = self._manager.Lock()
-            startLock.acquire()
-            p = Process(target=self._processRun, args=[self._taskQueue, startLock, self._disposedValue])
+            p = Process(target=self._processRun, args=[self._taskQueue, self._resultQueue, knownIocIndex,
+                                                         self.articleArena, parentWrites])
             p.daemon = True
             self._processes.append(p)
-            startLocks.append(startLock)
             p.start()
 
         # Wait for all processes to start
-        for lock in startLocks:
-            lock.acquire()
+        for i in range(max_workers):
+            self._resultQueue.get()
+
+        self._collector = threading.Thread(target=self._collectResults, daemon=True)
+        self._collector.start()
 
     def dispose(self):
         """
-        Releases resources for processes
+        Releases resources for processes. Tasks still pending fail with DisposedException
         """
-        self._disposedValue.value = True
+        self._disposed = True
         # unblock all processes
         for i in range(self.max_workers):
-            self._taskQueue.put(i)
+            self._taskQueue.put(STOP_MESSAGE)
 
-        self._taskQueue._close()
         for p in self._processes:
             # Wait 10 seconds max for shutdown
             p.join(10)
 
+        self._resultQueue.put(STOP_MESSAGE)
+        self._collector.join()
+
+        with self._pendingLock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for future in pending:
+            future.set_exception(DisposedException())
+
+        self._taskQueue.close()
+        self._resultQueue.close()
+        if self.articleArena is not None:
+            self.articleArena.unlink()
+
+    def pendingCount(self):
+        """
+        :return: Number of submitted articles that have not completed
+        """
+        with self._pendingLock:
+            return len(self._pending)
+
     def submitArticle(self, articleContent: ArticleContent):
-        if self._disposedValue.value:
+        """
+        Submits an article for extraction
+        :param articleContent: Article to extract
+        :return: Future completed with the ExtractionResult of the article
+        """
+        return self.submitArticles([articleContent])[0]
+
+    def submitArticles(self, articles: list[ArticleContent]):
+        """
+        Submits articles for extraction, sent to the processes in chunks sized by {chunkSizer}
+        :param articles: Articles to extract
+        :return: List of futures completed with the ExtractionResult of each article, in order
+        """
+        if self._disposed:
             raise DisposedException()
 
-        completeLock: Lock = self._manager.Lock()
-        # Lock is initially unlocked, lock it before submitting
-        completeLock.acquire()
-        self._taskQueue.put([articleContent, completeLock])
-        # Wait for completion
-        completeLock.acquire()
+        futures = []
+        for chunk in self.chunkSizer.split(articles):
+            tasks = []
+            for articleContent in chunk:
+                taskId = next(self._taskIds)
+                future = Future()
+                future.set_running_or_notify_cancel()
+                with self._pendingLock:
+                    self._pending[taskId] = future
+                tasks.append((taskId, self._packArticle(taskId, articleContent)))
+                futures.append(future)
+            self._taskQueue.put(tasks)
+        return futures
 
-    def _processRun(self, queue, startLock, disposedValue):
+    def _packArticle(self, taskId: int, articleContent: ArticleContent):
+        """
+        Writes the content of an article to the arena
+        :return: Descriptor of the article, or the article itself without arena or when the arena is full
+        """
+        if self.articleArena is None:
+            return articleContent
+
+        content = articleContent.articleContent or b""
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+
+        offset = self.articleArena.write(content)
+        if offset is None:
+            return articleContent
+
+        with self._pendingLock:
+            self._arenaBlocks[taskId] = (offset, len(content))
+        return ArticleDescriptor(articleContent.articleId, articleContent.sourceId, offset, len(content))
+
+    def submitArticleAsStream(self, articleContent: ArticleContent):
+        """
+        Submits an article for extraction as a stream
+        :param articleContent: Article to extract
+        :return: Observable that emits the ExtractionResult of the article
+        """
+        return rx.defer(lambda scheduler: rx.from_future(self.submitArticle(articleContent)))
+
+    def submitArticlesAsStream(self, articles: list[ArticleContent]):
+        """
+        Submits articles for extraction as a stream, see {submitArticles}
+        :param articles: Articles to extract
+        :return: Observable that emits the ExtractionResult of each article as it completes
+        """
+        return rx.defer(lambda scheduler: rx.merge(*[rx.from_future(future)
+                                                     for future in self.submitArticles(articles)]))
+
+    def _collectResults(self):
+        while (message := self._resultQueue.get()) is not STOP_MESSAGE:
+            results, durationSeconds = message
+            self.chunkSizer.observe(len(results), durationSeconds)
+            for taskId, result in results:
+                with self._pendingLock:
+                    future = self._pending.pop(taskId, None)
+                    arenaBlock = self._arenaBlocks.pop(taskId, None)
+                if arenaBlock is not None:
+                    self.articleArena.free(*arenaBlock)
+                if future is not None:
+                    future.set_result(result)
+
+    def _processRun(self, taskQueue, resultQueue, knownIocIndex, articleArena, parentWrites):
         """
         code that runs when process starts
         """
+        postgresService = None
+        started = False
         try:
             # Create required dependencies
             scheduler = ThreadPoolScheduler(THREADS_PER_CORE)
@@ -81,7 +200,13 @@ class ProcessPoolTaskScheduler:
             logger = logging.getLogger('Process Extractor')
 
             try:
-                postgresService = PostgresService(logging.getLogger('PostgresService'), scheduler)
+                if parentWrites:
+                    # Only reads filters and category rules
+                    postgresService = PostgresService(logging.getLogger('PostgresService'), scheduler,
+                                                      poolMaxSize=1, parentWrites=False)
+                else:
+                    postgresService = PostgresService(logging.getLogger('PostgresService'), scheduler,
+                                                      knownIocIndex=knownIocIndex, parentWrites=False)
             except Exception as e:
                 logging.error('Failed to Initialize Databases', exc_info=e)
                 return
@@ -93,49 +218,133 @@ class ProcessPoolTaskScheduler:
             ]
 
             logger.info("Process extractor started")
-            startLock.release()
+            resultQueue.put(STARTED_MESSAGE)
+            started = True
+            processedCount = 0
             # Execute loop
-            while not disposedValue.value:
+            while (tasks := taskQueue.get()) is not STOP_MESSAGE:
+                chunkStarted = time.monotonic()
+                results = [(taskId, runTask(unpackArticle(article, articleArena), extractorServices, postgresService,
+                                            scheduler, logger, parentWrites))
+                           for taskId, article in tasks]
+                resultQueue.put((results, time.monotonic() - chunkStarted))
 
-                request = queue.get(block=True)
-                if disposedValue.value:
-                    return
+                previousCount = processedCount
+                processedCount += len(tasks)
+                if processedCount // LOG_FREQUENCY != previousCount // LOG_FREQUENCY:
+                    postgresService.logPoolStats()
+        except Exception as err:
+            logging.error('Something went wrong', exc_info=err)
+        finally:
+            if not started:
+                # Unblock startup
+                resultQueue.put(STARTED_MESSAGE)
+            if postgresService is not None:
+                postgresService.close()
+            if knownIocIndex is not None:
+                knownIocIndex.close()
+            if articleArena is not None:
+                articleArena.close()
 
-                articleContent: ArticleContent = request[0]
-                outLock: Lock = request[1]
 
-                try:
-                    extractFeatures(articleContent, extractorServices, postgresService, scheduler, logger)
-                except Exception as err:
-                    pass
+def unpackArticle(article, articleArena: ArticleArena):
+    """
+    Reads the content of an article sent as a descriptor from the arena
+    :param article: ArticleContent or ArticleDescriptor
+    :return: ArticleContent
+    """
+    if not isinstance(article, ArticleDescriptor):
+        return article
+    return ArticleContent(article.articleId, articleArena.read(article.offset, article.length), article.sourceId)
 
-                outLock.release()
-        except EOFError:
-            # Queue is closed, exit process
-            pass
-        except Exception as err:
-            logging.error('Something went wrong', exc_info=err)
 
-        postgresService.close()
+def runTask(articleContent: ArticleContent, extractorServices, postgresService, scheduler, logger,
+            parentWrites: bool = False):
+    """
+    Extracts features for a given article, never raises
+    :param articleContent: article to extract features
+    :param parentWrites: Whether features are returned to the main process instead of written
+    :return: ExtractionResult of the article
+    """
+    started = time.monotonic()
+    try:
+        if parentWrites:
+            succeeded, features = collectFeatures(articleContent, extractorServices, scheduler, logger)
+            return ExtractionResult(articleContent.articleId, succeeded, time.monotonic() - started,
+                                    features=features if succeeded else None)
+
+        succeeded = extractFeatures(articleContent, extractorServices, postgresService, scheduler, logger)
+        return ExtractionResult(articleContent.articleId, succeeded, time.monotonic() - started)
+    except Exception as err:
+        return ExtractionResult(articleContent.articleId, False, time.monotonic() - started, repr(err))
 
 
 def extractFeatures(articleContent: ArticleContent, extractorServices, postgresService, scheduler, logger):
     """
     Extracts features for a given article.
     :param articleContent: article to extract features
+    :return: True if all extractors completed without errors
     """
-    rx.from_iterable(extractorServices).pipe(
-        # Extracts features
-        ops.flat_map(lambda extService: extService.extract_features(articleContent)),
+    # Content read as raw BSON is only decoded here
+    articleContent = articleContent.decoded()
+
+    if postgresService.transactionalWrites:
+        # Relations and the extracted mark of the article are committed together
+        with postgresService.articleTransaction(articleContent.articleId) as transaction:
+            return runExtractors(articleContent, extractorServices, transaction, rx.empty(), scheduler, logger)
+
+    # In pipeline mode relations are collected while extracting and written in one burst afterwards
+    writer = postgresService.articleWriter(articleContent.articleId) if postgresService.pipelineWrites else None
+    writeStream = rx.empty() if writer is None else postgresService.writeArticleAsStream(writer)
+
+    completeStream = writeStream.pipe(
         ops.filter(lambda v: False),
         # Complete with emitting original article
         ops.concat(rx.of(articleContent)),
-        ops.flat_map(lambda article: postgresService.markArticleAsExtractedAsStream(article.articleId)),
+        # Marked in batches, written at the latest when the process shuts down
+        ops.do_action(lambda article: postgresService.queueArticleAsExtracted(article.articleId)),
+    )
+    return runExtractors(articleContent, extractorServices, writer, completeStream, scheduler, logger)
+
+
+def collectFeatures(articleContent: ArticleContent, extractorServices, scheduler, logger):
+    """
+    Computes the features of a given article without writing them
+    :param articleContent: article to extract features
+    :return: (True if all extractors completed without errors, ArticleFeatures of the article)
+    """
+    articleContent = articleContent.decoded()
+    collector = FeatureCollector(articleContent.articleId)
+    succeeded = runExtractors(articleContent, extractorServices, collector, rx.empty(), scheduler, logger)
+    return succeeded, collector.features
+
+
+def runExtractors(articleContent: ArticleContent, extractorServices, writer, completeStream, scheduler, logger):
+    """
+    Runs all extractors on an article followed by {completeStream}. Blocks until complete
+    :param articleContent: article to extract features
+    :param writer: ArticleWriter the extractors write through. Extractors write directly to the db when None
+    :param completeStream: Observable subscribed once all extractors completed
+    :return: True if no error occurred
+    """
+    errors = []
+
+    def onError(err):
+        logger.error("Error occurred.", exc_info=err)
+        errors.append(err)
+
+    rx.from_iterable(extractorServices).pipe(
+        # Extracts features
+        ops.flat_map(lambda extService: extService.extract_features(articleContent, writer)),
+        ops.filter(lambda v: False),
+        ops.concat(completeStream),
         # Error handling
-        ops.do_action(on_error=lambda err: logger.error("Error occurred.", exc_info=err)),
+        ops.do_action(on_error=onError),
         ops.catch(rx.empty()),
         # Scheduler setup
         ops.subscribe_on(scheduler=scheduler),
         # Ensures something is always returned
         ops.to_list()
     ).run()
+
+    return len(errors) == 0
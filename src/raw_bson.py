@@ -0,0 +1,119 @@
+import struct
+from typing import Optional
+
+import bson
+from bson.binary import UuidRepresentation
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+
+# Documents are returned as undecoded bytes, fields are decoded on access
+RAW_BSON_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument, uuid_representation=UuidRepresentation.STANDARD)
+
+STRING_TYPE = 0x02
+NULL_TYPE = 0x0A
+
+# Size of the value of fixed size BSON types
+FIXED_VALUE_SIZES = {
+    0x01: 8,   # double
+    0x06: 0,   # undefined
+    0x07: 12,  # ObjectId
+    0x08: 1,   # boolean
+    0x09: 8,   # UTC datetime
+    0x0A: 0,   # null
+    0x10: 4,   # int32
+    0x11: 8,   # timestamp
+    0x12: 8,   # int64
+    0x13: 16,  # decimal128
+    0x7F: 0,   # max key
+    0xFF: 0,   # min key
+}
+# Types whose value starts with its length, not counting the length itself
+LENGTH_PREFIXED_TYPES = {0x02, 0x0D, 0x0E}
+# Types whose value starts with its length, counting the length itself
+SELF_SIZED_TYPES = {0x03, 0x04, 0x0F}
+BINARY_TYPE = 0x05
+REGEX_TYPE = 0x0B
+DB_POINTER_TYPE = 0x0C
+
+INT32 = struct.Struct('<i')
+
+
+def _valueEnd(raw: bytes, elementType: int, valueStart: int):
+    if elementType in FIXED_VALUE_SIZES:
+        return valueStart + FIXED_VALUE_SIZES[elementType]
+    if elementType in LENGTH_PREFIXED_TYPES:
+        return valueStart + 4 + INT32.unpack_from(raw, valueStart)[0]
+    if elementType in SELF_SIZED_TYPES:
+        return valueStart + INT32.unpack_from(raw, valueStart)[0]
+    if elementType == BINARY_TYPE:
+        return valueStart + 5 + INT32.unpack_from(raw, valueStart)[0]
+    if elementType == REGEX_TYPE:
+        patternEnd = raw.index(b'\x00', valueStart) + 1
+        return raw.index(b'\x00', patternEnd) + 1
+    if elementType == DB_POINTER_TYPE:
+        return valueStart + 4 + INT32.unpack_from(raw, valueStart)[0] + 12
+    raise bson.InvalidBSON("Unknown BSON type {}".format(elementType))
+
+
+def findRawField(raw: bytes, fieldName: str):
+    """
+    Finds a top level field of a BSON document without decoding the document
+    :param raw: BSON document bytes
+    :param fieldName: Name of the field to find
+    :return: (element start, value start, value end) or None if the document has no such field
+    """
+    encodedName = fieldName.encode() + b'\x00'
+    position = 4
+    documentEnd = INT32.unpack_from(raw, 0)[0] - 1
+    while position < documentEnd:
+        elementStart = position
+        elementType = raw[position]
+        nameEnd = raw.index(b'\x00', position + 1) + 1
+        valueEnd = _valueEnd(raw, elementType, nameEnd)
+        if raw[position + 1:nameEnd] == encodedName:
+            return elementStart, nameEnd, valueEnd
+        position = valueEnd
+    return None
+
+
+def decodeRawField(raw: bytes, fieldName: str, codecOptions: CodecOptions = RAW_BSON_CODEC_OPTIONS):
+    """
+    Decodes a single top level field of a BSON document, leaving every other field encoded
+    :param raw: BSON document bytes
+    :param fieldName: Name of the field to decode
+    :param codecOptions: Options used to decode the field
+    :return: Decoded value or None if the document has no such field
+    """
+    field = findRawField(raw, fieldName)
+    if field is None:
+        return None
+
+    elementStart, _, valueEnd = field
+    # Wraps the element in a document of its own
+    element = raw[elementStart:valueEnd]
+    document = INT32.pack(len(element) + 5) + element + b'\x00'
+    return bson.decode(document, codec_options=codecOptions)[fieldName]
+
+
+def rawStringField(raw: bytes, fieldName: str,
+                   codecOptions: CodecOptions = RAW_BSON_CODEC_OPTIONS) -> Optional[bytes]:
+    """
+    Reads a top level string field of a BSON document as UTF-8 bytes, without creating a str
+    :param raw: BSON document bytes
+    :param fieldName: Name of the field to read
+    :param codecOptions: Options used to decode the field if it is not a string
+    :return: UTF-8 bytes of the field, or None if the field is null or missing
+    """
+    field = findRawField(raw, fieldName)
+    if field is None:
+        return None
+
+    elementStart, valueStart, valueEnd = field
+    elementType = raw[elementStart]
+    if elementType == STRING_TYPE:
+        # Skips the length and the trailing NUL
+        return bytes(raw[valueStart + 4:valueEnd - 1])
+    if elementType == NULL_TYPE:
+        return None
+
+    return str(decodeRawField(raw, fieldName, codecOptions)).encode()
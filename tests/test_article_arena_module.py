@@ -0,0 +1,63 @@
+import pickle
+import unittest
+
+from src.article_arena import ArticleArena
+
+
+class ArticleArenaTests(unittest.TestCase):
+    def test_write_read_success(self):
+        arena = ArticleArena(64)
+
+        # Actual
+        offset = arena.write("contenu été".encode())
+        actual = arena.read(offset, len("contenu été".encode()))
+
+        # Assert
+        self.assertEqual("contenu été", actual)
+        arena.unlink()
+
+    def test_write_full_returns_none(self):
+        arena = ArticleArena(8)
+
+        # Actual
+        first = arena.write(b"123456")
+        second = arena.write(b"123")
+
+        # Assert
+        self.assertEqual(0, first)
+        self.assertIsNone(second)
+        arena.unlink()
+
+    def test_free_merges_neighbours(self):
+        arena = ArticleArena(12)
+        first = arena.write(b"1234")
+        second = arena.write(b"5678")
+        third = arena.write(b"9012")
+
+        # Actual
+        arena.free(first, 4)
+        arena.free(third, 4)
+        arena.free(second, 4)
+        whole = arena.write(b"123456789012")
+
+        # Assert
+        self.assertEqual(0, whole)
+        self.assertEqual(0, arena.freeBytes())
+        arena.unlink()
+
+    def test_pickled_arena_reads_same_memory(self):
+        arena = ArticleArena(16)
+        offset = arena.write(b"content")
+
+        # Actual
+        attached = pickle.loads(pickle.dumps(arena))
+        actual = attached.read(offset, 7)
+
+        # Assert
+        self.assertEqual("content", actual)
+        attached.close()
+        arena.unlink()
+
+
+if __name__ == '__main__':
+    unittest.main()
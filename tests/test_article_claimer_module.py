@@ -0,0 +1,141 @@
+import threading
+import unittest
+from logging import Logger
+from unittest.mock import *
+from uuid import UUID
+
+from reactivex import operators as ops
+from reactivex.scheduler import CurrentThreadScheduler
+
+from src.article_claimer import ArticleClaimer
+from src.collections import ArticleInfo
+from src.postgres_service import PostgresService
+
+UUID_1 = UUID("5d8a48c7-8799-49ba-8a61-b96c6f0d08e8")
+UUID_2 = UUID("2c398d08-22e0-4f69-955b-69fb39666a9c")
+UUID_3 = UUID("8c819db1-3dfa-4343-b6e7-9b73495fcdec")
+
+# Large enough that periodic renewal never happens during a test
+NO_PERIODIC_RENEW = 3600
+
+
+def getMockObjects():
+    loggerMock = Mock(spec_set=Logger)
+    postgresServiceMock = Mock(spec_set=PostgresService)
+
+    return loggerMock, postgresServiceMock
+
+
+def createClaimer(loggerMock, postgresServiceMock, batchSize=2, maxInFlight=2):
+    return ArticleClaimer(loggerMock, postgresServiceMock, CurrentThreadScheduler(), instanceId="test",
+                          batchSize=batchSize, maxInFlight=maxInFlight, leaseDuration=60,
+                          renewInterval=NO_PERIODIC_RENEW)
+
+
+class ArticleClaimerTests(unittest.TestCase):
+    def test_getClaimedIdsAsStream_claims_until_empty(self):
+        loggerMock, postgresServiceMock = getMockObjects()
+        claimer = createClaimer(loggerMock, postgresServiceMock, maxInFlight=4)
+
+        postgresServiceMock.claimArticles.side_effect = [
+            [ArticleInfo(UUID_1, 1), ArticleInfo(UUID_2, 1)],
+            [ArticleInfo(UUID_3, 1)],
+            []
+        ]
+
+        # Actual
+        actual = claimer.getClaimedIdsAsStream().pipe(
+            ops.do_action(lambda articleInfo: claimer.complete(articleInfo.articleId)),
+            ops.to_list()
+        ).run()
+
+        # Assert
+        self.assertEqual([ArticleInfo(UUID_1, 1), ArticleInfo(UUID_2, 1), ArticleInfo(UUID_3, 1)], actual)
+        postgresServiceMock.createLeaseTable.assert_called_once()
+        postgresServiceMock.claimArticles.assert_called_with(claimer.instanceId, 2, 60)
+        self.assertTrue(claimer.instanceId.startswith("test-"))
+        loggerMock.error.assert_not_called()
+
+        claimer.close()
+        postgresServiceMock.releaseLeases.assert_not_called()
+
+    def test_getClaimedIds_waits_for_room(self):
+        loggerMock, postgresServiceMock = getMockObjects()
+        claimer = createClaimer(loggerMock, postgresServiceMock)
+
+        postgresServiceMock.claimArticles.side_effect = [
+            [ArticleInfo(UUID_1, 1), ArticleInfo(UUID_2, 1)],
+            [ArticleInfo(UUID_3, 1)],
+        ]
+        claimedIds = claimer.getClaimedIds()
+        next(claimedIds)
+        next(claimedIds)
+
+        # Actual
+        thirdClaim = threading.Thread(target=lambda: next(claimedIds))
+        thirdClaim.start()
+        thirdClaim.join(0.2)
+        blockedWhileFull = thirdClaim.is_alive()
+        claimer.complete(UUID_1)
+        claimer.complete(UUID_2)
+        thirdClaim.join(5)
+
+        # Assert
+        self.assertTrue(blockedWhileFull)
+        self.assertFalse(thirdClaim.is_alive())
+        self.assertEqual(2, postgresServiceMock.claimArticles.call_count)
+
+        claimer.close()
+
+    def test_getClaimedIdsAsStream_error_retry(self):
+        loggerMock, postgresServiceMock = getMockObjects()
+        claimer = createClaimer(loggerMock, postgresServiceMock)
+
+        postgresServiceMock.claimArticles.side_effect = [Exception("Test Exception"), [ArticleInfo(UUID_1, 1)], []]
+
+        # Actual
+        actual = claimer.getClaimedIdsAsStream().pipe(
+            ops.do_action(lambda articleInfo: claimer.complete(articleInfo.articleId)),
+            ops.to_list()
+        ).run()
+
+        # Assert
+        self.assertEqual([ArticleInfo(UUID_1, 1)], actual)
+        loggerMock.error.assert_called()
+
+        claimer.close()
+
+    def test_renewLeases_renews_in_flight(self):
+        loggerMock, postgresServiceMock = getMockObjects()
+        claimer = createClaimer(loggerMock, postgresServiceMock)
+
+        postgresServiceMock.claimArticles.side_effect = [[ArticleInfo(UUID_1, 1), ArticleInfo(UUID_2, 1)]]
+        claimedIds = claimer.getClaimedIds()
+        next(claimedIds)
+        next(claimedIds)
+        claimer.complete(UUID_1)
+
+        # Actual
+        claimer.renewLeases()
+
+        # Assert
+        postgresServiceMock.renewLeases.assert_called_once_with(claimer.instanceId, [UUID_2], 60)
+
+        claimer.close()
+
+    def test_close_releases_in_flight(self):
+        loggerMock, postgresServiceMock = getMockObjects()
+        claimer = createClaimer(loggerMock, postgresServiceMock)
+
+        postgresServiceMock.claimArticles.side_effect = [[ArticleInfo(UUID_1, 1)]]
+        next(claimer.getClaimedIds())
+
+        # Actual
+        claimer.close()
+
+        # Assert
+        postgresServiceMock.releaseLeases.assert_called_once_with([UUID_1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import unittest
+from concurrent.futures import Future
+from unittest.mock import *
+
+from logging import Logger
+from uuid import UUID
+
+from src.async_feature_extractor import AsyncFeatureExtractor
+from src.async_postgres_service import AsyncPostgresService
+from src.async_mongo_service import AsyncMongoService
+from src.collections import ArticleInfo, ArticleContent, ExtractionResult
+from src.process_pool_task_scheduler import ProcessPoolTaskScheduler
+from src.article_claimer import ArticleClaimer
+
+UUID_1 = UUID("5d8a48c7-8799-49ba-8a61-b96c6f0d08e8")
+UUID_2 = UUID("2c398d08-22e0-4f69-955b-69fb39666a9c")
+UUID_3 = UUID("8c819db1-3dfa-4343-b6e7-9b73495fcdec")
+
+
+def getMockObjects():
+    loggerMock = Mock(spec_set=Logger)
+    postgresServiceMock = AsyncMock(spec_set=AsyncPostgresService)
+    mongoServiceMock = AsyncMock(spec_set=AsyncMongoService)
+    processPool = Mock(spec=ProcessPoolTaskScheduler)
+    processPool.max_workers = 1
+    processPool.submitArticle.side_effect = completedFuture
+
+    return loggerMock, postgresServiceMock, mongoServiceMock, processPool
+
+
+def completedFuture(article: ArticleContent):
+    future = Future()
+    future.set_result(ExtractionResult(article.articleId, True, 0))
+    return future
+
+
+def asyncIterable(items):
+    async def generator():
+        for item in items:
+            yield item
+
+    return Mock(side_effect=lambda: generator())
+
+
+class AsyncFeatureExtractorTests(unittest.IsolatedAsyncioTestCase):
+
+    async def test_extractor_success(self):
+        # assembly
+        loggerMock, postgresServiceMock, mongoServiceMock, processPoolMock = getMockObjects()
+
+        article1 = ArticleContent(UUID_1, "content 1", 1)
+        article2 = ArticleContent(UUID_2, "content 2", 1)
+        article3 = ArticleContent(UUID_3, "content 3", 1)
+
+        postgresServiceMock.getNonExtractedIdsWithRetry = asyncIterable([
+            ArticleInfo(UUID_1, 1), ArticleInfo(UUID_2, 1), ArticleInfo(UUID_3, 1)
+        ])
+        mongoServiceMock.getByIdWithRetry.side_effect = [article1, article2, article3]
+
+        extractor = AsyncFeatureExtractor(loggerMock, postgresServiceMock, mongoServiceMock, processPoolMock,
+                                          maxInFlight=2)
+
+        # Actual
+        await extractor.run()
+
+        # Assert
+        postgresServiceMock.getNonExtractedIdsWithRetry.assert_called_once()
+        self.assertEqual(3, mongoServiceMock.getByIdWithRetry.await_count)
+        processPoolMock.submitArticle.assert_has_calls([
+            call(article1), call(article2), call(article3)
+        ], any_order=True)
+        self.assertEqual(3, extractor.articleCount)
+        loggerMock.error.assert_not_called()
+
+    async def test_extractor_missing_article_skipped(self):
+        # assembly
+        loggerMock, postgresServiceMock, mongoServiceMock, processPoolMock = getMockObjects()
+
+        article1 = ArticleContent(UUID_1, "content 1", 1)
+
+        postgresServiceMock.getNonExtractedIdsWithRetry = asyncIterable([ArticleInfo(UUID_1, 1), ArticleInfo(UUID_2, 1)])
+        mongoServiceMock.getByIdWithRetry.side_effect = [article1, None]
+
+        extractor = AsyncFeatureExtractor(loggerMock, postgresServiceMock, mongoServiceMock, processPoolMock)
+
+        # Actual
+        await extractor.run()
+
+        # Assert
+        processPoolMock.submitArticle.assert_called_once_with(article1)
+        self.assertEqual(1, extractor.articleCount)
+        loggerMock.error.assert_not_called()
+
+    async def test_extractor_claimMode_completes_every_article(self):
+        # assembly
+        loggerMock, postgresServiceMock, mongoServiceMock, processPoolMock = getMockObjects()
+        articleClaimerMock = Mock(spec_set=ArticleClaimer)
+
+        article1 = ArticleContent(UUID_1, "content 1", 1)
+
+        articleClaimerMock.getClaimedIds.return_value = iter([ArticleInfo(UUID_1, 1), ArticleInfo(UUID_2, 1)])
+        mongoServiceMock.getByIdWithRetry.side_effect = [article1, None]
+
+        extractor = AsyncFeatureExtractor(loggerMock, postgresServiceMock, mongoServiceMock, processPoolMock,
+                                          articleClaimer=articleClaimerMock)
+
+        # Actual
+        await extractor.run()
+
+        # Assert
+        postgresServiceMock.getNonExtractedIdsWithRetry.assert_not_called()
+        processPoolMock.submitArticle.assert_called_once_with(article1)
+        articleClaimerMock.complete.assert_has_calls([call(UUID_1), call(UUID_2)], any_order=True)
+        loggerMock.error.assert_not_called()
+
+    async def test_extractor_submit_error_handled(self):
+        # assembly
+        loggerMock, postgresServiceMock, mongoServiceMock, processPoolMock = getMockObjects()
+
+        postgresServiceMock.getNonExtractedIdsWithRetry = asyncIterable([ArticleInfo(UUID_1, 1)])
+        mongoServiceMock.getByIdWithRetry.return_value = ArticleContent(UUID_1, "content 1", 1)
+        processPoolMock.submitArticle.side_effect = Exception("Test Exception")
+
+        extractor = AsyncFeatureExtractor(loggerMock, postgresServiceMock, mongoServiceMock, processPoolMock)
+
+        # Actual
+        await extractor.run()
+
+        # Assert
+        self.assertEqual(0, extractor.articleCount)
+        loggerMock.error.assert_called()
+
+
+    async def test_extractor_failed_extraction_counted_and_logged(self):
+        # assembly
+        loggerMock, postgresServiceMock, mongoServiceMock, processPoolMock = getMockObjects()
+
+        failed = Future()
+        failed.set_result(ExtractionResult(UUID_1, False, 0, "Exception()"))
+
+        postgresServiceMock.getNonExtractedIdsWithRetry = asyncIterable([ArticleInfo(UUID_1, 1)])
+        mongoServiceMock.getByIdWithRetry.return_value = ArticleContent(UUID_1, "content 1", 1)
+        processPoolMock.submitArticle.side_effect = None
+        processPoolMock.submitArticle.return_value = failed
+
+        extractor = AsyncFeatureExtractor(loggerMock, postgresServiceMock, mongoServiceMock, processPoolMock)
+
+        # Actual
+        await extractor.run()
+
+        # Assert
+        self.assertEqual(1, extractor.articleCount)
+        loggerMock.warning.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+from logging import Logger
+from unittest.mock import *
+from uuid import UUID
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+
+from src.async_mongo_service import AsyncMongoService
+from src.collections import ArticleInfo, ArticleContent
+
+UUID_1 = UUID("5d8a48c7-8799-49ba-8a61-b96c6f0d08e8")
+
+
+def getMockObjects():
+    loggerMock = Mock(spec_set=Logger)
+    collectionMock = Mock(spec_set=AsyncIOMotorCollection)
+    # Motor generates its coroutine methods at runtime, so they are not detected as async by spec
+    collectionMock.find_one = AsyncMock()
+
+    return loggerMock, collectionMock
+
+
+def getPatches(collectionMock):
+    clientMock = MagicMock()
+    clientMock.__getitem__.return_value.__getitem__.return_value = collectionMock
+    clientClassMock = MagicMock(spec=AsyncIOMotorClient, return_value=clientMock)
+    mongoPatch = patch("src.async_mongo_service.AsyncIOMotorClient", new=clientClassMock)
+
+    return mongoPatch
+
+
+class AsyncMongoServiceTests(unittest.IsolatedAsyncioTestCase):
+    async def test_getByIdWithRetry_success(self):
+        loggerMock, collectionMock = getMockObjects()
+
+        articleInfo = ArticleInfo(UUID_1, 1)
+        expectedArticle1 = ArticleContent(UUID_1, "content 1", 1)
+
+        mongoPatch = getPatches(collectionMock)
+        collectionMock.find_one.return_value = {"_id": UUID_1, "web_scrap": "content 1"}
+
+        mongoPatch.start()
+        mongoService = AsyncMongoService(loggerMock)
+
+        # Actual
+        actual = await mongoService.getByIdWithRetry(articleInfo)
+
+        # Assert
+        self.assertEqual(expectedArticle1, actual)
+        collectionMock.find_one.assert_awaited_once()
+        loggerMock.error.assert_not_called()
+
+        mongoPatch.stop()
+
+    async def test_getByIdWithRetry_error_retry_fail_complete(self):
+        loggerMock, collectionMock = getMockObjects()
+
+        articleInfo = ArticleInfo(UUID_1, 1)
+
+        mongoPatch = getPatches(collectionMock)
+        collectionMock.find_one.side_effect = Exception("Test Exception")
+
+        mongoPatch.start()
+        mongoService = AsyncMongoService(loggerMock)
+
+        # Actual
+        actual = await mongoService.getByIdWithRetry(articleInfo)
+
+        # Assert
+        self.assertIsNone(actual)
+        self.assertEqual(3, collectionMock.find_one.await_count)
+        loggerMock.error.assert_called()
+
+        mongoPatch.stop()
+
+    async def test_getByIdWithRetry_not_found(self):
+        loggerMock, collectionMock = getMockObjects()
+
+        mongoPatch = getPatches(collectionMock)
+        collectionMock.find_one.return_value = None
+
+        mongoPatch.start()
+        mongoService = AsyncMongoService(loggerMock)
+
+        # Actual
+        actual = await mongoService.getByIdWithRetry(ArticleInfo(UUID_1, 1))
+
+        # Assert
+        self.assertIsNone(actual)
+        loggerMock.warning.assert_called()
+
+        mongoPatch.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import unittest
+from logging import Logger
+from unittest.mock import *
+from uuid import UUID
+from psycopg import AsyncConnection, AsyncServerCursor
+from psycopg_pool import AsyncConnectionPool
+
+from src.async_postgres_service import *
+
+UUID_1 = UUID("5d8a48c7-8799-49ba-8a61-b96c6f0d08e8")
+UUID_2 = UUID("2c398d08-22e0-4f69-955b-69fb39666a9c")
+
+
+def getMockObjects():
+    loggerMock = Mock(spec_set=Logger)
+    connectionMock = MagicMock(spec_set=AsyncConnection)
+    cursorMock = AsyncMock(spec_set=AsyncServerCursor)
+
+    connectionMock.cursor.return_value = cursorMock
+    connectionMock.transaction.return_value.__aexit__.return_value = False
+    cursorMock.__aenter__.return_value = cursorMock
+    cursorMock.__aexit__.return_value = False
+
+    return loggerMock, connectionMock, cursorMock
+
+
+def getPatches(connectionMock):
+    poolMock = MagicMock(spec_set=AsyncConnectionPool)
+    poolMock.connection.return_value.__aenter__.return_value = connectionMock
+    # Do not suppress exceptions raised while a connection is borrowed
+    poolMock.connection.return_value.__aexit__.return_value = False
+    poolClassMock = MagicMock(spec=AsyncConnectionPool, return_value=poolMock)
+    postgresPatch = patch("src.async_postgres_service.AsyncConnectionPool", new=poolClassMock)
+
+    return postgresPatch
+
+
+class AsyncRows:
+    """
+    Async iterator over rows, optionally failing once the rows are consumed
+    """
+
+    def __init__(self, rows, error=None):
+        self.rows = iter(rows)
+        self.error = error
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        row = next(self.rows, None)
+        if row is not None:
+            return row
+        if self.error is not None:
+            raise self.error
+        raise StopAsyncIteration
+
+
+async def collect(asyncIterable):
+    return [item async for item in asyncIterable]
+
+
+class AsyncPostgresServiceTests(unittest.IsolatedAsyncioTestCase):
+    async def test_getNonExtractedIdsWithRetry_success(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+
+        cursorMock.__aiter__.return_value = [[UUID_1, 1], [UUID_2, 2]]
+
+        postgresPatch.start()
+        postgresService = AsyncPostgresService(loggerMock)
+
+        # Actual
+        actual = await collect(postgresService.getNonExtractedIdsWithRetry())
+
+        # Assert
+        self.assertEqual([ArticleInfo(UUID_1, 1), ArticleInfo(UUID_2, 2)], actual)
+        connectionMock.cursor.assert_called_once_with(name=NON_EXTRACTED_IDS_CURSOR_NAME)
+        self.assertEqual(NON_EXTRACTED_IDS_ITERSIZE, cursorMock.itersize)
+        cursorMock.execute.assert_awaited_once_with(GET_NON_EXTRACTED_IDS_QUERY)
+        loggerMock.error.assert_not_called()
+
+        postgresPatch.stop()
+
+    async def test_getNonExtractedIdsWithRetry_error_retry(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+
+        cursorMock.execute.side_effect = [Exception("Test Exception"), None]
+        cursorMock.__aiter__.return_value = [[UUID_1, 1]]
+
+        postgresPatch.start()
+        postgresService = AsyncPostgresService(loggerMock)
+
+        # Actual
+        actual = await collect(postgresService.getNonExtractedIdsWithRetry())
+
+        # Assert
+        self.assertEqual([ArticleInfo(UUID_1, 1)], actual)
+        self.assertEqual(2, cursorMock.execute.await_count)
+        loggerMock.error.assert_called()
+
+        postgresPatch.stop()
+
+    async def test_getNonExtractedIdsWithRetry_error_while_streaming_resumes(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+
+        cursorMock.__aiter__.side_effect = [
+            AsyncRows([[UUID_1, 1]], Exception("Test Exception")),
+            AsyncRows([[UUID_2, 2]])
+        ]
+
+        postgresPatch.start()
+        postgresService = AsyncPostgresService(loggerMock)
+
+        # Actual
+        actual = await collect(postgresService.getNonExtractedIdsWithRetry())
+
+        # Assert
+        self.assertEqual([ArticleInfo(UUID_1, 1), ArticleInfo(UUID_2, 2)], actual)
+        cursorMock.execute.assert_has_awaits([
+            call(GET_NON_EXTRACTED_IDS_QUERY),
+            call(GET_NON_EXTRACTED_IDS_AFTER_QUERY, (UUID_1,))
+        ])
+        loggerMock.error.assert_called()
+
+        postgresPatch.stop()
+
+    async def test_getNonExtractedIdsWithRetry_error_complete(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+
+        cursorMock.execute.side_effect = Exception("Test Exception")
+
+        postgresPatch.start()
+        postgresService = AsyncPostgresService(loggerMock)
+
+        # Actual
+        actual = await collect(postgresService.getNonExtractedIdsWithRetry())
+
+        # Assert
+        self.assertEqual(0, len(actual))
+        self.assertEqual(3, cursorMock.execute.await_count)
+        loggerMock.error.assert_called()
+
+        postgresPatch.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
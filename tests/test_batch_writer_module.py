@@ -0,0 +1,95 @@
+import unittest
+from logging import Logger
+from unittest.mock import *
+
+from src.batch_writer import BufferedBatchWriter
+from src.exceptions import DisposedException
+
+# Large enough that periodic flushing never happens during a test
+NO_PERIODIC_FLUSH = 3600
+
+
+def getMockObjects():
+    loggerMock = Mock(spec_set=Logger)
+    writeBatchMock = Mock()
+
+    return loggerMock, writeBatchMock
+
+
+class BufferedBatchWriterTests(unittest.TestCase):
+    def test_add_below_flushSize_not_written(self):
+        loggerMock, writeBatchMock = getMockObjects()
+        writer = BufferedBatchWriter(loggerMock, writeBatchMock, 3, NO_PERIODIC_FLUSH)
+
+        # Actual
+        writer.add(1)
+        writer.add(2)
+
+        # Assert
+        writeBatchMock.assert_not_called()
+        self.assertEqual(2, len(writer))
+
+        writer.close()
+
+    def test_add_reaches_flushSize_written_once(self):
+        loggerMock, writeBatchMock = getMockObjects()
+        writer = BufferedBatchWriter(loggerMock, writeBatchMock, 3, NO_PERIODIC_FLUSH)
+
+        # Actual
+        writer.addAll([1, 2])
+        writer.add(3)
+
+        # Assert
+        writeBatchMock.assert_called_once_with([1, 2, 3])
+        self.assertEqual(0, len(writer))
+
+        writer.close()
+
+    def test_close_flushes_remaining(self):
+        loggerMock, writeBatchMock = getMockObjects()
+        writer = BufferedBatchWriter(loggerMock, writeBatchMock, 10, NO_PERIODIC_FLUSH)
+
+        # Actual
+        writer.add(1)
+        writer.close()
+
+        # Assert
+        writeBatchMock.assert_called_once_with([1])
+        self.assertRaises(DisposedException, lambda: writer.add(2))
+
+    def test_flush_error_retry(self):
+        loggerMock, writeBatchMock = getMockObjects()
+        writer = BufferedBatchWriter(loggerMock, writeBatchMock, 10, NO_PERIODIC_FLUSH)
+
+        writeBatchMock.side_effect = [Exception("Test Exception"), None]
+
+        # Actual
+        writer.add(1)
+        writer.flush()
+
+        # Assert
+        self.assertEqual(2, writeBatchMock.call_count)
+        loggerMock.error.assert_called()
+
+        writer.close()
+
+    def test_flush_retries_exhausted_complete(self):
+        loggerMock, writeBatchMock = getMockObjects()
+        writer = BufferedBatchWriter(loggerMock, writeBatchMock, 10, NO_PERIODIC_FLUSH)
+
+        writeBatchMock.side_effect = Exception("Test Exception")
+
+        # Actual
+        writer.add(1)
+        writer.flush()
+
+        # Assert
+        self.assertEqual(3, writeBatchMock.call_count)
+        self.assertEqual(0, len(writer))
+        loggerMock.error.assert_called()
+
+        writer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
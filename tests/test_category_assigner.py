@@ -9,6 +9,7 @@ from reactivex.scheduler import CurrentThreadScheduler
 
 from src.mongo_service import ArticleContent
 from src.postgres_service import PostgresService
+from src.article_writer import ArticleWriter
 from src.collections import CategoryAssignerRule
 from src.category_assigner import CategoryAssigner
 
@@ -71,6 +72,24 @@ class CategoryAssignerTests(unittest.TestCase):
         self.assertEqual(1, countingMock.call_count)
         loggerMock.error.assert_not_called()
 
+    def test_extract_features_writer_success(self):
+        loggerMock, postgresServiceMock = getMockObjects()
+        writerMock = Mock(spec_set=ArticleWriter)
+        scheduler = CurrentThreadScheduler()
+
+        article1 = ArticleContent(UUID_1, "content test2 1", 1)
+        postgresServiceMock.getCategoryRulesAsStream.return_value = rx.of(getMockRules())
+        writerMock.insertCategoryArticleAsStream.return_value = rx.of(0)
+
+        # Actual
+        categoryAssigner = CategoryAssigner(loggerMock, postgresServiceMock)
+        categoryAssigner.extract_features(article1, writerMock).subscribe(scheduler=scheduler)
+
+        # Assert
+        writerMock.insertCategoryArticleAsStream.assert_called_once_with('2', UUID_1)
+        postgresServiceMock.insertCategoryArticleAsStream.assert_not_called()
+        loggerMock.error.assert_not_called()
+
     def test_extract_features_no_matches_success(self):
         loggerMock, postgresServiceMock = getMockObjects()
         scheduler = CurrentThreadScheduler()
@@ -0,0 +1,71 @@
+import unittest
+from uuid import UUID
+
+from src.chunk_sizer import ChunkSizer
+from src.collections import ArticleContent
+
+UUID_1 = UUID("5d8a48c7-8799-49ba-8a61-b96c6f0d08e8")
+
+
+def createArticles(count: int, size: int = 10):
+    return [ArticleContent(UUID_1, "a" * size, 1) for i in range(count)]
+
+
+class ChunkSizerTests(unittest.TestCase):
+    def test_split_single_articles_until_latency_known(self):
+        chunkSizer = ChunkSizer(1)
+
+        # Actual
+        actual = chunkSizer.split(createArticles(3))
+
+        # Assert
+        self.assertEqual([1, 1, 1], [len(chunk) for chunk in actual])
+
+    def test_split_sized_by_latency(self):
+        chunkSizer = ChunkSizer(1, targetLatency=0.1, maxArticles=64)
+        # 10 ms per article
+        chunkSizer.observe(10, 0.1)
+
+        # Actual
+        actual = chunkSizer.split(createArticles(25))
+
+        # Assert
+        self.assertEqual([10, 10, 5], [len(chunk) for chunk in actual])
+
+    def test_split_limited_by_max_articles_and_bytes(self):
+        chunkSizer = ChunkSizer(1, targetLatency=0.1, maxArticles=4, maxBytes=25)
+        chunkSizer.observe(10, 0)
+
+        # Actual
+        bySize = chunkSizer.split(createArticles(5, size=10))
+        byCount = chunkSizer.split(createArticles(5, size=1))
+        oversized = chunkSizer.split(createArticles(2, size=100))
+
+        # Assert
+        self.assertEqual([2, 2, 1], [len(chunk) for chunk in bySize])
+        self.assertEqual([4, 1], [len(chunk) for chunk in byCount])
+        self.assertEqual([1, 1], [len(chunk) for chunk in oversized])
+
+    def test_split_spreads_batch_across_workers(self):
+        chunkSizer = ChunkSizer(4, targetLatency=1, maxArticles=64)
+        chunkSizer.observe(10, 0.01)
+
+        # Actual
+        actual = chunkSizer.split(createArticles(8))
+
+        # Assert
+        self.assertEqual([2, 2, 2, 2], [len(chunk) for chunk in actual])
+
+    def test_observe_smooths_latency(self):
+        chunkSizer = ChunkSizer(1, smoothing=0.5)
+
+        # Actual
+        chunkSizer.observe(2, 0.2)
+        chunkSizer.observe(1, 0.3)
+
+        # Assert
+        self.assertAlmostEqual(0.2, chunkSizer.articleLatency)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+import threading
+import unittest
+from logging import Logger
+from unittest.mock import *
+from uuid import UUID
+
+from reactivex import operators as ops
+from reactivex.subject import Subject
+
+from src.article_claimer import ArticleClaimer
+from src.collections import ArticleInfo
+from src.extraction_daemon import ExtractionDaemon
+from src.feature_extractor import FeatureExtractor
+from src.postgres_service import PostgresService
+
+UUID_1 = UUID("5d8a48c7-8799-49ba-8a61-b96c6f0d08e8")
+UUID_2 = UUID("2c398d08-22e0-4f69-955b-69fb39666a9c")
+
+
+def getMockObjects():
+    loggerMock = Mock(spec_set=Logger)
+    postgresServiceMock = Mock(spec_set=PostgresService)
+    featureExtractorMock = Mock(spec=FeatureExtractor)
+    featureExtractorMock.completedArticles = Subject()
+
+    return loggerMock, postgresServiceMock, featureExtractorMock
+
+
+def collectSubmitted(daemon: ExtractionDaemon):
+    submitted = []
+    daemon.articleIds.subscribe(on_next=submitted.append)
+    return submitted
+
+
+class ExtractionDaemonTests(unittest.TestCase):
+    def test_onNotifications_submits_non_extracted_articles(self):
+        loggerMock, postgresServiceMock, featureExtractorMock = getMockObjects()
+        daemon = ExtractionDaemon(loggerMock, postgresServiceMock, featureExtractorMock)
+        submitted = collectSubmitted(daemon)
+
+        postgresServiceMock.getNonExtractedIdsIn.return_value = [ArticleInfo(UUID_1, 1)]
+
+        # Actual
+        daemon.onNotifications([str(UUID_1), str(UUID_2)])
+
+        # Assert
+        postgresServiceMock.getNonExtractedIdsIn.assert_called_once_with([UUID_1, UUID_2])
+        self.assertEqual([ArticleInfo(UUID_1, 1)], submitted)
+
+    def test_onNotifications_invalid_payload_ignored(self):
+        loggerMock, postgresServiceMock, featureExtractorMock = getMockObjects()
+        daemon = ExtractionDaemon(loggerMock, postgresServiceMock, featureExtractorMock)
+        submitted = collectSubmitted(daemon)
+
+        # Actual
+        daemon.onNotifications(["not an id"])
+
+        # Assert
+        postgresServiceMock.getNonExtractedIdsIn.assert_not_called()
+        loggerMock.error.assert_called_once()
+        self.assertEqual([], submitted)
+
+    def test_sweep_skips_articles_in_flight_until_ttl_after_completion(self):
+        loggerMock, postgresServiceMock, featureExtractorMock = getMockObjects()
+        daemon = ExtractionDaemon(loggerMock, postgresServiceMock, featureExtractorMock, dedupeTtl=0)
+        submitted = collectSubmitted(daemon)
+        featureExtractorMock.completedArticles.subscribe(on_next=daemon._onArticleCompleted)
+
+        postgresServiceMock.getNonExtractedIds.return_value = [ArticleInfo(UUID_1, 1), ArticleInfo(UUID_2, 1)]
+        postgresServiceMock.getNonExtractedIdsIn.return_value = [ArticleInfo(UUID_1, 1)]
+
+        # Actual
+        daemon.sweep()
+        # Notification for an article in flight
+        daemon.onNotifications([str(UUID_1)])
+        featureExtractorMock.completedArticles.on_next(ArticleInfo(UUID_1, 1))
+        # Not yet marked as extracted, swept again after the TTL
+        postgresServiceMock.getNonExtractedIds.return_value = [ArticleInfo(UUID_1, 1)]
+        daemon.sweep()
+
+        # Assert
+        self.assertEqual([ArticleInfo(UUID_1, 1), ArticleInfo(UUID_2, 1), ArticleInfo(UUID_1, 1)], submitted)
+
+    def test_sweep_error_logged(self):
+        loggerMock, postgresServiceMock, featureExtractorMock = getMockObjects()
+        daemon = ExtractionDaemon(loggerMock, postgresServiceMock, featureExtractorMock)
+        submitted = collectSubmitted(daemon)
+
+        postgresServiceMock.getNonExtractedIds.side_effect = Exception("Failed")
+
+        # Actual
+        daemon.sweep()
+
+        # Assert
+        loggerMock.error.assert_called_once()
+        self.assertEqual([], submitted)
+
+    def test_onNotifications_claimMode_requests_sweep(self):
+        loggerMock, postgresServiceMock, featureExtractorMock = getMockObjects()
+        articleClaimerMock = Mock(spec_set=ArticleClaimer)
+        articleClaimerMock.getClaimedIds.return_value = [ArticleInfo(UUID_1, 1)]
+        daemon = ExtractionDaemon(loggerMock, postgresServiceMock, featureExtractorMock, articleClaimerMock)
+        submitted = collectSubmitted(daemon)
+
+        # Actual
+        daemon.onNotifications([str(UUID_1)])
+        daemon.sweep()
+
+        # Assert
+        self.assertTrue(daemon._sweepRequested.is_set())
+        postgresServiceMock.getNonExtractedIdsIn.assert_not_called()
+        postgresServiceMock.getNonExtractedIds.assert_not_called()
+        self.assertEqual([ArticleInfo(UUID_1, 1)], submitted)
+
+    def test_run_extracts_notified_articles_until_stopped(self):
+        loggerMock, postgresServiceMock, featureExtractorMock = getMockObjects()
+        daemon = ExtractionDaemon(loggerMock, postgresServiceMock, featureExtractorMock, sweepInterval=3600)
+
+        extracted = []
+        pipelineCompleted = threading.Event()
+        swept = threading.Event()
+
+        def buildExtractPipeline(articleIdStream):
+            return articleIdStream.pipe(
+                ops.do_action(on_next=extracted.append, on_completed=pipelineCompleted.set)
+            )
+
+        def getNonExtractedIds():
+            swept.set()
+            return [ArticleInfo(UUID_1, 1)]
+
+        def listen(channel, onNotifications, stopped):
+            onNotifications([str(UUID_2)])
+            swept.wait()
+            daemon.stop()
+            stopped.wait()
+
+        featureExtractorMock.buildExtractPipeline.side_effect = buildExtractPipeline
+        postgresServiceMock.getNonExtractedIds.side_effect = getNonExtractedIds
+        postgresServiceMock.getNonExtractedIdsIn.return_value = [ArticleInfo(UUID_2, 1)]
+        postgresServiceMock.listen.side_effect = listen
+
+        # Actual
+        daemon.run()
+
+        # Assert
+        self.assertCountEqual([ArticleInfo(UUID_1, 1), ArticleInfo(UUID_2, 1)], extracted)
+        self.assertTrue(pipelineCompleted.is_set())
+        postgresServiceMock.listen.assert_called_once()
+
+    def test_listen_error_reconnects_and_requests_sweep(self):
+        loggerMock, postgresServiceMock, featureExtractorMock = getMockObjects()
+        daemon = ExtractionDaemon(loggerMock, postgresServiceMock, featureExtractorMock)
+
+        def listen(channel, onNotifications, stopped):
+            if postgresServiceMock.listen.call_count == 1:
+                raise Exception("Connection lost")
+            daemon.stop()
+
+        postgresServiceMock.listen.side_effect = listen
+
+        # Actual
+        with patch('src.extraction_daemon.DAEMON_RECONNECT_DELAY', 0):
+            daemon._listenUntilStopped()
+
+        # Assert
+        self.assertEqual(2, postgresServiceMock.listen.call_count)
+        self.assertTrue(daemon._sweepRequested.is_set())
+        loggerMock.error.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
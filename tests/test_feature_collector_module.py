@@ -0,0 +1,48 @@
+import unittest
+from logging import Logger
+from unittest.mock import *
+from uuid import UUID
+
+import reactivex as rx
+from reactivex.scheduler import CurrentThreadScheduler
+
+from src.category_assigner import CategoryAssigner
+from src.collections import ArticleContent, ArticleFeatures, CategoryAssignerRule
+from src.feature_collector import FeatureCollector
+from src.postgres_service import PostgresService
+
+UUID_1 = UUID("5d8a48c7-8799-49ba-8a61-b96c6f0d08e8")
+
+
+class FeatureCollectorTests(unittest.TestCase):
+    def test_collects_iocs_and_categories(self):
+        scheduler = CurrentThreadScheduler()
+        collector = FeatureCollector(UUID_1)
+
+        # Actual
+        iocIds = collector.addIOCsIfNotExistAsStream([("1.1.1.1", 2)]).run()
+        collector.insertCategoryArticleAsStream('4', UUID_1).subscribe(scheduler=scheduler)
+
+        # Assert
+        self.assertEqual({}, iocIds)
+        self.assertEqual(ArticleFeatures(UUID_1, [("1.1.1.1", 2)], ['4']), collector.features)
+
+    def test_category_assigner_collects_without_db_write(self):
+        scheduler = CurrentThreadScheduler()
+        loggerMock = Mock(spec_set=Logger)
+        postgresServiceMock = Mock(spec_set=PostgresService)
+        postgresServiceMock.getCategoryRulesAsStream.return_value = rx.of([CategoryAssignerRule(4, "malware")])
+        collector = FeatureCollector(UUID_1)
+
+        # Actual
+        CategoryAssigner(loggerMock, postgresServiceMock).extract_features(
+            ArticleContent(UUID_1, "new malware", 1), collector
+        ).subscribe(scheduler=scheduler)
+
+        # Assert
+        self.assertEqual(['4'], collector.features.categoryIds)
+        postgresServiceMock.insertCategoryArticleAsStream.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,7 +10,10 @@ from reactivex.scheduler import CurrentThreadScheduler
 from src.feature_extractor import FeatureExtractor
 from src.postgres_service import PostgresService
 from src.mongo_service import *
+from src.collections import ArticleFeatures, ExtractionResult
 from src.process_pool_task_scheduler import ProcessPoolTaskScheduler
+from src.article_claimer import ArticleClaimer
+from src.in_flight_limiter import InFlightLimiter
 
 UUID_1 = UUID("5d8a48c7-8799-49ba-8a61-b96c6f0d08e8")
 UUID_2 = UUID("2c398d08-22e0-4f69-955b-69fb39666a9c")
@@ -22,6 +25,9 @@ def getMockObjects():
     postgresServiceMock = Mock(spec_set=PostgresService)
     mongoServiceMock = Mock(spec_set=MongoService)
     processPool = Mock(spec_set=ProcessPoolTaskScheduler)
+    processPool.submitArticlesAsStream.side_effect = lambda articles: rx.from_iterable(
+        [ExtractionResult(article.articleId, True, 0) for article in articles]
+    )
 
     return loggerMock, postgresServiceMock, mongoServiceMock, processPool
 
@@ -38,12 +44,9 @@ class FeatureExtractorTests(unittest.TestCase):
 
         scheduler = CurrentThreadScheduler()
 
-        postgresServiceMock.getNonExtractedIdsAsStream.return_value = rx.of(1,2,3)
-        mongoServiceMock.getByIdAsStream.side_effect = [
-            rx.of(article1),
-            rx.of(article2),
-            rx.of(article3),
-        ]
+        articleInfos = [ArticleInfo(UUID_1, 1), ArticleInfo(UUID_2, 1), ArticleInfo(UUID_3, 1)]
+        postgresServiceMock.getNonExtractedIdsAsStream.return_value = rx.from_iterable(articleInfos)
+        mongoServiceMock.getByIdsAsStream.return_value = rx.of(article1, article2, article3)
         postgresServiceMock.markArticleAsExtractedAsStream.side_effect = [
             rx.of("Ignored"),
             rx.of("Ignored"),
@@ -63,10 +66,41 @@ class FeatureExtractorTests(unittest.TestCase):
 
         # Assert
         postgresServiceMock.getNonExtractedIdsAsStream.assert_called_once()
-        self.assertEqual(3, mongoServiceMock.getByIdAsStream.call_count)
-        processPoolMock.submitArticle.assert_has_calls([
-            call(article1), call(article2), call(article3)
-        ], any_order=True)
+        # Read in a single batch
+        mongoServiceMock.getByIdsAsStream.assert_called_once_with(articleInfos)
+        processPoolMock.submitArticlesAsStream.assert_called_once_with([article1, article2, article3])
+        self.assertEqual(3, extractor.articleCount)
+        loggerMock.error.assert_not_called()
+
+    def test_extractor_claimMode_completes_every_article(self):
+        # assembly
+        loggerMock, postgresServiceMock, mongoServiceMock, processPoolMock = getMockObjects()
+        articleClaimerMock = Mock(spec_set=ArticleClaimer)
+
+        article1 = ArticleContent(UUID_1, "content 1", 1)
+
+        scheduler = CurrentThreadScheduler()
+
+        articleClaimerMock.getClaimedIdsAsStream.return_value = rx.of(ArticleInfo(UUID_1, 1), ArticleInfo(UUID_2, 1))
+        # Second article is missing
+        mongoServiceMock.getByIdsAsStream.return_value = rx.of(article1)
+
+        extractor = FeatureExtractor(
+            loggerMock,
+            postgresServiceMock,
+            mongoServiceMock,
+            scheduler,
+            processPoolMock,
+            articleClaimerMock
+        )
+
+        # Actual
+        extractor.buildExtractPipeline().subscribe(scheduler=scheduler)
+
+        # Assert
+        postgresServiceMock.getNonExtractedIdsAsStream.assert_not_called()
+        processPoolMock.submitArticlesAsStream.assert_called_once_with([article1])
+        articleClaimerMock.complete.assert_has_calls([call(UUID_1), call(UUID_2)], any_order=True)
         loggerMock.error.assert_not_called()
 
     def test_extractor_error_db_read_handled(self):
@@ -92,5 +126,99 @@ class FeatureExtractorTests(unittest.TestCase):
         postgresServiceMock.getNonExtractedIdsAsStream.assert_called_once()
         loggerMock.error.assert_called()
 
+    def test_extractor_batches_limited_by_size(self):
+        # assembly
+        loggerMock, postgresServiceMock, mongoServiceMock, processPoolMock = getMockObjects()
+
+        scheduler = CurrentThreadScheduler()
+
+        articleInfos = [ArticleInfo(UUID_1, 1), ArticleInfo(UUID_2, 1), ArticleInfo(UUID_3, 1)]
+        postgresServiceMock.getNonExtractedIdsAsStream.return_value = rx.from_iterable(articleInfos)
+        mongoServiceMock.getByIdsAsStream.side_effect = lambda batch: rx.from_iterable(
+            [ArticleContent(articleInfo.articleId, "content", 1) for articleInfo in batch]
+        )
+
+        extractor = FeatureExtractor(
+            loggerMock,
+            postgresServiceMock,
+            mongoServiceMock,
+            scheduler,
+            processPoolMock
+        )
+
+        # Actual
+        with patch('src.feature_extractor.MONGO_FETCH_BATCH_SIZE', 2):
+            extractor.buildExtractPipeline().subscribe(scheduler=scheduler)
+
+        # Assert
+        mongoServiceMock.getByIdsAsStream.assert_has_calls([call(articleInfos[:2]), call(articleInfos[2:])])
+        self.assertEqual(2, processPoolMock.submitArticlesAsStream.call_count)
+        self.assertEqual(3, extractor.articleCount)
+        loggerMock.error.assert_not_called()
+
+    def test_extractor_parentWrites_features_queued(self):
+        # assembly
+        loggerMock, postgresServiceMock, mongoServiceMock, processPoolMock = getMockObjects()
+
+        article1 = ArticleContent(UUID_1, "content 1", 1)
+        features = ArticleFeatures(UUID_1, [("1.1.1.1", 2)], [])
+
+        scheduler = CurrentThreadScheduler()
+
+        postgresServiceMock.getNonExtractedIdsAsStream.return_value = rx.of(ArticleInfo(UUID_1, 1))
+        mongoServiceMock.getByIdsAsStream.return_value = rx.of(article1)
+        processPoolMock.submitArticlesAsStream.side_effect = None
+        processPoolMock.submitArticlesAsStream.return_value = rx.of(
+            ExtractionResult(UUID_1, True, 0, features=features)
+        )
+
+        extractor = FeatureExtractor(
+            loggerMock,
+            postgresServiceMock,
+            mongoServiceMock,
+            scheduler,
+            processPoolMock
+        )
+
+        # Actual
+        extractor.buildExtractPipeline().subscribe(scheduler=scheduler)
+
+        # Assert
+        postgresServiceMock.queueArticleFeatures.assert_called_once_with(features)
+        loggerMock.error.assert_not_called()
+
+    def test_extractor_inFlight_released_when_batch_completes(self):
+        # assembly
+        loggerMock, postgresServiceMock, mongoServiceMock, processPoolMock = getMockObjects()
+        inFlightLimiter = InFlightLimiter(maxArticles=2)
+
+        scheduler = CurrentThreadScheduler()
+
+        articleInfos = [ArticleInfo(UUID_1, 1), ArticleInfo(UUID_2, 1), ArticleInfo(UUID_3, 1)]
+        postgresServiceMock.getNonExtractedIdsAsStream.return_value = rx.from_iterable(articleInfos)
+        mongoServiceMock.getByIdsAsStream.side_effect = lambda batch: rx.from_iterable(
+            [ArticleContent(articleInfo.articleId, "content", 1) for articleInfo in batch]
+        )
+
+        extractor = FeatureExtractor(
+            loggerMock,
+            postgresServiceMock,
+            mongoServiceMock,
+            scheduler,
+            processPoolMock,
+            inFlightLimiter=inFlightLimiter
+        )
+
+        # Actual
+        with patch('src.feature_extractor.MONGO_FETCH_BATCH_SIZE', 2):
+            extractor.buildExtractPipeline().subscribe(scheduler=scheduler)
+
+        # Assert
+        self.assertEqual(3, extractor.articleCount)
+        self.assertEqual(0, inFlightLimiter.articles)
+        self.assertEqual(0, inFlightLimiter.bytes)
+        loggerMock.error.assert_not_called()
+
+
 if __name__ == '__main__':
     unittest.main()
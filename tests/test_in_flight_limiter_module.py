@@ -0,0 +1,55 @@
+import threading
+import unittest
+
+from src.in_flight_limiter import InFlightLimiter
+
+
+class InFlightLimiterTests(unittest.TestCase):
+    def test_acquire_blocks_at_max_articles(self):
+        inFlightLimiter = InFlightLimiter(maxArticles=2, maxBytes=100)
+        inFlightLimiter.acquire()
+        inFlightLimiter.acquire()
+        acquired = threading.Event()
+
+        # Actual
+        thread = threading.Thread(target=lambda: (inFlightLimiter.acquire(), acquired.set()))
+        thread.start()
+        blocked = not acquired.wait(0.1)
+        inFlightLimiter.release(1)
+        thread.join(1)
+
+        # Assert
+        self.assertTrue(blocked)
+        self.assertTrue(acquired.is_set())
+        self.assertEqual(2, inFlightLimiter.articles)
+
+    def test_acquire_blocks_at_max_bytes(self):
+        inFlightLimiter = InFlightLimiter(maxArticles=10, maxBytes=100)
+        inFlightLimiter.acquire()
+        inFlightLimiter.addBytes(100)
+        acquired = threading.Event()
+
+        # Actual
+        thread = threading.Thread(target=lambda: (inFlightLimiter.acquire(), acquired.set()))
+        thread.start()
+        blocked = not acquired.wait(0.1)
+        inFlightLimiter.release(1, 100)
+        thread.join(1)
+
+        # Assert
+        self.assertTrue(blocked)
+        self.assertTrue(acquired.is_set())
+        self.assertEqual(0, inFlightLimiter.bytes)
+
+    def test_acquire_allowed_when_empty_over_max_bytes(self):
+        inFlightLimiter = InFlightLimiter(maxArticles=10, maxBytes=0)
+
+        # Actual
+        inFlightLimiter.acquire()
+
+        # Assert
+        self.assertEqual(1, inFlightLimiter.articles)
+
+
+if __name__ == '__main__':
+    unittest.main()
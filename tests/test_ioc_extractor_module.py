@@ -10,6 +10,7 @@ from src.config import iocIdToIdMapping
 
 from src.mongo_service import ArticleContent
 from src.postgres_service import PostgresService
+from src.article_writer import ArticleWriter
 from src.ioc_extractor import IocExtractor
 
 UUID_1 = UUID("5d8a48c7-8799-49ba-8a61-b96c6f0d08e8")
@@ -38,7 +39,7 @@ class IocExtractorTests(unittest.TestCase):
         iocId = 1
 
         searcherPatch = getPatches({"search_raw.return_value": [(iocType, iocValue, 0, iocValue)]})
-        postgresServiceMock.addIOCIfNotExistAsStream.return_value = rx.of(iocId)
+        postgresServiceMock.addIOCsIfNotExistAsStream.return_value = rx.of({(iocValue, iocIdToIdMapping[iocType]): iocId})
         postgresServiceMock.addArticleIocAsStream.return_value = rx.of((iocId, UUID_1))
         postgresServiceMock.getGlobalFiltersAsDictAsStream.return_value = rx.of(dict())
         postgresServiceMock.getSourceFiltersAsDictAsStream.return_value = rx.of(dict())
@@ -50,7 +51,7 @@ class IocExtractorTests(unittest.TestCase):
         iocExtractor.extract_features(article1).subscribe(scheduler=scheduler)
 
         # Assert
-        postgresServiceMock.addIOCIfNotExistAsStream.assert_called_once_with(iocValue, iocIdToIdMapping[iocType])
+        postgresServiceMock.addIOCsIfNotExistAsStream.assert_called_once_with([(iocValue, iocIdToIdMapping[iocType])])
         postgresServiceMock.addArticleIocAsStream.assert_called_once_with(iocId, UUID_1)
         loggerMock.error.assert_not_called()
 
@@ -68,7 +69,7 @@ class IocExtractorTests(unittest.TestCase):
         searcherPatch = getPatches({"search_raw.return_value": [(iocType, iocValue, 0, iocValue),
                                                                 (iocType, iocValue, 2, iocValue),
                                                                 (iocType, iocValue, 3, iocValue)]})
-        postgresServiceMock.addIOCIfNotExistAsStream.return_value = rx.of(iocId)
+        postgresServiceMock.addIOCsIfNotExistAsStream.return_value = rx.of({(iocValue, iocIdToIdMapping[iocType]): iocId})
         postgresServiceMock.addArticleIocAsStream.return_value = rx.of((iocId, UUID_1))
         postgresServiceMock.getGlobalFiltersAsDictAsStream.return_value = rx.of(dict())
         postgresServiceMock.getSourceFiltersAsDictAsStream.return_value = rx.of(dict())
@@ -80,12 +81,66 @@ class IocExtractorTests(unittest.TestCase):
         iocExtractor.extract_features(article1).subscribe(scheduler=scheduler)
 
         # Assert
-        postgresServiceMock.addIOCIfNotExistAsStream.assert_called_once_with(iocValue, iocIdToIdMapping[iocType])
+        postgresServiceMock.addIOCsIfNotExistAsStream.assert_called_once_with([(iocValue, iocIdToIdMapping[iocType])])
         postgresServiceMock.addArticleIocAsStream.assert_called_once_with(iocId, UUID_1)
         loggerMock.error.assert_not_called()
 
         searcherPatch.stop()
 
+    def test_extract_features_writer_success(self):
+        loggerMock, postgresServiceMock = getMockObjects()
+        writerMock = Mock(spec_set=ArticleWriter)
+        scheduler = CurrentThreadScheduler()
+
+        article1 = ArticleContent(UUID_1, "content 1", 1)
+        iocType = "ip4"
+        iocValue = "1.1.1.1"
+        iocId = 1
+
+        searcherPatch = getPatches({"search_raw.return_value": [(iocType, iocValue, 0, iocValue)]})
+        writerMock.addIOCsIfNotExistAsStream.return_value = rx.of({(iocValue, iocIdToIdMapping[iocType]): iocId})
+        writerMock.addArticleIocAsStream.return_value = rx.of((iocId, UUID_1))
+        postgresServiceMock.getGlobalFiltersAsDictAsStream.return_value = rx.of(dict())
+        postgresServiceMock.getSourceFiltersAsDictAsStream.return_value = rx.of(dict())
+
+        searcherPatch.start()
+
+        # Actual
+        iocExtractor = IocExtractor(loggerMock, postgresServiceMock)
+        iocExtractor.extract_features(article1, writerMock).subscribe(scheduler=scheduler)
+
+        # Assert
+        writerMock.addIOCsIfNotExistAsStream.assert_called_once_with([(iocValue, iocIdToIdMapping[iocType])])
+        writerMock.addArticleIocAsStream.assert_called_once_with(iocId, UUID_1)
+        postgresServiceMock.addIOCsIfNotExistAsStream.assert_not_called()
+        postgresServiceMock.addArticleIocAsStream.assert_not_called()
+        loggerMock.error.assert_not_called()
+
+        searcherPatch.stop()
+
+    def test_extract_features_no_iocs_skips_db(self):
+        loggerMock, postgresServiceMock = getMockObjects()
+        scheduler = CurrentThreadScheduler()
+
+        article1 = ArticleContent(UUID_1, "content 1", 1)
+
+        searcherPatch = getPatches({"search_raw.return_value": []})
+        postgresServiceMock.getGlobalFiltersAsDictAsStream.return_value = rx.of(dict())
+        postgresServiceMock.getSourceFiltersAsDictAsStream.return_value = rx.of(dict())
+
+        searcherPatch.start()
+
+        # Actual
+        iocExtractor = IocExtractor(loggerMock, postgresServiceMock)
+        iocExtractor.extract_features(article1).subscribe(scheduler=scheduler)
+
+        # Assert
+        postgresServiceMock.addIOCsIfNotExistAsStream.assert_not_called()
+        postgresServiceMock.addArticleIocAsStream.assert_not_called()
+        loggerMock.error.assert_not_called()
+
+        searcherPatch.stop()
+
     def test_extract_features_error_db_complete(self):
         loggerMock, postgresServiceMock = getMockObjects()
         scheduler = CurrentThreadScheduler()
@@ -95,7 +150,7 @@ class IocExtractorTests(unittest.TestCase):
         iocValue = "1.1.1.1"
 
         searcherPatch = getPatches({"search_raw.return_value": [(iocType, iocValue, 0, iocValue)]})
-        postgresServiceMock.addIOCIfNotExistAsStream.return_value = rx.throw(Exception("Test Exception"))
+        postgresServiceMock.addIOCsIfNotExistAsStream.return_value = rx.throw(Exception("Test Exception"))
         postgresServiceMock.getGlobalFiltersAsDictAsStream.return_value = rx.of(dict())
         postgresServiceMock.getSourceFiltersAsDictAsStream.return_value = rx.of(dict())
 
@@ -144,8 +199,11 @@ class IocExtractorTests(unittest.TestCase):
         iocId3 = 3
 
         searcherPatch = getPatches({"search_raw.return_value": [searcherReturn1, searcherReturn2, searcherReturn3]})
-        postgresServiceMock.addIOCIfNotExistAsStream.side_effect = [rx.of(iocId1), rx.of(iocId2), rx.of(iocId3),]
-        postgresServiceMock.addArticleIocAsStream.side_effect = [rx.of((iocId1, UUID_1)), rx.of((iocId2, UUID_1)), rx.of((iocId3, UUID_1))]
+        postgresServiceMock.addIOCsIfNotExistAsStream.return_value = rx.of({
+            (searcherReturn2[1], iocIdToIdMapping[searcherReturn2[0]]): iocId2,
+            (searcherReturn3[1], iocIdToIdMapping[searcherReturn3[0]]): iocId3,
+        })
+        postgresServiceMock.addArticleIocAsStream.side_effect = [rx.of((iocId2, UUID_1)), rx.of((iocId3, UUID_1))]
         postgresServiceMock.getGlobalFiltersAsDictAsStream.return_value = rx.of(dict({
             3: ['1\\.1\\.1\\.1']
         }))
@@ -158,13 +216,13 @@ class IocExtractorTests(unittest.TestCase):
         iocExtractor.extract_features(article1).subscribe(scheduler=scheduler)
 
         # Assert
-        postgresServiceMock.addIOCIfNotExistAsStream.assert_has_calls([
-            call(searcherReturn2[1], iocIdToIdMapping[searcherReturn2[0]]),
-            call(searcherReturn3[1], iocIdToIdMapping[searcherReturn3[0]])
+        postgresServiceMock.addIOCsIfNotExistAsStream.assert_called_once_with([
+            (searcherReturn2[1], iocIdToIdMapping[searcherReturn2[0]]),
+            (searcherReturn3[1], iocIdToIdMapping[searcherReturn3[0]])
         ])
         postgresServiceMock.addArticleIocAsStream.assert_has_calls([
-            call(iocId1, UUID_1),
             call(iocId2, UUID_1),
+            call(iocId3, UUID_1),
         ])
         loggerMock.error.assert_not_called()
 
@@ -183,8 +241,11 @@ class IocExtractorTests(unittest.TestCase):
         iocId3 = 3
 
         searcherPatch = getPatches({"search_raw.return_value": [searcherReturn1, searcherReturn2, searcherReturn3]})
-        postgresServiceMock.addIOCIfNotExistAsStream.side_effect = [rx.of(iocId1), rx.of(iocId2), rx.of(iocId3),]
-        postgresServiceMock.addArticleIocAsStream.side_effect = [rx.of((iocId1, UUID_1)), rx.of((iocId2, UUID_1)), rx.of((iocId3, UUID_1))]
+        postgresServiceMock.addIOCsIfNotExistAsStream.return_value = rx.of({
+            (searcherReturn2[1], iocIdToIdMapping[searcherReturn2[0]]): iocId2,
+            (searcherReturn3[1], iocIdToIdMapping[searcherReturn3[0]]): iocId3,
+        })
+        postgresServiceMock.addArticleIocAsStream.side_effect = [rx.of((iocId2, UUID_1)), rx.of((iocId3, UUID_1))]
         postgresServiceMock.getGlobalFiltersAsDictAsStream.return_value = rx.of(dict())
         postgresServiceMock.getSourceFiltersAsDictAsStream.return_value = rx.of(dict({
             3: ['1\\.1\\.1\\.1']
@@ -197,13 +258,13 @@ class IocExtractorTests(unittest.TestCase):
         iocExtractor.extract_features(article1).subscribe(scheduler=scheduler)
 
         # Assert
-        postgresServiceMock.addIOCIfNotExistAsStream.assert_has_calls([
-            call(searcherReturn2[1], iocIdToIdMapping[searcherReturn2[0]]),
-            call(searcherReturn3[1], iocIdToIdMapping[searcherReturn3[0]])
+        postgresServiceMock.addIOCsIfNotExistAsStream.assert_called_once_with([
+            (searcherReturn2[1], iocIdToIdMapping[searcherReturn2[0]]),
+            (searcherReturn3[1], iocIdToIdMapping[searcherReturn3[0]])
         ])
         postgresServiceMock.addArticleIocAsStream.assert_has_calls([
-            call(iocId1, UUID_1),
             call(iocId2, UUID_1),
+            call(iocId3, UUID_1),
         ])
         loggerMock.error.assert_not_called()
 
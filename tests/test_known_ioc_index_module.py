@@ -0,0 +1,89 @@
+import unittest
+
+from multiprocess import Process, Queue
+
+from src.known_ioc_index import KnownIocIndex
+
+
+class KnownIocIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.index = KnownIocIndex(100)
+
+    def tearDown(self):
+        self.index.unlink()
+
+    def test_get_added_success(self):
+        # Actual
+        self.index.add("example.com", 2, 10)
+        self.index.add("1.1.1.1", 3, 11)
+
+        # Assert
+        self.assertEqual(10, self.index.get("example.com", 2))
+        self.assertEqual(11, self.index.get("1.1.1.1", 3))
+        self.assertEqual(2, len(self.index))
+
+    def test_get_unknown_none(self):
+        self.index.add("example.com", 2, 10)
+
+        # Assert
+        self.assertIsNone(self.index.get("example.org", 2))
+        # Same value with another type is another IOC
+        self.assertIsNone(self.index.get("example.com", 1))
+
+    def test_add_existing_not_counted(self):
+        # Actual
+        self.index.add("example.com", 2, 10)
+        self.index.add("example.com", 2, 10)
+
+        # Assert
+        self.assertEqual(1, len(self.index))
+
+    def test_addAll_full_stops(self):
+        index = KnownIocIndex(2)
+
+        # Actual
+        added = index.addAll([(10, 2, "a.com"), (11, 2, "b.com"), (12, 2, "c.com")])
+
+        # Assert
+        self.assertEqual(2, added)
+        self.assertTrue(index.isFull())
+        self.assertFalse(index.add("c.com", 2, 12))
+        self.assertIsNone(index.get("c.com", 2))
+        self.assertEqual(11, index.get("b.com", 2))
+
+        index.unlink()
+
+    def test_bloomFilter_success(self):
+        index = KnownIocIndex(1000, bloomBitsPerEntry=10)
+        iocs = [(i, 2, "domain{}.com".format(i)) for i in range(1000)]
+
+        # Actual
+        index.addAll(iocs)
+
+        # Assert
+        for iocId, iocTypeId, iocValue in iocs:
+            self.assertEqual(iocId, index.get(iocValue, iocTypeId))
+        self.assertIsNone(index.get("unknown.com", 2))
+
+        index.unlink()
+
+    def test_add_from_other_process_visible(self):
+        self.index.add("example.com", 2, 10)
+        results = Queue()
+
+        def addFromProcess(index, queue):
+            queue.put(index.get("example.com", 2))
+            index.add("1.1.1.1", 3, 11)
+
+        # Actual
+        process = Process(target=addFromProcess, args=[self.index, results])
+        process.start()
+        process.join(10)
+
+        # Assert
+        self.assertEqual(10, results.get(timeout=10))
+        self.assertEqual(11, self.index.get("1.1.1.1", 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,10 +8,17 @@ from pymongo.collection import Collection
 from reactivex.scheduler import CurrentThreadScheduler
 import reactivex.operators as ops
 
+import bson
+from bson.raw_bson import RawBSONDocument
+
+from src.config import MONGO_COLLECTION
 from src.mongo_service import MongoService
+from src.raw_bson import RAW_BSON_CODEC_OPTIONS
 from src.collections import ArticleInfo, ArticleContent
 
 UUID_1 = UUID("5d8a48c7-8799-49ba-8a61-b96c6f0d08e8")
+UUID_2 = UUID("2c398d08-22e0-4f69-955b-69fb39666a9c")
+UUID_3 = UUID("8c819db1-3dfa-4343-b6e7-9b73495fcdec")
 
 def getMockObjects():
     loggerMock = Mock(spec_set=Logger)
@@ -181,9 +188,95 @@ class MongoServiceTests(unittest.TestCase):
         collectionMock.find_one.assert_called_once()
 
         mongoPatch.stop()
-    
-    
 
+    def test_getByIdsAsStream_success_missing_reported(self):
+        loggerMock, collectionMock, documentMock = getMockObjects()
+        scheduler = CurrentThreadScheduler()
+
+        articleInfos = [ArticleInfo(UUID_1, 1), ArticleInfo(UUID_2, 2), ArticleInfo(UUID_3, 3)]
+
+        mongoPatch = getPatches({"__getitem__.return_value.__getitem__.return_value": collectionMock})
+
+        # Third article is missing
+        collectionMock.find.return_value.batch_size.return_value = [
+            {"_id": UUID_2, "web_scrap": "content 2"},
+            {"_id": UUID_1, "web_scrap": None},
+        ]
+
+        mongoMock = mongoPatch.start()
+        mongoService = MongoService(loggerMock, scheduler)
+
+        # Actual
+        actual = mongoService.getByIdsAsStream(articleInfos).pipe(
+            ops.to_list()
+        ).run()
+
+        # Assert
+        self.assertEqual([ArticleContent(UUID_2, "content 2", 2), ArticleContent(UUID_1, "", 1)], actual)
+        collectionMock.find.assert_called_once_with(
+            {"_id": {"$in": [UUID_1, UUID_2, UUID_3]}, "web_scrap": {"$exists": True}},
+            projection={"web_scrap": 1}
+        )
+        loggerMock.warning.assert_called_once()
+        loggerMock.error.assert_not_called()
+
+        mongoPatch.stop()
+
+    def test_getByIdsAsStream_error_retry_success(self):
+        loggerMock, collectionMock, documentMock = getMockObjects()
+        scheduler = CurrentThreadScheduler()
+
+        articleInfos = [ArticleInfo(UUID_1, 1)]
+
+        mongoPatch = getPatches({"__getitem__.return_value.__getitem__.return_value": collectionMock})
+
+        collectionMock.find.side_effect = [Exception("Test Exception"), collectionMock.find.return_value]
+        collectionMock.find.return_value.batch_size.return_value = [{"_id": UUID_1, "web_scrap": "content 1"}]
+
+        mongoMock = mongoPatch.start()
+        mongoService = MongoService(loggerMock, scheduler)
+
+        # Actual
+        actual = mongoService.getByIdsAsStream(articleInfos).pipe(
+            ops.to_list()
+        ).run()
+
+        # Assert
+        self.assertEqual([ArticleContent(UUID_1, "content 1", 1)], actual)
+        loggerMock.error.assert_called()
+        self.assertEqual(2, collectionMock.find.call_count)
+
+        mongoPatch.stop()
+
+    def test_getByIdsAsStream_rawBson_content_bytes(self):
+        loggerMock, collectionMock, documentMock = getMockObjects()
+        scheduler = CurrentThreadScheduler()
+
+        articleInfos = [ArticleInfo(UUID_1, 1)]
+
+        mongoPatch = getPatches({})
+
+        rawDocument = RawBSONDocument(bson.encode({"_id": UUID_1, "web_scrap": "content 1"},
+                                                  codec_options=RAW_BSON_CODEC_OPTIONS))
+        collectionMock.find.return_value.batch_size.return_value = [rawDocument]
+
+        mongoMock = mongoPatch.start()
+        mongoMock.return_value.__getitem__.return_value.get_collection.return_value = collectionMock
+        mongoService = MongoService(loggerMock, scheduler, rawBson=True)
+
+        # Actual
+        actual = mongoService.getByIdsAsStream(articleInfos).pipe(
+            ops.to_list()
+        ).run()
+
+        # Assert
+        self.assertEqual([ArticleContent(UUID_1, b"content 1", 1)], actual)
+        self.assertEqual(ArticleContent(UUID_1, "content 1", 1), actual[0].decoded())
+        mongoMock.return_value.__getitem__.return_value.get_collection.assert_called_once_with(
+            MONGO_COLLECTION, codec_options=RAW_BSON_CODEC_OPTIONS
+        )
+
+        mongoPatch.stop()
 
 
 if __name__ == '__main__':
@@ -2,7 +2,8 @@ import re
 import unittest
 from unittest.mock import *
 from psycopg import Connection
-from psycopg import Cursor
+from psycopg import Cursor, ServerCursor
+from psycopg_pool import ConnectionPool
 from reactivex.scheduler import CurrentThreadScheduler
 from src.postgres_service import *
 
@@ -13,16 +14,26 @@ UUID_3 = UUID("8c819db1-3dfa-4343-b6e7-9b73495fcdec")
 def getMockObjects():
     loggerMock = Mock(spec_set=Logger)
     connectionMock = Mock(spec_set=Connection)
-    cursorMock = MagicMock(spec_set=Cursor)
+    # Server cursors have every method of cursors, plus itersize
+    cursorMock = MagicMock(spec_set=ServerCursor)
 
     connectionMock.cursor.return_value = cursorMock
+    connectionMock.transaction.return_value = MagicMock()
+    connectionMock.transaction.return_value.__exit__.return_value = False
+    connectionMock.pipeline.return_value = MagicMock()
+    connectionMock.pipeline.return_value.__exit__.return_value = False
     cursorMock.__enter__.return_value = cursorMock
+    cursorMock.__exit__.return_value = False
 
     return loggerMock, connectionMock, cursorMock
 
 def getPatches(connectionMock):
-    config = {"connect.return_value": connectionMock}
-    postgresPatch = patch("src.postgres_service.psycopg", spec=psycopg, **config)
+    poolMock = MagicMock(spec_set=ConnectionPool)
+    poolMock.connection.return_value.__enter__.return_value = connectionMock
+    # Do not suppress exceptions raised while a connection is borrowed
+    poolMock.connection.return_value.__exit__.return_value = False
+    poolClassMock = MagicMock(spec=ConnectionPool, return_value=poolMock)
+    postgresPatch = patch("src.postgres_service.ConnectionPool", new=poolClassMock)
 
     return postgresPatch
 
@@ -36,7 +47,7 @@ class PostgresServiceTests(unittest.TestCase):
         expectedArticleInfo2 = ArticleInfo(UUID_2, 1)
         expectedArticleInfo3 = ArticleInfo(UUID_3, 1)
 
-        cursorMock.fetchall.return_value = [
+        cursorMock.__iter__.return_value = [
             [expectedArticleInfo1.articleId, expectedArticleInfo1.sourceId],
             [expectedArticleInfo2.articleId, expectedArticleInfo2.sourceId],
             [expectedArticleInfo3.articleId, expectedArticleInfo3.sourceId],
@@ -51,12 +62,11 @@ class PostgresServiceTests(unittest.TestCase):
         ).run()
 
         # Assert
-        self.assertEqual(3, len(actual))
-        self.assertIn(expectedArticleInfo1, actual)
-        self.assertIn(expectedArticleInfo2, actual)
-        self.assertIn(expectedArticleInfo3, actual)
-        cursorMock.execute.assert_called_once()
-        cursorMock.fetchall.assert_called_once()
+        self.assertEqual([expectedArticleInfo1, expectedArticleInfo2, expectedArticleInfo3], actual)
+        connectionMock.cursor.assert_called_once_with(name=NON_EXTRACTED_IDS_CURSOR_NAME)
+        self.assertEqual(NON_EXTRACTED_IDS_ITERSIZE, cursorMock.itersize)
+        cursorMock.execute.assert_called_once_with(GET_NON_EXTRACTED_IDS_QUERY)
+        cursorMock.fetchall.assert_not_called()
         loggerMock.error.assert_not_called()
 
         postgresPatch.stop()
@@ -71,7 +81,7 @@ class PostgresServiceTests(unittest.TestCase):
         expectedArticleInfo3 = ArticleInfo(UUID_3, 1)
 
         cursorMock.execute.side_effect = [Exception("Test Exception"), cursorMock]
-        cursorMock.fetchall.return_value = [
+        cursorMock.__iter__.return_value = [
             [expectedArticleInfo1.articleId, expectedArticleInfo1.sourceId],
             [expectedArticleInfo2.articleId, expectedArticleInfo2.sourceId],
             [expectedArticleInfo3.articleId, expectedArticleInfo3.sourceId],
@@ -86,12 +96,43 @@ class PostgresServiceTests(unittest.TestCase):
         ).run()
 
         # Assert
-        self.assertEqual(3, len(actual))
-        self.assertIn(expectedArticleInfo1, actual)
-        self.assertIn(expectedArticleInfo2, actual)
-        self.assertIn(expectedArticleInfo3, actual)
+        self.assertEqual([expectedArticleInfo1, expectedArticleInfo2, expectedArticleInfo3], actual)
         self.assertEqual(2, cursorMock.execute.call_count)
-        cursorMock.fetchall.assert_called_once()
+        loggerMock.error.assert_called()
+
+        postgresPatch.stop()
+
+    def test_getNonExtractedIdsAsStream_error_while_streaming_resumes(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+        scheduler = CurrentThreadScheduler()
+
+        expectedArticleInfo1 = ArticleInfo(UUID_1, 1)
+        expectedArticleInfo2 = ArticleInfo(UUID_2, 1)
+
+        def failAfterFirstRow():
+            yield [expectedArticleInfo1.articleId, expectedArticleInfo1.sourceId]
+            raise Exception("Test Exception")
+
+        cursorMock.__iter__.side_effect = [
+            failAfterFirstRow(),
+            iter([[expectedArticleInfo2.articleId, expectedArticleInfo2.sourceId]]),
+        ]
+
+        postgresPatch.start()
+        postgresService = PostgresService(loggerMock, scheduler)
+
+        # Actual
+        actual = postgresService.getNonExtractedIdsAsStream().pipe(
+            ops.to_list()
+        ).run()
+
+        # Assert
+        self.assertEqual([expectedArticleInfo1, expectedArticleInfo2], actual)
+        cursorMock.execute.assert_has_calls([
+            call(GET_NON_EXTRACTED_IDS_QUERY),
+            call(GET_NON_EXTRACTED_IDS_AFTER_QUERY, (UUID_1,))
+        ], any_order=False)
         loggerMock.error.assert_called()
 
         postgresPatch.stop()
@@ -114,7 +155,7 @@ class PostgresServiceTests(unittest.TestCase):
         # Assert
         self.assertEqual(0, len(actual))
         self.assertEqual(3, cursorMock.execute.call_count)
-        cursorMock.fetchall.assert_not_called()
+        cursorMock.__iter__.assert_not_called()
         loggerMock.error.assert_called()
 
         postgresPatch.stop()
@@ -316,6 +357,165 @@ class PostgresServiceTests(unittest.TestCase):
 
         postgresPatch.stop()
 
+    def test_addIOCsIfNotExistAsStream_success(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+        scheduler = CurrentThreadScheduler()
+
+        iocs = [("ioc1", 1), ("ioc2", 2), ("ioc1", 1)]
+
+        cursorMock.fetchall.return_value = [[10, 1, "ioc1"], [11, 2, "ioc2"]]
+
+        postgresPatch.start()
+        postgresService = PostgresService(loggerMock, scheduler)
+
+        # Actual
+        actual = postgresService.addIOCsIfNotExistAsStream(iocs).run()
+
+        # Assert
+        self.assertEqual({("ioc1", 1): 10, ("ioc2", 2): 11}, actual)
+        cursorMock.execute.assert_called_once_with(ADD_IOCS_QUERY, ([1, 2], ["ioc1", "ioc2"]))
+        loggerMock.error.assert_not_called()
+
+        postgresPatch.stop()
+
+    def test_addIOCsIfNotExistAsStream_concurrent_insert_success(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+        scheduler = CurrentThreadScheduler()
+
+        iocs = [("ioc1", 1), ("ioc2", 2)]
+
+        # ioc2 was inserted by another transaction, so it is only found by the second read
+        cursorMock.fetchall.side_effect = [[[10, 1, "ioc1"]], [[11, 2, "ioc2"]]]
+
+        postgresPatch.start()
+        postgresService = PostgresService(loggerMock, scheduler)
+
+        # Actual
+        actual = postgresService.addIOCsIfNotExistAsStream(iocs).run()
+
+        # Assert
+        self.assertEqual({("ioc1", 1): 10, ("ioc2", 2): 11}, actual)
+        cursorMock.execute.assert_has_calls([
+            call(ADD_IOCS_QUERY, ([1, 2], ["ioc1", "ioc2"])),
+            call(GET_IOC_IDS_QUERY, ([2], ["ioc2"]))
+        ], any_order=False)
+        loggerMock.error.assert_not_called()
+
+        postgresPatch.stop()
+
+    def test_addIOCsIfNotExistAsStream_knownIocIndex_hits_skip_db(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+        scheduler = CurrentThreadScheduler()
+
+        knownIocIndex = KnownIocIndex(10)
+        knownIocIndex.add("ioc1", 1, 10)
+        cursorMock.fetchall.return_value = [[11, 2, "ioc2"]]
+
+        postgresPatch.start()
+        postgresService = PostgresService(loggerMock, scheduler, knownIocIndex=knownIocIndex)
+
+        # Actual
+        actual = postgresService.addIOCsIfNotExistAsStream([("ioc1", 1), ("ioc2", 2)]).run()
+        actualSecond = postgresService.addIOCsIfNotExistAsStream([("ioc1", 1), ("ioc2", 2)]).run()
+
+        # Assert
+        self.assertEqual({("ioc1", 1): 10, ("ioc2", 2): 11}, actual)
+        self.assertEqual(actual, actualSecond)
+        # Only the unknown IOC is sent, the inserted id is added to the index
+        cursorMock.execute.assert_called_once_with(ADD_IOCS_QUERY, ([2], ["ioc2"]))
+        self.assertEqual(11, knownIocIndex.get("ioc2", 2))
+        loggerMock.error.assert_not_called()
+
+        knownIocIndex.unlink()
+        postgresPatch.stop()
+
+    def test_addIOCIfNotExistAsStream_knownIocIndex_hit_skips_db(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+        scheduler = CurrentThreadScheduler()
+
+        knownIocIndex = KnownIocIndex(10)
+        knownIocIndex.add("ioc1", 1, 10)
+
+        postgresPatch.start()
+        postgresService = PostgresService(loggerMock, scheduler, knownIocIndex=knownIocIndex)
+
+        # Actual
+        actual = postgresService.addIOCIfNotExistAsStream("ioc1", 1).run()
+
+        # Assert
+        self.assertEqual(10, actual)
+        cursorMock.execute.assert_not_called()
+
+        knownIocIndex.unlink()
+        postgresPatch.stop()
+
+    def test_loadKnownIocIndex_success(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+        scheduler = CurrentThreadScheduler()
+
+        cursorMock.fetchone.return_value = [2]
+        cursorMock.__iter__.return_value = [[10, 1, "ioc1"], [11, 2, "ioc2"]]
+
+        postgresPatch.start()
+        postgresService = PostgresService(loggerMock, scheduler)
+
+        # Actual
+        knownIocIndex = postgresService.loadKnownIocIndex(headroom=5)
+
+        # Assert
+        self.assertEqual(7, knownIocIndex.maxEntries)
+        self.assertEqual(10, knownIocIndex.get("ioc1", 1))
+        self.assertEqual(11, knownIocIndex.get("ioc2", 2))
+        connectionMock.cursor.assert_called_with(name=IOCS_CURSOR_NAME)
+        self.assertEqual(KNOWN_IOCS_ITERSIZE, cursorMock.itersize)
+
+        knownIocIndex.unlink()
+        postgresPatch.stop()
+
+    def test_addIOCsIfNotExistAsStream_empty_no_db_call(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+        scheduler = CurrentThreadScheduler()
+
+        postgresPatch.start()
+        postgresService = PostgresService(loggerMock, scheduler)
+
+        # Actual
+        actual = postgresService.addIOCsIfNotExistAsStream([]).run()
+
+        # Assert
+        self.assertEqual(dict(), actual)
+        cursorMock.execute.assert_not_called()
+
+        postgresPatch.stop()
+
+    def test_addIOCsIfNotExistAsStream_retry_exhausted_complete(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+        scheduler = CurrentThreadScheduler()
+
+        cursorMock.execute.side_effect = Exception("Test Exception")
+
+        postgresPatch.start()
+        postgresService = PostgresService(loggerMock, scheduler)
+
+        # Actual
+        actual = postgresService.addIOCsIfNotExistAsStream([("ioc1", 1)]).pipe(
+            ops.to_list()
+        ).run()
+
+        # Assert
+        self.assertEqual(0, len(actual))
+        self.assertEqual(3, cursorMock.execute.call_count)
+        loggerMock.error.assert_called()
+
+        postgresPatch.stop()
+
     def test_addArticleIocAsStream_success(self):
         loggerMock, connectionMock, cursorMock = getMockObjects()
         postgresPatch = getPatches(connectionMock)
@@ -377,6 +577,415 @@ class PostgresServiceTests(unittest.TestCase):
 
         postgresPatch.stop()
 
+    def test_addArticleIocAsStream_bulkWrite_buffered_until_flush(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+        scheduler = CurrentThreadScheduler()
+
+        copyMock = MagicMock()
+        cursorMock.copy.return_value.__enter__.return_value = copyMock
+
+        postgresPatch.start()
+        postgresService = PostgresService(loggerMock, scheduler, bulkWrite=True)
+
+        # Actual
+        postgresService.addArticleIocAsStream(1, UUID_1).subscribe(scheduler=scheduler)
+        postgresService.addArticleIocAsStream(2, UUID_2).subscribe(scheduler=scheduler)
+        cursorMock.execute.assert_not_called()
+        postgresService.flush()
+
+        # Assert
+        cursorMock.copy.assert_called_once_with(COPY_IOC_ARTICLES_STAGING_QUERY)
+        self.assertEqual(2, copyMock.write_row.call_count)
+        self.assertEqual((UUID_1, 1), copyMock.write_row.call_args_list[0].args[0][1:])
+        self.assertEqual((UUID_2, 2), copyMock.write_row.call_args_list[1].args[0][1:])
+        cursorMock.execute.assert_has_calls([
+            call(CREATE_IOC_ARTICLES_STAGING_QUERY),
+            call(MERGE_IOC_ARTICLES_QUERY, ANY)
+        ], any_order=False)
+        loggerMock.error.assert_not_called()
+
+        postgresService.close()
+        postgresPatch.stop()
+
+    def test_insertCategoryArticleAsStream_bulkWrite_written_on_close(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+        scheduler = CurrentThreadScheduler()
+
+        copyMock = MagicMock()
+        cursorMock.copy.return_value.__enter__.return_value = copyMock
+
+        poolClassMock = postgresPatch.start()
+        postgresService = PostgresService(loggerMock, scheduler, bulkWrite=True)
+
+        # Actual
+        postgresService.insertCategoryArticleAsStream('2', UUID_1).subscribe(scheduler=scheduler)
+        postgresService.close()
+
+        # Assert
+        cursorMock.copy.assert_called_once_with(COPY_ARTICLE_CATEGORY_STAGING_QUERY)
+        self.assertEqual(('2', UUID_1), copyMock.write_row.call_args.args[0][1:])
+        cursorMock.execute.assert_called_with(MERGE_ARTICLE_CATEGORY_QUERY, ANY)
+        poolClassMock.return_value.close.assert_called_once()
+        loggerMock.error.assert_not_called()
+
+        postgresPatch.stop()
+
+    def test_queueArticleAsExtracted_marked_in_one_statement_on_close(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+        scheduler = CurrentThreadScheduler()
+
+        postgresPatch.start()
+        postgresService = PostgresService(loggerMock, scheduler)
+
+        # Actual
+        postgresService.queueArticleAsExtracted(UUID_1)
+        postgresService.queueArticleAsExtracted(UUID_2)
+        cursorMock.execute.assert_not_called()
+        postgresService.close()
+
+        # Assert
+        cursorMock.execute.assert_called_once_with(MARK_EXTRACTED_BATCH_QUERY, ([UUID_1, UUID_2],))
+        loggerMock.error.assert_not_called()
+
+        postgresPatch.stop()
+
+    def test_queueArticleAsExtracted_bulkWrite_relations_written_before_mark(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+        scheduler = CurrentThreadScheduler()
+
+        cursorMock.copy.return_value.__enter__.return_value = MagicMock()
+
+        postgresPatch.start()
+        postgresService = PostgresService(loggerMock, scheduler, bulkWrite=True)
+
+        # Actual
+        postgresService.addArticleIoc(1, UUID_1)
+        postgresService.queueArticleAsExtracted(UUID_1)
+        postgresService.extractedArticleMarker.flush()
+
+        # Assert
+        cursorMock.execute.assert_has_calls([
+            call(CREATE_IOC_ARTICLES_STAGING_QUERY),
+            call(MERGE_IOC_ARTICLES_QUERY, ANY),
+            call(MARK_EXTRACTED_BATCH_QUERY, ([UUID_1],))
+        ], any_order=False)
+        loggerMock.error.assert_not_called()
+
+        postgresService.close()
+        postgresPatch.stop()
+
+    def test_markArticlesAsExtracted_error_retry(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+        scheduler = CurrentThreadScheduler()
+
+        cursorMock.execute.side_effect = [Exception("Test Exception"), cursorMock]
+
+        postgresPatch.start()
+        postgresService = PostgresService(loggerMock, scheduler)
+
+        # Actual
+        postgresService.queueArticleAsExtracted(UUID_1)
+        postgresService.close()
+
+        # Assert
+        self.assertEqual(2, cursorMock.execute.call_count)
+        cursorMock.execute.assert_called_with(MARK_EXTRACTED_BATCH_QUERY, ([UUID_1],))
+        loggerMock.error.assert_called()
+
+        postgresPatch.stop()
+
+    def test_writeArticleAsStream_pipeline_prepared(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+        scheduler = CurrentThreadScheduler()
+
+        postgresPatch.start()
+        postgresService = PostgresService(loggerMock, scheduler, pipelineWrites=True)
+        writer = postgresService.articleWriter(UUID_1)
+
+        # Actual
+        writer.addArticleIocAsStream(1, UUID_1).subscribe(scheduler=scheduler)
+        writer.addArticleIocAsStream(2, UUID_1).subscribe(scheduler=scheduler)
+        writer.insertCategoryArticleAsStream('3', UUID_1).subscribe(scheduler=scheduler)
+        cursorMock.execute.assert_not_called()
+        postgresService.writeArticleAsStream(writer).subscribe(scheduler=scheduler)
+
+        # Assert
+        connectionMock.pipeline.assert_called_once()
+        cursorMock.execute.assert_has_calls([
+            call(ADD_ARTICLE_IOC_QUERY, (UUID_1, 1), prepare=True),
+            call(ADD_ARTICLE_IOC_QUERY, (UUID_1, 2), prepare=True),
+            call(INSERT_CATEGORY_QUERY, ('3', UUID_1), prepare=True)
+        ], any_order=False)
+        loggerMock.error.assert_not_called()
+
+        postgresPatch.stop()
+
+    def test_writeArticleAsStream_error_retry(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+        scheduler = CurrentThreadScheduler()
+
+        # Pipeline errors are raised when the pipeline is synced
+        connectionMock.pipeline.return_value.__exit__.side_effect = [Exception("Test Exception"), False]
+
+        postgresPatch.start()
+        postgresService = PostgresService(loggerMock, scheduler, pipelineWrites=True)
+        writer = postgresService.articleWriter(UUID_1)
+        writer.addArticleIoc(1, UUID_1)
+
+        # Actual
+        postgresService.writeArticleAsStream(writer).subscribe(scheduler=scheduler)
+
+        # Assert
+        self.assertEqual(2, connectionMock.pipeline.call_count)
+        self.assertEqual(2, cursorMock.execute.call_count)
+        loggerMock.error.assert_called()
+
+        postgresPatch.stop()
+
+    def test_writeArticleAsStream_empty_skips_db(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+        scheduler = CurrentThreadScheduler()
+
+        postgresPatch.start()
+        postgresService = PostgresService(loggerMock, scheduler, pipelineWrites=True)
+
+        # Actual
+        postgresService.writeArticleAsStream(postgresService.articleWriter(UUID_1)).subscribe(scheduler=scheduler)
+
+        # Assert
+        connectionMock.pipeline.assert_not_called()
+        cursorMock.execute.assert_not_called()
+
+        postgresPatch.stop()
+
+    def test_getNonExtractedIdsIn_success(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+        scheduler = CurrentThreadScheduler()
+
+        cursorMock.fetchall.return_value = [(UUID_1, 1)]
+
+        postgresPatch.start()
+        postgresService = PostgresService(loggerMock, scheduler)
+
+        # Actual
+        actual = postgresService.getNonExtractedIdsIn([UUID_1, UUID_2])
+
+        # Assert
+        self.assertEqual([ArticleInfo(UUID_1, 1)], actual)
+        cursorMock.execute.assert_called_once_with(GET_NON_EXTRACTED_IDS_IN_QUERY, ([UUID_1, UUID_2],))
+
+        postgresPatch.stop()
+
+    def test_writeArticleAsStream_bulkWrite_buffered(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+        scheduler = CurrentThreadScheduler()
+
+        postgresPatch.start()
+        postgresService = PostgresService(loggerMock, scheduler, bulkWrite=True, pipelineWrites=True)
+        writer = postgresService.articleWriter(UUID_1)
+        writer.addArticleIoc(1, UUID_1)
+        writer.insertCategoryArticle('2', UUID_1)
+
+        # Actual
+        postgresService.writeArticleAsStream(writer).subscribe(scheduler=scheduler)
+
+        # Assert
+        connectionMock.pipeline.assert_not_called()
+        self.assertEqual(1, len(postgresService.articleIocWriter))
+        self.assertEqual(1, len(postgresService.categoryArticleWriter))
+
+        postgresService.close()
+        postgresPatch.stop()
+
+    def test_articleTransaction_committed_with_mark(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+        scheduler = CurrentThreadScheduler()
+
+        postgresPatch.start()
+        postgresService = PostgresService(loggerMock, scheduler, transactionalWrites=True)
+
+        # Actual
+        with postgresService.articleTransaction(UUID_1) as transaction:
+            transaction.addArticleIocAsStream(1, UUID_1).subscribe(scheduler=scheduler)
+            transaction.insertCategoryArticleAsStream('2', UUID_1).subscribe(scheduler=scheduler)
+            cursorMock.execute.assert_not_called()
+
+        # Assert
+        connectionMock.transaction.assert_called_once()
+        connectionMock.pipeline.assert_not_called()
+        cursorMock.execute.assert_has_calls([
+            call(ADD_ARTICLE_IOC_QUERY, (UUID_1, 1), prepare=None),
+            call(INSERT_CATEGORY_QUERY, ('2', UUID_1), prepare=None),
+            call(MARK_EXTRACTED_BATCH_QUERY, ([UUID_1],))
+        ], any_order=False)
+        loggerMock.error.assert_not_called()
+
+        postgresService.close()
+        postgresPatch.stop()
+
+    def test_queueArticleFeatures_resolved_once_and_committed_with_mark(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+        scheduler = CurrentThreadScheduler()
+
+        cursorMock.fetchall.return_value = [(1, 2, "1.1.1.1"), (5, 3, "evil.com")]
+
+        postgresPatch.start()
+        postgresService = PostgresService(loggerMock, scheduler, parentWrites=True)
+
+        # Actual
+        postgresService.queueArticleFeatures(ArticleFeatures(UUID_1, [("1.1.1.1", 2), ("evil.com", 3)], ['4']))
+        postgresService.queueArticleFeatures(ArticleFeatures(UUID_2, [("1.1.1.1", 2)], []))
+        cursorMock.execute.assert_not_called()
+        postgresService.close()
+
+        # Assert
+        cursorMock.execute.assert_has_calls([
+            call(ADD_IOCS_QUERY, ([2, 3], ["1.1.1.1", "evil.com"])),
+            call(ADD_ARTICLE_IOC_QUERY, (UUID_1, 1), prepare=None),
+            call(ADD_ARTICLE_IOC_QUERY, (UUID_1, 5), prepare=None),
+            call(ADD_ARTICLE_IOC_QUERY, (UUID_2, 1), prepare=None),
+            call(INSERT_CATEGORY_QUERY, ('4', UUID_1), prepare=None),
+            call(MARK_EXTRACTED_BATCH_QUERY, ([UUID_1, UUID_2],))
+        ], any_order=False)
+        connectionMock.transaction.assert_called_once()
+        loggerMock.error.assert_not_called()
+
+        postgresPatch.stop()
+
+    def test_articleTransaction_error_discards_article(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+        scheduler = CurrentThreadScheduler()
+
+        postgresPatch.start()
+        postgresService = PostgresService(loggerMock, scheduler, transactionalWrites=True)
+
+        # Actual
+        with self.assertRaises(Exception):
+            with postgresService.articleTransaction(UUID_1) as transaction:
+                transaction.addArticleIoc(1, UUID_1)
+                raise Exception("Test Exception")
+        postgresService.close()
+
+        # Assert
+        connectionMock.transaction.assert_not_called()
+        cursorMock.execute.assert_not_called()
+
+        postgresPatch.stop()
+
+    @patch("src.postgres_service.ARTICLE_TRANSACTION_BATCH_SIZE", 2)
+    def test_articleTransaction_micro_batch_single_commit(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+        scheduler = CurrentThreadScheduler()
+
+        postgresPatch.start()
+        postgresService = PostgresService(loggerMock, scheduler, transactionalWrites=True, pipelineWrites=True)
+
+        # Actual
+        with postgresService.articleTransaction(UUID_1) as transaction:
+            transaction.addArticleIoc(1, UUID_1)
+        cursorMock.execute.assert_not_called()
+        with postgresService.articleTransaction(UUID_2) as transaction:
+            transaction.addArticleIoc(2, UUID_2)
+
+        # Assert
+        connectionMock.transaction.assert_called_once()
+        connectionMock.pipeline.assert_called_once()
+        cursorMock.execute.assert_has_calls([
+            call(ADD_ARTICLE_IOC_QUERY, (UUID_1, 1), prepare=True),
+            call(ADD_ARTICLE_IOC_QUERY, (UUID_2, 2), prepare=True),
+            call(MARK_EXTRACTED_BATCH_QUERY, ([UUID_1, UUID_2],))
+        ], any_order=False)
+        loggerMock.error.assert_not_called()
+
+        postgresService.close()
+        postgresPatch.stop()
+
+    def test_articleTransaction_bulkWrite_copied_in_transaction(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+        scheduler = CurrentThreadScheduler()
+
+        copyMock = MagicMock()
+        cursorMock.copy.return_value.__enter__.return_value = copyMock
+
+        postgresPatch.start()
+        postgresService = PostgresService(loggerMock, scheduler, bulkWrite=True, transactionalWrites=True,
+                                          pipelineWrites=True)
+
+        # Actual
+        with postgresService.articleTransaction(UUID_1) as transaction:
+            transaction.addArticleIoc(1, UUID_1)
+
+        # Assert
+        connectionMock.transaction.assert_called_once()
+        connectionMock.pipeline.assert_not_called()
+        cursorMock.copy.assert_called_once_with(COPY_IOC_ARTICLES_STAGING_QUERY)
+        self.assertEqual((UUID_1, 1), copyMock.write_row.call_args.args[0][1:])
+        cursorMock.execute.assert_has_calls([
+            call(CREATE_IOC_ARTICLES_STAGING_QUERY),
+            call(MERGE_IOC_ARTICLES_QUERY, ANY),
+            call(MARK_EXTRACTED_BATCH_QUERY, ([UUID_1],))
+        ], any_order=False)
+        loggerMock.error.assert_not_called()
+
+        postgresService.close()
+        postgresPatch.stop()
+
+    def test_claimArticles_success(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+        scheduler = CurrentThreadScheduler()
+
+        cursorMock.fetchall.return_value = [[UUID_1, 1], [UUID_2, 2]]
+
+        postgresPatch.start()
+        postgresService = PostgresService(loggerMock, scheduler)
+
+        # Actual
+        actual = postgresService.claimArticles("instance", 2, 60)
+
+        # Assert
+        self.assertEqual([ArticleInfo(UUID_1, 1), ArticleInfo(UUID_2, 2)], actual)
+        cursorMock.execute.assert_called_once_with(CLAIM_ARTICLES_QUERY,
+                                                   {"batchSize": 2, "instanceId": "instance", "leaseDuration": 60})
+
+        postgresPatch.stop()
+
+    def test_queueArticleAsExtracted_claimMode_releases_leases(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+        scheduler = CurrentThreadScheduler()
+
+        postgresPatch.start()
+        postgresService = PostgresService(loggerMock, scheduler, claimMode=True)
+
+        # Actual
+        postgresService.queueArticleAsExtracted(UUID_1)
+        postgresService.close()
+
+        # Assert
+        cursorMock.execute.assert_has_calls([
+            call(MARK_EXTRACTED_BATCH_QUERY, ([UUID_1],)),
+            call(RELEASE_LEASES_QUERY, ([UUID_1],))
+        ], any_order=False)
+        loggerMock.error.assert_not_called()
+
+        postgresPatch.stop()
+
     def test_getGlobalFiltersAsDictAsStream_success(self):
         loggerMock, connectionMock, cursorMock = getMockObjects()
         postgresPatch = getPatches(connectionMock)
@@ -451,5 +1060,30 @@ class PostgresServiceTests(unittest.TestCase):
 
         postgresPatch.stop()
 
+    def test_getPoolStats_success(self):
+        loggerMock, connectionMock, cursorMock = getMockObjects()
+        postgresPatch = getPatches(connectionMock)
+        scheduler = CurrentThreadScheduler()
+
+        poolClassMock = postgresPatch.start()
+        poolClassMock.return_value.get_stats.return_value = {
+            "pool_min": 1, "pool_max": 4, "pool_size": 3, "pool_available": 1,
+            "requests_num": 10, "requests_wait_ms": 50, "requests_waiting": 2
+        }
+        postgresService = PostgresService(loggerMock, scheduler)
+
+        # Actual
+        actual = postgresService.getPoolStats()
+
+        # Assert
+        self.assertEqual(2, actual["inUse"])
+        self.assertEqual(4, actual["max"])
+        self.assertEqual(0.5, actual["utilization"])
+        self.assertEqual(5.0, actual["avgWaitMs"])
+        self.assertEqual(2, actual["waiting"])
+        self.assertEqual(0, actual["timeouts"])
+
+        postgresPatch.stop()
+
 if __name__ == '__main__':
     unittest.main()
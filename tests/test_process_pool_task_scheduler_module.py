@@ -0,0 +1,151 @@
+import unittest
+from unittest.mock import *
+from uuid import UUID
+
+from reactivex import operators as ops
+from reactivex.scheduler import CurrentThreadScheduler
+
+from src.collections import ArticleContent, ArticleFeatures, ExtractionResult
+from src.exceptions import DisposedException
+from src.process_pool_task_scheduler import ProcessPoolTaskScheduler, runTask
+
+UUID_1 = UUID("5d8a48c7-8799-49ba-8a61-b96c6f0d08e8")
+UUID_2 = UUID("2c398d08-22e0-4f69-955b-69fb39666a9c")
+
+
+def getPatches():
+    # Processes are forked, so they inherit the patches
+    return [
+        patch("src.process_pool_task_scheduler.PostgresService"),
+        patch("src.process_pool_task_scheduler.IocExtractor"),
+        patch("src.process_pool_task_scheduler.CategoryAssigner"),
+        patch("src.process_pool_task_scheduler.extractFeatures",
+              side_effect=lambda article, *args: article.articleContent.startswith("content")),
+    ]
+
+
+class ProcessPoolTaskSchedulerTests(unittest.TestCase):
+    def test_submitArticle_future_completed_by_process(self):
+        patches = getPatches()
+        for p in patches:
+            p.start()
+
+        taskScheduler = ProcessPoolTaskScheduler(2)
+
+        # Actual
+        futures = [
+            taskScheduler.submitArticle(ArticleContent(UUID_1, "content 1", 1)),
+            taskScheduler.submitArticle(ArticleContent(UUID_2, "fails", 1)),
+        ]
+        actual = [future.result(timeout=10) for future in futures]
+
+        taskScheduler.dispose()
+        for p in patches:
+            p.stop()
+
+        # Assert
+        self.assertEqual([ExtractionResult(UUID_1, True, 0), ExtractionResult(UUID_2, False, 0)], actual)
+
+    def test_submitArticleAsStream_emits_result(self):
+        patches = getPatches()
+        for p in patches:
+            p.start()
+
+        taskScheduler = ProcessPoolTaskScheduler(1)
+
+        # Actual
+        actual = taskScheduler.submitArticleAsStream(ArticleContent(UUID_1, "content 1", 1)).pipe(
+            ops.timeout(10)
+        ).run()
+
+        taskScheduler.dispose()
+        for p in patches:
+            p.stop()
+
+        # Assert
+        self.assertEqual(ExtractionResult(UUID_1, True, 0), actual)
+
+    def test_submitArticlesAsStream_chunks_complete_every_article(self):
+        patches = getPatches()
+        for p in patches:
+            p.start()
+
+        taskScheduler = ProcessPoolTaskScheduler(1)
+        # Latency known, so articles are sent in chunks
+        taskScheduler.chunkSizer.observe(1, 0.001)
+        articles = [ArticleContent(UUID_1, "content 1", 1), ArticleContent(UUID_2, "content 2", 1)]
+
+        # Actual
+        actual = taskScheduler.submitArticlesAsStream(articles).pipe(
+            ops.to_list(),
+            ops.timeout(10)
+        ).run()
+
+        taskScheduler.dispose()
+        for p in patches:
+            p.stop()
+
+        # Assert
+        self.assertCountEqual([ExtractionResult(UUID_1, True, 0), ExtractionResult(UUID_2, True, 0)], actual)
+
+    def test_submitArticles_arena_content_read_and_freed(self):
+        patches = getPatches()
+        for p in patches:
+            p.start()
+
+        # Second article does not fit in the arena and is sent with its task
+        taskScheduler = ProcessPoolTaskScheduler(1, arenaSize=16)
+        articles = [ArticleContent(UUID_1, "content 1", 1), ArticleContent(UUID_2, "content 2" * 2, 1)]
+
+        # Actual
+        actual = [future.result(timeout=10) for future in taskScheduler.submitArticles(articles)]
+        freeBytes = taskScheduler.articleArena.freeBytes()
+
+        taskScheduler.dispose()
+        for p in patches:
+            p.stop()
+
+        # Assert
+        self.assertEqual([ExtractionResult(UUID_1, True, 0), ExtractionResult(UUID_2, True, 0)], actual)
+        self.assertEqual(16, freeBytes)
+
+    def test_dispose_fails_pending_tasks(self):
+        taskScheduler = ProcessPoolTaskScheduler(0)
+        future = taskScheduler.submitArticle(ArticleContent(UUID_1, "content 1", 1))
+
+        # Actual
+        taskScheduler.dispose()
+
+        # Assert
+        self.assertIsInstance(future.exception(), DisposedException)
+        with self.assertRaises(DisposedException):
+            taskScheduler.submitArticle(ArticleContent(UUID_1, "content 1", 1))
+
+    def test_runTask_parentWrites_returns_features(self):
+        extractorMock = Mock()
+        extractorMock.extract_features.side_effect = lambda article, writer: writer.addIOCsIfNotExistAsStream(
+            [("1.1.1.1", 2)]
+        )
+        postgresServiceMock = Mock()
+
+        # Actual
+        actual = runTask(ArticleContent(UUID_1, b"content 1", 1), [extractorMock], postgresServiceMock,
+                         CurrentThreadScheduler(), Mock(), parentWrites=True)
+
+        # Assert
+        self.assertTrue(actual.succeeded)
+        self.assertEqual(ArticleFeatures(UUID_1, [("1.1.1.1", 2)], []), actual.features)
+        self.assertEqual("content 1", extractorMock.extract_features.call_args[0][0].articleContent)
+        postgresServiceMock.queueArticleAsExtracted.assert_not_called()
+
+    def test_runTask_error_reported(self):
+        with patch("src.process_pool_task_scheduler.extractFeatures", side_effect=Exception("Test Exception")):
+            # Actual
+            actual = runTask(ArticleContent(UUID_1, "content 1", 1), [], Mock(), Mock(), Mock())
+
+        # Assert
+        self.assertEqual(ExtractionResult(UUID_1, False, 0, "Exception('Test Exception')"), actual)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import re
+import unittest
+from datetime import datetime
+from uuid import UUID
+
+import bson
+from bson.raw_bson import RawBSONDocument
+
+from src.raw_bson import RAW_BSON_CODEC_OPTIONS, decodeRawField, findRawField, rawStringField
+
+UUID_1 = UUID("5d8a48c7-8799-49ba-8a61-b96c6f0d08e8")
+
+
+def encode(document: dict):
+    return bson.encode(document, codec_options=RAW_BSON_CODEC_OPTIONS)
+
+
+class RawBsonTests(unittest.TestCase):
+    def test_rawStringField_returns_utf8_bytes(self):
+        raw = encode({"_id": UUID_1, "web_scrap": "contenu été"})
+
+        # Actual
+        actual = rawStringField(raw, "web_scrap")
+
+        # Assert
+        self.assertEqual("contenu été".encode(), actual)
+
+    def test_rawStringField_skips_every_preceding_type(self):
+        raw = encode({
+            "_id": UUID_1,
+            "double": 1.5,
+            "nested": {"a": [1, 2]},
+            "flag": True,
+            "date": datetime(2024, 1, 1),
+            "none": None,
+            "int": 1,
+            "long": 2 ** 40,
+            "regex": re.compile("a.*b"),
+            "objectId": bson.ObjectId(),
+            "web_scrap": "content"
+        })
+
+        # Actual
+        actual = rawStringField(raw, "web_scrap")
+
+        # Assert
+        self.assertEqual(b"content", actual)
+
+    def test_rawStringField_null_or_missing_none(self):
+        # Actual / Assert
+        self.assertIsNone(rawStringField(encode({"_id": UUID_1, "web_scrap": None}), "web_scrap"))
+        self.assertIsNone(rawStringField(encode({"_id": UUID_1}), "web_scrap"))
+
+    def test_rawStringField_not_string_decoded(self):
+        raw = encode({"web_scrap": 12})
+
+        # Actual
+        actual = rawStringField(raw, "web_scrap")
+
+        # Assert
+        self.assertEqual(b"12", actual)
+
+    def test_decodeRawField_uuid(self):
+        raw = encode({"web_scrap": "content", "_id": UUID_1})
+
+        # Actual
+        actual = decodeRawField(raw, "_id")
+
+        # Assert
+        self.assertEqual(UUID_1, actual)
+
+    def test_findRawField_matches_whole_name(self):
+        raw = encode({"web_scrap_date": "other", "web_scrap": "content"})
+
+        # Actual
+        elementStart, valueStart, valueEnd = findRawField(raw, "web_scrap")
+
+        # Assert
+        self.assertEqual(len(raw) - 1, valueEnd)
+        self.assertEqual(RawBSONDocument(raw)["web_scrap"], "content")
+
+
+if __name__ == '__main__':
+    unittest.main()